@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+from metrics import REGISTRY, POOL_WAIT_SECONDS
+
+
+class PoolOverloaded(Exception):
+    """Raised when the analysis pool has no free worker or queue slot"""
+
+
+class AnalysisPool:
+    """
+    Bounded thread pool for running blocking analysis work off the event loop.
+
+    At most max_workers jobs run at once and at most queue_limit more wait
+    for a worker; anything beyond that is rejected immediately with
+    PoolOverloaded instead of piling up behind slow requests.
+    """
+
+    def __init__(self, max_workers: int = 2, queue_limit: int = 64):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_limit)
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool and wait for its result"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """Queue func(*args) on the pool, raising PoolOverloaded if it is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolOverloaded(
+                f"Analysis pool is full ({self.max_workers} workers, {self.queue_limit} queued)"
+            )
+
+        try:
+            if REGISTRY.sampled():
+                future = self._executor.submit(self._timed_job, time.perf_counter(), func, args)
+            else:
+                future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_flight += 1
+        future.add_done_callback(self._on_done)
+        return future
+
+    @staticmethod
+    def _timed_job(submitted: float, func: Callable[..., Any], args: tuple) -> Any:
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - submitted)
+        return func(*args)
+
+    def _on_done(self, future: Future):
+        self._slots.release()
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        """Pool size, saturation and outcome counters"""
+        with self._lock:
+            capacity = self.max_workers + self.queue_limit
+            return {
+                "max_workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "queued": max(self.in_flight - self.max_workers, 0),
+                "saturation": round(self.in_flight / capacity, 4) if capacity else 1.0,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and optionally wait for running jobs"""
+        self._executor.shutdown(wait=wait)
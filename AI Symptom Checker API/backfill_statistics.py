@@ -0,0 +1,34 @@
+"""
+One-off backfill of the analysis statistics rollups.
+
+Databases created before the rollup tables existed have analyses the
+rollups never counted. This recomputes them from symptom_analyses in a
+single transaction; running it again is safe and gives the same result.
+
+Run from the project directory:
+    python backfill_statistics.py [--db symptom_checker.db]
+"""
+import argparse
+import time
+
+from database import DatabaseManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the analysis statistics rollups")
+    parser.add_argument("--db", default="symptom_checker.db", help="symptom checker database")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_database()
+
+    start = time.perf_counter()
+    total = db_manager.rebuild_analysis_statistics()
+    elapsed = time.perf_counter() - start
+    db_manager.close()
+
+    print(f"Backfilled statistics for {total} analyses in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
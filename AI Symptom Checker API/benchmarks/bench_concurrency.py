@@ -0,0 +1,94 @@
+"""
+Concurrency benchmark: analysis throughput and event-loop responsiveness
+as the analysis pool worker count scales
+
+Every run fires a burst of concurrent analyses (result cache disabled) while
+a probe coroutine measures how late the event loop wakes it up, which is
+what /health and other concurrent requests would experience. The "inline"
+row runs the analyzer directly on the event loop, as the endpoint used to.
+
+Run from the project directory:
+    python benchmarks/bench_concurrency.py [requests]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_pool import AnalysisPool
+from database import DatabaseManager
+from models import SymptomInput
+from symptom_checker import EnhancedSymptomAnalyzer
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+INPUTS = [
+    "fever, headache, cough for 3 days",
+    "nausea and vomiting, stomach pain",
+    "runny nose; sneezing; sore throat; congestion",
+    "chest pain and shortness of breath",
+    "dizziness, fatigue, dry mouth and thirst",
+]
+
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list):
+    """Sleep for 1 ms at a time and record how late each wake-up is"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def run_burst(analyze, requests: int):
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(probe_loop_lag(stop, lags))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze(SymptomInput(symptoms=INPUTS[i % len(INPUTS)])) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    lags.sort()
+    worst_lag = lags[-1] if lags else elapsed
+    p99_lag = lags[int(len(lags) * 0.99)] if lags else elapsed
+    return requests / elapsed, p99_lag, worst_lag
+
+
+def report(label: str, throughput: float, p99_lag: float, worst_lag: float):
+    print(f"{label:<10} {throughput:10.0f} req/s   loop lag p99 {p99_lag * 1e3:8.2f} ms"
+          f"   max {worst_lag * 1e3:8.2f} ms")
+
+
+async def main(requests: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0)
+
+        print(f"{requests} concurrent analyses per run")
+
+        async def inline(symptom_input):
+            return analyzer.analyze_symptoms(symptom_input)
+
+        report("inline", *await run_burst(inline, requests))
+
+        for workers in WORKER_COUNTS:
+            pool = AnalysisPool(max_workers=workers, queue_limit=requests)
+
+            async def pooled(symptom_input, pool=pool):
+                return await pool.run(analyzer.analyze_symptoms, symptom_input)
+
+            report(f"{workers} workers", *await run_burst(pooled, requests))
+            pool.shutdown()
+
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
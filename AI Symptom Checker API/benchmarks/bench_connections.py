@@ -0,0 +1,89 @@
+"""
+Benchmark: sqlite connections opened per request, before and after
+persistent connection management
+
+Each simulated request runs the analyzer, stores the result and performs a
+health probe, the same database work /analyze-symptoms and /health do.
+
+Run from the project directory:
+    python benchmarks/bench_connections.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import DatabaseManager
+from models import SymptomInput
+from symptom_checker import EnhancedSymptomAnalyzer
+
+REQUESTS = 500
+
+INPUTS = [
+    "fever, headache, cough for 3 days",
+    "nausea and vomiting",
+    "runny nose; sneezing; sore throat",
+    "chest pain and shortness of breath",
+]
+
+
+class PerOperationDatabaseManager(DatabaseManager):
+    """Opens a fresh connection for every operation, as DatabaseManager used to"""
+
+    def get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+
+class ConnectCounter:
+    """Counts sqlite3.connect calls made through the database module"""
+
+    def __init__(self):
+        self.count = 0
+        self._connect = sqlite3.connect
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+        return self._connect(*args, **kwargs)
+
+
+def run(label: str, db_manager: DatabaseManager, counter: ConnectCounter):
+    analyzer = EnhancedSymptomAnalyzer(db_manager)
+
+    # Warm up the index and this thread's connection
+    analyzer.analyze_symptoms(SymptomInput(symptoms=INPUTS[0]))
+
+    counter.count = 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        symptom_input = SymptomInput(symptoms=INPUTS[i % len(INPUTS)])
+        result = analyzer.analyze_symptoms(symptom_input)
+        db_manager.store_symptom_analysis(symptom_input, result)
+        db_manager.get_connection().execute("SELECT 1")
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<16} {counter.count / REQUESTS:6.2f} connections/request"
+          f"  {elapsed / REQUESTS * 1e3:7.3f} ms/request")
+
+
+def main():
+    counter = ConnectCounter()
+    database.sqlite3.connect = counter
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            DatabaseManager(db_path).initialize_database()
+
+            print(f"{REQUESTS} requests (analyze + store + health probe)")
+            run("per-operation", PerOperationDatabaseManager(db_path), counter)
+            run("persistent", DatabaseManager(db_path), counter)
+            DatabaseManager(db_path).close()
+    finally:
+        database.sqlite3.connect = counter._connect
+
+
+if __name__ == "__main__":
+    main()
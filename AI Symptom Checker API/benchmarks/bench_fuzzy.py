@@ -0,0 +1,131 @@
+"""
+Benchmark: typo-tolerant lookups at the call sites that use them
+
+Builds a synthetic condition index with tens of thousands of distinct
+symptom phrases ("occasional sharp left knee pain"), plus the seeded common
+symptom names, and times each fuzzy lookup the way the service makes it:
+
+- condition match: ConditionIndex._fuzzy_corrections, the fallback of
+  match_phrases for a symptom with no exact or word match
+- categorize: EnhancedSymptomAnalyzer._fuzzy_category, the fallback for a
+  symptom no category phrase matches
+- /symptoms/lookup at its default limit (5) and its maximum (10)
+
+Queries mix single-edit typos of long phrases, misspelt single words
+("headahce") and symptoms with no close phrase at all, which search every
+allowed edit distance before giving up.
+
+Run from the project directory:
+    python benchmarks/bench_fuzzy.py [--conditions 12000] [--queries 400]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from symptom_checker import EnhancedSymptomAnalyzer
+from symptom_index import ConditionIndex
+
+BODY_PARTS = ["head", "neck", "chest", "back", "stomach", "knee", "hip", "shoulder", "wrist", "ankle",
+              "foot", "hand", "eye", "ear", "throat", "jaw", "skin", "elbow", "abdomen", "lower back"]
+DESCRIPTORS = ["pain", "ache", "swelling", "stiffness", "numbness", "itching", "burning", "tingling",
+               "cramps", "weakness", "redness", "tenderness"]
+MODIFIERS = ["", "mild ", "sharp ", "chronic ", "sudden ", "dull ", "severe ", "persistent ", "intermittent ",
+             "throbbing ", "stabbing ", "aching ", "radiating "]
+SIDES = ["", "left ", "right "]
+FREQUENCIES = ["", "recurring ", "occasional ", "constant "]
+COMMON_SYMPTOMS = [("fever", "general"), ("fatigue", "general"), ("headache", "neurological"),
+                   ("nausea", "gastrointestinal"), ("diarrhea", "gastrointestinal"), ("cough", "respiratory"),
+                   ("sore throat", "respiratory"), ("dizziness", "neurological"), ("rash", "dermatological")]
+UNMATCHED = ["feeling blue", "cannot sleep well", "hair loss", "weird taste in mouth", "blurry vision",
+             "ringing in ears", "xyzzy", "dry mouth at night"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def build_index(size: int, rng: random.Random) -> ConditionIndex:
+    vocabulary = [
+        f"{frequency}{modifier}{side}{part} {descriptor}"
+        for frequency in FREQUENCIES for modifier in MODIFIERS for side in SIDES
+        for part in BODY_PARTS for descriptor in DESCRIPTORS
+    ]
+    rows = [
+        (number + 1, f"Synthetic Condition {number}", "Synthetic condition",
+         ",".join(rng.sample(vocabulary, 6) + ["fever", "fatigue"]), rng.choice(["low", "medium", "high"]))
+        for number in range(size)
+    ]
+    return ConditionIndex(rows, 1, COMMON_SYMPTOMS)
+
+
+def typo(text: str, rng: random.Random) -> str:
+    position = rng.randrange(len(text))
+    edit = rng.randrange(4)
+    if edit == 0:
+        return text[:position] + text[position + 1:]
+    if edit == 1:
+        return text[:position] + rng.choice(LETTERS) + text[position:]
+    if edit == 2 and position + 1 < len(text):
+        return text[:position] + text[position + 1] + text[position] + text[position + 2:]
+    return text[:position] + rng.choice(LETTERS) + text[position + 1:]
+
+
+def make_queries(index: ConditionIndex, count: int, rng: random.Random) -> list:
+    phrases = sorted(index.phrase_conditions)
+    words = sorted({word for phrase in phrases for word in phrase.split()} | {name for name, _ in COMMON_SYMPTOMS})
+    queries = []
+    for number in range(count):
+        kind = number % 4
+        if kind == 0:
+            queries.append(typo(rng.choice(phrases), rng))
+        elif kind == 1:
+            queries.append(typo(rng.choice(words), rng))
+        elif kind == 2:
+            queries.append(rng.choice(UNMATCHED))
+        else:
+            queries.append("".join(rng.choice(LETTERS + "  ") for _ in range(rng.randint(6, 30))).strip() or "qwerty")
+    return queries
+
+
+def timed(function, queries: list) -> dict:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        function(query)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {"p50": statistics.median(samples), "p99": samples[int(len(samples) * 0.99)], "max": samples[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy symptom lookups at their call sites")
+    parser.add_argument("--conditions", type=int, default=12000)
+    parser.add_argument("--queries", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    index = build_index(args.conditions, rng)
+    queries = make_queries(index, args.queries, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        # The index is passed explicitly, so the database is never read
+        analyzer = EnhancedSymptomAnalyzer(DatabaseManager(os.path.join(tmp, "bench.db")))
+
+        call_sites = {
+            "condition match": index._fuzzy_corrections,
+            "categorize": lambda query: analyzer._fuzzy_category(query, index),
+            "lookup limit=5": lambda query: index.resolve_symptom(query, limit=5),
+            "lookup limit=10": lambda query: index.resolve_symptom(query, limit=10)
+        }
+        print(f"{len(index)} conditions, {len(index.fuzzy)} phrases, {len(queries)} queries")
+        for name, function in call_sites.items():
+            result = timed(function, queries)
+            print(f"  {name:<16} p50 {result['p50'] * 1e3:7.3f} ms  p99 {result['p99'] * 1e3:7.3f} ms  "
+                  f"max {result['max'] * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
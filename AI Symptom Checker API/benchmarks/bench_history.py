@@ -0,0 +1,143 @@
+"""
+Benchmark: analysis history pages over a large synthetic table, keyset
+pagination against OFFSET pagination
+
+Fills a throwaway database with synthetic analyses spread over a year
+(through the normal schema, so the history indexes and the symptom
+trigger are maintained as in production), then times a page of history
+for each filter at increasing depths:
+
+- keyset: DatabaseManager.get_analysis_history from the (timestamp, id)
+  cursor of the row just before the page
+- offset: the same query with LIMIT/OFFSET, as naive pagination does
+
+Run from the project directory:
+    python benchmarks/bench_history.py [--rows 5000000] [--page-size 50]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+SYMPTOMS = [
+    "fever", "headache", "cough", "sore throat", "runny nose", "nausea", "vomiting", "diarrhea",
+    "fatigue", "dizziness", "chest pain", "back pain", "rash", "itching", "chills", "sneezing",
+    "stomach pain", "joint pain", "muscle aches", "shortness of breath"
+]
+SEVERITIES = ["low", "medium", "high", "critical"]
+YEAR_SECONDS = 365 * 24 * 3600
+START = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, 0))
+INSERT_BATCH = 50000
+
+FILTERS = {
+    "none": {},
+    "severity": {"severity": "high"},
+    "symptom": {"symptom": "fever"},
+    "symptom+severity": {"symptom": "chest pain", "severity": "critical"},
+    "time range": {"start": "2025-03-01 00:00:00", "end": "2025-09-01 00:00:00"},
+}
+
+
+def populate(db_manager: DatabaseManager, rows: int, rng: random.Random):
+    conn = db_manager.get_connection()
+    payload = b"\x01" + bytes(400)
+    started = time.perf_counter()
+    for batch_start in range(0, rows, INSERT_BATCH):
+        batch = []
+        for _ in range(min(INSERT_BATCH, rows - batch_start)):
+            symptoms = rng.sample(SYMPTOMS, rng.randint(1, 4))
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(START + rng.randrange(YEAR_SECONDS)))
+            batch.append((", ".join(symptoms), json.dumps(symptoms), payload, rng.random(),
+                          rng.choice(SEVERITIES), timestamp))
+        with conn:
+            conn.executemany('''
+                INSERT INTO symptom_analyses (
+                    input_text, extracted_symptoms, analysis_result, confidence_score, severity_level, timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', batch)
+        print(f"\r  inserted {batch_start + len(batch):,} rows", end="", flush=True)
+    print(f" in {time.perf_counter() - started:.0f}s")
+
+
+def key_at(db_manager: DatabaseManager, filters: dict, depth: int):
+    """(timestamp, id) of the row just before the page at depth, found once with OFFSET (untimed)"""
+    if depth == 0:
+        return None
+    rows, _ = offset_page(db_manager, filters, depth - 1, 1)
+    return (rows[0][1], rows[0][0]) if rows else None
+
+
+def offset_page(db_manager: DatabaseManager, filters: dict, offset: int, limit: int):
+    """The same page as get_analysis_history, found with LIMIT/OFFSET"""
+    if "symptom" in filters:
+        source = "analysis_symptoms s JOIN symptom_analyses a ON a.id = s.analysis_id"
+        conditions, params = ["s.symptom = ?"], [filters["symptom"]]
+        timestamp, key, severity = "s.timestamp", "s.analysis_id", "s.severity_level"
+    else:
+        source, conditions, params = "symptom_analyses a", [], []
+        timestamp, key, severity = "a.timestamp", "a.id", "a.severity_level"
+    if "severity" in filters:
+        conditions.append(f"{severity} = ?")
+        params.append(filters["severity"])
+    if "start" in filters:
+        conditions.append(f"{timestamp} >= ? AND {timestamp} < ?")
+        params.extend((filters["start"], filters["end"]))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = db_manager.get_connection().execute(f'''
+        SELECT a.id, a.timestamp, a.input_text, a.extracted_symptoms, a.age, a.gender,
+               a.severity_level, a.confidence_score
+        FROM {source} {where}
+        ORDER BY {timestamp} DESC, {key} DESC
+        LIMIT ? OFFSET ?
+    ''', (*params, limit, offset)).fetchall()
+    return rows, None
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyset-paginated analysis history")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    depths = [0] + [depth for depth in (10_000, 100_000, 1_000_000) if depth < args.rows // 4]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        print(f"Populating {args.rows:,} analyses")
+        populate(db_manager, args.rows, rng)
+
+        print(f"\n{'filter':<18} {'depth':>10} {'keyset ms':>10} {'offset ms':>10}")
+        for name, filters in FILTERS.items():
+            for depth in depths:
+                after = key_at(db_manager, filters, depth)
+                if depth and after is None:
+                    continue
+                keyset_ms = best_of(lambda: db_manager.get_analysis_history(
+                    limit=args.page_size, after=after, **filters
+                ))
+                offset_ms = best_of(lambda: offset_page(db_manager, filters, depth, args.page_size), repeat=2)
+                print(f"{name:<18} {depth:>10,} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
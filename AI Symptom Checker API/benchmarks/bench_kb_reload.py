@@ -0,0 +1,126 @@
+"""
+Benchmark: analysis latency while the conditions knowledge base changes
+
+Fills a throwaway database with synthetic conditions, then runs
+analyze_symptoms in a loop while another thread updates one condition
+every --update-interval seconds, in two modes:
+
+- inline: requests notice the new kb_version and rebuild the condition
+  index themselves (no KnowledgeBaseReloader)
+- background: a KnowledgeBaseReloader rebuilds and swaps the index, and
+  requests keep using the current one
+
+Reports the latency distribution and how many index versions were
+served. The rebuild cost shows up in the inline tail latency.
+
+Run from the project directory:
+    python benchmarks/bench_kb_reload.py [--conditions 10000] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from kb_reloader import KnowledgeBaseReloader
+from models import SymptomInput
+from symptom_checker import EnhancedSymptomAnalyzer
+from synthetic_kb import VOCABULARY
+
+REQUESTS = ["knee pain and ankle swelling", "fever, headache, cough", "chest burning; back ache",
+            "eye redness and itching", "stomach cramps for 2 days"]
+
+
+def populate(db_manager: DatabaseManager, size: int, rng: random.Random):
+    conn = db_manager.get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO conditions (name, description, symptoms, severity) VALUES (?, ?, ?, ?)",
+            [(f"Synthetic Condition {number}", f"Synthetic condition {number} used for benchmarking",
+              ",".join(rng.sample(VOCABULARY, rng.randint(3, 8))), rng.choice(["low", "medium", "high"]))
+             for number in range(size)]
+        )
+
+
+def update_conditions(db_path: str, interval: float, stop: threading.Event):
+    db_manager = DatabaseManager(db_path)
+    conn = db_manager.get_connection()
+    number = 0
+    while not stop.wait(interval):
+        number += 1
+        with conn:
+            conn.execute("UPDATE conditions SET description = ? WHERE name = 'Synthetic Condition 0'",
+                         (f"Revision {number}",))
+
+
+def run(db_path: str, seconds: float, update_interval: float, background: bool) -> dict:
+    db_manager = DatabaseManager(db_path)
+    analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0)
+    db_manager.get_condition_index()
+
+    reloader = None
+    if background:
+        reloader = KnowledgeBaseReloader(db_manager, interval=update_interval / 4)
+        reloader.start()
+
+    stop = threading.Event()
+    updater = threading.Thread(target=update_conditions, args=(db_path, update_interval, stop))
+    updater.start()
+
+    latencies = []
+    versions = set()
+    deadline = time.perf_counter() + seconds
+    inputs = [SymptomInput(symptoms=symptoms) for symptoms in REQUESTS]
+    while time.perf_counter() < deadline:
+        for symptom_input in inputs:
+            started = time.perf_counter()
+            analyzer.analyze_symptoms(symptom_input)
+            latencies.append(time.perf_counter() - started)
+        versions.add(db_manager.get_condition_index().version)
+
+    stop.set()
+    updater.join()
+    if reloader is not None:
+        reloader.stop()
+    db_manager.close()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "versions": len(versions)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis latency during knowledge-base reloads")
+    parser.add_argument("--conditions", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--update-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db_manager = DatabaseManager(db_path)
+        db_manager.initialize_database()
+        populate(db_manager, args.conditions, random.Random(1234))
+        db_manager.close()
+
+        print(f"{args.conditions} conditions, one update every {args.update_interval}s for {args.seconds}s")
+        for mode, background in (("inline", False), ("background", True)):
+            result = run(db_path, args.seconds, args.update_interval, background)
+            print(f"  {mode:<11} {result['requests']:>6} requests  p50 {result['p50'] * 1e3:7.2f} ms  "
+                  f"p99 {result['p99'] * 1e3:7.2f} ms  max {result['max'] * 1e3:7.2f} ms  "
+                  f"{result['versions']} versions served")
+
+
+if __name__ == "__main__":
+    main()
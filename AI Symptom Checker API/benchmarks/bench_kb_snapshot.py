@@ -0,0 +1,91 @@
+"""
+Benchmark: worker startup from knowledge-base sources versus a compiled
+snapshot
+
+For each size a synthetic CSV knowledge base is generated, then timed:
+parsing the CSV, compiling the snapshot, opening the snapshot, and loading
+it into a DatabaseManager (snapshot open plus condition index build), which
+is what a worker does at startup.
+
+Run from the project directory:
+    python benchmarks/bench_kb_snapshot.py [--sizes 1000,10000,50000]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from knowledge_base import SEVERITIES, KnowledgeBase, KnowledgeBaseSnapshot, write_snapshot
+from synthetic_kb import VOCABULARY
+
+TIPS = ["Rest", "Stay hydrated", "Apply a cold compress", "Avoid strenuous activity",
+        "Take over-the-counter pain relief as directed", "Keep the area clean", "Monitor symptoms"]
+
+
+def write_sources(path: str, size: int, rng: random.Random):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "description", "symptoms", "severity",
+                         "typical_duration", "when_to_see_doctor", "self_care_tips"])
+        for number in range(size):
+            writer.writerow([
+                f"Synthetic Condition {number}",
+                f"Synthetic condition {number} used for benchmarking",
+                ",".join(rng.sample(VOCABULARY, rng.randint(3, 8))),
+                rng.choice(SEVERITIES[:3]),
+                f"{rng.randint(1, 14)} days",
+                "If symptoms persist or worsen",
+                "|".join(rng.sample(TIPS, 3))
+            ])
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def bench(size: int, tmp: str, rng: random.Random):
+    source_path = os.path.join(tmp, f"kb_{size}.csv")
+    snapshot_path = os.path.join(tmp, f"kb_{size}.snapshot")
+    write_sources(source_path, size, rng)
+
+    knowledge_base = KnowledgeBase()
+    _, parse_ms = timed(lambda: knowledge_base.load(source_path))
+    _, compile_ms = timed(lambda: write_snapshot(knowledge_base, snapshot_path))
+
+    def open_snapshot():
+        with KnowledgeBaseSnapshot(snapshot_path) as snapshot:
+            return snapshot.condition_rows()
+    _, open_ms = timed(open_snapshot)
+
+    db_manager = DatabaseManager(os.path.join(tmp, f"bench_{size}.db"))
+    db_manager.initialize_database()
+    index, load_ms = timed(lambda: db_manager.load_kb_snapshot(snapshot_path))
+    db_manager.close()
+
+    print(f"{size:>7}  {os.path.getsize(source_path) / 1024:8.0f} KB csv  "
+          f"{os.path.getsize(snapshot_path) / 1024:8.0f} KB snapshot  "
+          f"parse {parse_ms:8.1f} ms  compile {compile_ms:7.1f} ms  "
+          f"open {open_ms:7.1f} ms  worker load {load_ms:8.1f} ms  ({len(index)} conditions)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark knowledge-base snapshot loading")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma-separated condition counts")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(size) for size in args.sizes.split(",") if size.strip()]:
+            bench(size, tmp, rng)
+
+
+if __name__ == "__main__":
+    main()
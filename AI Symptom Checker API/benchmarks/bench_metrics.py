@@ -0,0 +1,66 @@
+"""
+Benchmark: overhead of latency instrumentation on analyze_symptoms
+
+Times analyze_symptoms (result cache disabled) with metrics sampling
+turned off and at several sample rates, alternating runs to even out
+noise, and reports the overhead relative to no sampling.
+
+Run from the project directory:
+    python benchmarks/bench_metrics.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from metrics import REGISTRY
+from models import SymptomInput
+from symptom_checker import EnhancedSymptomAnalyzer
+
+RATES = [0.0, 0.01, 0.1, 1.0]
+ROUNDS = 15
+CALLS = 400
+
+INPUTS = [
+    SymptomInput(symptoms="fever, headache, cough for 3 days", age=30),
+    SymptomInput(symptoms="nausea and vomiting"),
+    SymptomInput(symptoms="runny nose; sneezing; sore throat", age=70),
+    SymptomInput(symptoms="chest pain and shortness of breath"),
+    SymptomInput(symptoms="I have been feeling tired and have a runny nose"),
+]
+
+
+def run(analyzer: EnhancedSymptomAnalyzer) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        analyzer.analyze_symptoms(INPUTS[i % len(INPUTS)])
+    return (time.perf_counter() - start) / CALLS
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0)
+        run(analyzer)
+
+        samples = {rate: [] for rate in RATES}
+        for _ in range(ROUNDS):
+            for rate in RATES:
+                REGISTRY.sample_rate = rate
+                samples[rate].append(run(analyzer))
+        db_manager.close()
+
+    baseline = statistics.median(samples[0.0])
+    print(f"analyze_symptoms, {ROUNDS} rounds of {CALLS} calls (median)")
+    for rate in RATES:
+        per_call = statistics.median(samples[rate])
+        print(f"  sample rate {rate:<5}  {per_call * 1e6:8.1f} us/call  {per_call / baseline - 1:+7.2%}")
+
+
+if __name__ == "__main__":
+    main()
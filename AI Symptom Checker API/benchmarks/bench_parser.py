@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: single-pass symptom tokenizer vs the original parser
+
+Run from the project directory:
+    python benchmarks/bench_parser.py
+"""
+import os
+import re
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from symptom_checker import EnhancedSymptomAnalyzer
+
+
+def legacy_parse_symptom_input(symptoms_text: str) -> List[str]:
+    """Original multi-pass parser, kept for comparison"""
+    symptoms_text = symptoms_text.lower().strip()
+    separators = [',', ';', ' and ', ' & ', '\n', ' also ', ' plus ']
+    
+    symptoms = [symptoms_text]
+    for sep in separators:
+        new_symptoms = []
+        for symptom in symptoms:
+            new_symptoms.extend([s.strip() for s in symptom.split(sep) if s.strip()])
+        symptoms = new_symptoms
+    
+    filter_words = {
+        'i have', 'i am', 'experiencing', 'feeling', 'symptoms', 'symptom',
+        'for', 'days', 'hours', 'weeks', 'since', 'yesterday', 'today',
+        'the', 'a', 'an', 'my', 'me', 'is', 'are', 'been', 'being'
+    }
+    
+    cleaned_symptoms = []
+    for symptom in symptoms:
+        symptom = re.sub(r'\b\d+\s*(day|days|hour|hours|week|weeks)\b', '', symptom)
+        symptom = re.sub(r'\b(since|for|about|around)\s+\w+\b', '', symptom)
+        words = symptom.split()
+        filtered_words = [w for w in words if w not in filter_words and len(w) > 1]
+        if filtered_words:
+            cleaned_symptom = ' '.join(filtered_words).strip()
+            if len(cleaned_symptom) > 2:
+                cleaned_symptoms.append(cleaned_symptom)
+    
+    return list(set(cleaned_symptoms))
+
+
+SHORT_INPUT = "fever, headache and cough for 3 days"
+
+NOTE_LINES = [
+    "Patient reports I have been feeling tired for about a week",
+    "runny nose and sore throat since yesterday; mild fever",
+    "also experiencing muscle aches plus chills & sweating at night",
+    "stomach pain after meals, nausea for 2 days",
+    "dizziness when standing up; shortness of breath on stairs",
+]
+
+
+def build_long_input(target_bytes: int) -> str:
+    lines = []
+    size = 0
+    while size < target_bytes:
+        line = NOTE_LINES[len(lines) % len(NOTE_LINES)]
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def bench(label: str, func, text: str, number: int):
+    seconds = min(timeit.repeat(lambda: func(text), number=number, repeat=5))
+    per_call_us = seconds / number * 1e6
+    print(f"  {label:<10} {per_call_us:10.1f} us/call")
+    return per_call_us
+
+
+def main():
+    analyzer = EnhancedSymptomAnalyzer()
+    cases = [
+        ("short", SHORT_INPUT, 20000),
+        ("long 4KB", build_long_input(4 * 1024), 500),
+        ("long 32KB", build_long_input(32 * 1024), 50),
+    ]
+    
+    print("Symptom parser micro-benchmark")
+    for name, text, number in cases:
+        print(f"{name} ({len(text)} chars)")
+        legacy = bench("legacy", legacy_parse_symptom_input, text, number)
+        current = bench("current", analyzer._parse_symptom_input, text, number)
+        print(f"  speedup    {legacy / current:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
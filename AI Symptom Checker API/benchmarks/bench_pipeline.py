@@ -0,0 +1,340 @@
+"""
+Benchmark suite for the symptom analysis pipeline
+
+Runs in-process against a throwaway database per knowledge-base size. For
+each size it generates synthetic conditions and inputs (varying length and
+symptom count), then times:
+
+- every stage of analyze_symptoms: parse, condition match, pattern scan,
+  categorize, severity, risk factors, condition details, recommendations,
+  response build and serialization
+- end-to-end analyze_symptoms (result cache disabled) and the batch path
+- DatabaseManager reads and writes: index build, condition and symptom
+  reads, single and batched analysis writes, analysis statistics
+
+Results are written as JSON (per-metric mean/p50/p95/p99 in microseconds)
+so runs from two commits can be compared with --compare.
+
+Run from the project directory:
+    python benchmarks/bench_pipeline.py [--kb-sizes 15,1000,10000] [--inputs 300]
+                                        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from models import ComprehensiveResponse, SymptomAnalysis, SymptomInput, response_json
+from symptom_checker import EnhancedSymptomAnalyzer
+
+DEFAULT_KB_SIZES = [15, 1000, 10000]
+
+BODY_PARTS = [
+    "head", "neck", "chest", "back", "stomach", "abdomen", "knee", "hip", "shoulder", "elbow",
+    "wrist", "ankle", "foot", "hand", "eye", "ear", "throat", "jaw", "skin", "lower back"
+]
+DESCRIPTORS = ["pain", "ache", "swelling", "stiffness", "numbness", "itching", "burning", "tingling", "cramps", "weakness"]
+MODIFIERS = ["", "", "mild ", "severe ", "sharp ", "dull ", "persistent ", "intermittent ", "left ", "right "]
+SEPARATORS = [", ", "; ", " and ", ", also ", " plus ", "\n"]
+PREFIXES = ["", "", "I have ", "I am experiencing ", "feeling ", "my symptoms are "]
+SUFFIXES = ["", "", " for 3 days", " since yesterday", " for about a week", " for 12 hours"]
+SEVERITIES = ["low", "medium", "high"]
+
+PERCENTILES = (50, 95, 99)
+
+
+def synthetic_vocabulary(db_manager: DatabaseManager, rng: random.Random) -> List[str]:
+    """Real symptom phrases from the seeded database plus generated ones"""
+    index = db_manager.get_condition_index()
+    vocabulary = set(db_manager.get_common_symptoms())
+    for symptoms in index.condition_symptoms:
+        vocabulary.update(symptoms)
+    for part in BODY_PARTS:
+        for descriptor in DESCRIPTORS:
+            vocabulary.add(f"{part} {descriptor}")
+    vocabulary = sorted(vocabulary)
+    rng.shuffle(vocabulary)
+    return vocabulary
+
+
+def populate_conditions(db_manager: DatabaseManager, size: int, vocabulary: List[str], rng: random.Random):
+    """Top the seeded conditions table up to `size` synthetic conditions"""
+    conn = db_manager.get_connection()
+    existing = conn.execute("SELECT COUNT(*) FROM conditions").fetchone()[0]
+    rows = []
+    for number in range(existing, size):
+        symptoms = rng.sample(vocabulary, rng.randint(3, 8))
+        rows.append((
+            f"Synthetic Condition {number}",
+            f"Synthetic condition {number} used for benchmarking",
+            ",".join(symptoms),
+            rng.choice(SEVERITIES)
+        ))
+    with conn:
+        conn.executemany(
+            "INSERT INTO conditions (name, description, symptoms, severity) VALUES (?, ?, ?, ?)", rows
+        )
+
+
+def synthetic_inputs(count: int, vocabulary: List[str], rng: random.Random) -> List[SymptomInput]:
+    """Free-text inputs of 1 to 12 symptoms with varied phrasing and demographics"""
+    inputs = []
+    for _ in range(count):
+        symptoms = [
+            rng.choice(MODIFIERS) + rng.choice(vocabulary)
+            for _ in range(rng.choice([1, 1, 2, 3, 3, 4, 5, 6, 8, 12]))
+        ]
+        text = symptoms[0]
+        for symptom in symptoms[1:]:
+            text += rng.choice(SEPARATORS) + symptom
+        inputs.append(SymptomInput(
+            symptoms=rng.choice(PREFIXES) + text + rng.choice(SUFFIXES),
+            age=rng.choice([None, 3, 25, 40, 70]),
+            gender=rng.choice([None, "male", "female"])
+        ))
+    return inputs
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean and percentiles of durations in seconds, reported in microseconds"""
+    ordered = sorted(samples)
+    summary = {"count": len(ordered), "mean_us": round(statistics.fmean(ordered) * 1e6, 2)}
+    for percentile in PERCENTILES:
+        position = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        summary[f"p{percentile}_us"] = round(ordered[position] * 1e6, 2)
+    return summary
+
+
+def time_call(func: Callable, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def time_stages(analyzer: EnhancedSymptomAnalyzer, symptom_input: SymptomInput, stages: Dict[str, List[float]]):
+    """Run the analyze_symptoms pipeline once, recording each stage's duration"""
+    clock = time.perf_counter
+
+    def record(stage: str, started: float) -> float:
+        now = clock()
+        stages[stage].append(now - started)
+        return now
+
+    started = clock()
+    extracted = analyzer._parse_symptom_input(symptom_input.symptoms)
+    started = record("parse", started)
+
+    matching_conditions = analyzer.db_manager.get_condition_index().get_conditions_by_symptoms(extracted)
+    started = record("condition_match", started)
+
+    pattern_hits = analyzer._scan_symptoms(extracted)
+    started = record("pattern_scan", started)
+
+    categories = analyzer._categorize_symptoms(extracted)
+    started = record("categorize", started)
+
+    severity = analyzer._assess_severity(extracted, symptom_input, pattern_hits)
+    started = record("severity", started)
+
+    risk_factors = analyzer._identify_risk_factors(symptom_input, extracted, pattern_hits)
+    symptom_analysis = SymptomAnalysis(
+        extracted_symptoms=extracted,
+        symptom_categories=categories,
+        severity_assessment=severity,
+        risk_factors=risk_factors
+    )
+    started = record("risk_factors", started)
+
+    possible_conditions = analyzer._get_detailed_conditions(matching_conditions, symptom_input)
+    started = record("condition_details", started)
+
+    recommendations = analyzer._generate_detailed_recommendations(symptom_analysis, possible_conditions, symptom_input)
+    general_advice = analyzer._generate_general_advice(symptom_analysis)
+    red_flags = analyzer._identify_red_flags(pattern_hits)
+    follow_up_questions = analyzer._generate_follow_up_questions(symptom_analysis, possible_conditions)
+    confidence_score = analyzer._calculate_confidence_score(extracted, possible_conditions, pattern_hits)
+    started = record("recommendations", started)
+
+    response = ComprehensiveResponse(
+        input_text=symptom_input.symptoms,
+        symptom_analysis=symptom_analysis,
+        possible_conditions=possible_conditions,
+        priority_recommendations=recommendations,
+        general_advice=general_advice,
+        red_flags=red_flags,
+        follow_up_questions=follow_up_questions,
+        confidence_score=confidence_score,
+        disclaimer=analyzer.disclaimer
+    )
+    started = record("response_build", started)
+
+    response_json(response)
+    record("serialization", started)
+
+
+def bench_kb_size(size: int, input_count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        vocabulary = synthetic_vocabulary(db_manager, rng)
+        populate_conditions(db_manager, size, vocabulary, rng)
+        inputs = synthetic_inputs(input_count, vocabulary, rng)
+
+        analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0)
+        index = db_manager.get_condition_index()
+
+        # Warm up lazily built state before timing anything
+        for symptom_input in inputs[:10]:
+            analyzer.analyze_symptoms(symptom_input)
+
+        stage_names = [
+            "parse", "condition_match", "pattern_scan", "categorize", "severity", "risk_factors",
+            "condition_details", "recommendations", "response_build", "serialization"
+        ]
+        stages: Dict[str, List[float]] = {name: [] for name in stage_names}
+        for symptom_input in inputs:
+            time_stages(analyzer, symptom_input, stages)
+
+        pipeline = {
+            "analyze_symptoms": summarize([
+                sample for symptom_input in inputs
+                for sample in time_call(lambda: analyzer.analyze_symptoms(symptom_input), 1)
+            ])
+        }
+        batch_samples = time_call(lambda: analyzer.analyze_symptoms_batch(inputs), 3)
+        pipeline["analyze_symptoms_batch_per_input"] = summarize([sample / len(inputs) for sample in batch_samples])
+
+        results = [analyzer.analyze_symptoms(symptom_input) for symptom_input in inputs]
+        analyses = list(zip(inputs, results))
+        database = {
+            "index_build": summarize(time_call(lambda: db_manager._build_condition_index(index.version), 5)),
+            "kb_version_read": summarize(time_call(db_manager.get_kb_version, 200)),
+            "get_all_conditions": summarize(time_call(db_manager.get_all_conditions, 20)),
+            "get_common_symptoms": summarize(time_call(db_manager.get_common_symptoms, 200)),
+            "store_single": summarize(time_call(
+                lambda: db_manager.store_symptom_analysis(*analyses[rng.randrange(len(analyses))]), 200
+            )),
+            "store_batch_per_row": summarize([
+                sample / len(analyses)
+                for sample in time_call(lambda: db_manager.store_symptom_analyses(analyses), 5)
+            ]),
+            "analysis_statistics": summarize(time_call(db_manager.get_analysis_statistics, 20))
+        }
+
+        db_manager.close()
+
+    return {
+        "conditions": len(index.names),
+        "phrases": len(index.fuzzy),
+        "inputs": len(inputs),
+        "stages": {name: summarize(samples) for name, samples in stages.items()},
+        "pipeline": pipeline,
+        "database": database
+    }
+
+
+def environment(seed: int, input_count: int) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "inputs": input_count
+    }
+
+
+def iter_metrics(report: dict):
+    """(kb size, group, metric, summary) for every metric in a report"""
+    for size, result in report["results"].items():
+        for group in ("stages", "pipeline", "database"):
+            for metric, summary in result[group].items():
+                yield size, group, metric, summary
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print p50 changes against a baseline report; returns the number of regressions"""
+    base = {(size, group, metric): summary for size, group, metric, summary in iter_metrics(baseline)}
+    regressions = 0
+
+    print(f"\nComparison against {baseline['environment'].get('commit')} (p50, regression above +{threshold:.0%})")
+    for size, group, metric, summary in iter_metrics(current):
+        previous = base.get((size, group, metric))
+        if not previous or not previous["p50_us"]:
+            continue
+        change = summary["p50_us"] / previous["p50_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  kb={size:<6} {group:<9} {metric:<34} {previous['p50_us']:>10.1f} -> "
+              f"{summary['p50_us']:>10.1f} us  {change:+7.1%}{flag}")
+    return regressions
+
+
+def print_report(report: dict):
+    for size, result in report["results"].items():
+        print(f"\nKB size {size}: {result['conditions']} conditions, {result['phrases']} phrases, "
+              f"{result['inputs']} inputs")
+        for group in ("stages", "pipeline", "database"):
+            for metric, summary in result[group].items():
+                print(f"  {group:<9} {metric:<34} mean {summary['mean_us']:>10.1f} us   "
+                      f"p50 {summary['p50_us']:>10.1f}   p95 {summary['p95_us']:>10.1f}   p99 {summary['p99_us']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the symptom analysis pipeline")
+    parser.add_argument("--kb-sizes", default=",".join(str(size) for size in DEFAULT_KB_SIZES),
+                        help="comma-separated condition counts to benchmark")
+    parser.add_argument("--inputs", type=int, default=300, help="synthetic inputs per KB size")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative p50 slowdown counted as a regression")
+    args = parser.parse_args()
+
+    kb_sizes = [int(size) for size in args.kb_sizes.split(",") if size.strip()]
+    report = {
+        "environment": environment(args.seed, args.inputs),
+        "results": {str(size): bench_kb_size(size, args.inputs, args.seed) for size in kb_sizes}
+    }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
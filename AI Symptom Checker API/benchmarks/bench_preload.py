@@ -0,0 +1,125 @@
+"""
+Benchmark: worker memory and startup time with and without preloading
+
+A synthetic knowledge base is compiled to a snapshot, then the same number
+of worker processes is forked twice:
+
+- per-worker: every worker builds its own DatabaseManager and analyzer
+  and warms up after the fork, as without PRELOAD_ANALYZER
+- preload: the parent builds and preloads once (preload.preload), and the
+  workers only run analyses on the inherited state
+
+Each worker serves a few analyses and reports its private memory (pages
+not shared with any other process), its proportional set size (PSS:
+shared pages divided among the processes sharing them), and the time
+from fork until it was ready. Linux only (reads /proc/self/smaps_rollup).
+
+Run from the project directory:
+    python benchmarks/bench_preload.py [--conditions 20000] [--workers 4]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from models import SymptomInput
+from preload import preload, warm_up
+from symptom_checker import EnhancedSymptomAnalyzer
+from synthetic_kb import write_knowledge_base
+
+REQUESTS = ["knee pain and ankle swelling", "fever, headache, cough", "chest burning; back ache",
+            "eye redness and itching", "stomach cramps for 2 days"]
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"private": fields["Private_Clean"] + fields["Private_Dirty"], "pss": fields["Pss"]}
+
+
+def worker(db_path: str, snapshot_path: str, state, forked: float, report_fd: int):
+    if state is None:
+        db_manager = DatabaseManager(db_path, kb_snapshot=snapshot_path)
+        analyzer = EnhancedSymptomAnalyzer(db_manager)
+        warm_up(db_manager, analyzer)
+    else:
+        db_manager, analyzer = state
+    ready = time.perf_counter() - forked
+
+    for symptoms in REQUESTS * 20:
+        analyzer.analyze_symptoms(SymptomInput(symptoms=symptoms))
+    db_manager.close()
+
+    report = dict(memory_kb(), ready_ms=ready * 1e3)
+    os.write(report_fd, (json.dumps(report) + "\n").encode())
+
+
+def run_workers(count: int, db_path: str, snapshot_path: str, state) -> list:
+    read_fd, write_fd = os.pipe()
+    children = []
+    for _ in range(count):
+        forked = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                worker(db_path, snapshot_path, state, forked, write_fd)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    # Wait for every report before any worker exits, so shared pages stay shared
+    os.close(write_fd)
+    with os.fdopen(read_fd) as reader:
+        reports = [json.loads(line) for line in reader]
+    for pid in children:
+        os.waitpid(pid, 0)
+    return reports
+
+
+def summarize(name: str, reports: list):
+    count = len(reports)
+    private = sum(report["private"] for report in reports) / count / 1024
+    pss = sum(report["pss"] for report in reports) / 1024
+    ready = sum(report["ready_ms"] for report in reports) / count
+    print(f"  {name:<11} private {private:7.1f} MB/worker   PSS {pss:7.1f} MB total   ready {ready:8.1f} ms/worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preloaded analyzer state across forked workers")
+    parser.add_argument("--conditions", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "kb.snapshot")
+        db_path = os.path.join(tmp, "bench.db")
+        write_knowledge_base(snapshot_path, args.conditions, random.Random(1234))
+
+        # Create the schema once so workers do not race to create it
+        db_manager = DatabaseManager(db_path)
+        db_manager.initialize_database()
+        db_manager.close()
+
+        print(f"{args.workers} workers, {args.conditions} conditions")
+        summarize("per-worker", run_workers(args.workers, db_path, snapshot_path, None))
+
+        db_manager = DatabaseManager(db_path, kb_snapshot=snapshot_path)
+        analyzer = EnhancedSymptomAnalyzer(db_manager)
+        seconds = preload(db_manager, analyzer)
+        print(f"  (preloaded once in the parent in {seconds * 1e3:.0f} ms)")
+        summarize("preload", run_workers(args.workers, db_path, snapshot_path, (db_manager, analyzer)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: ranking quality and latency of each scoring mode
+
+Builds a synthetic condition index whose symptom phrases follow a skewed
+(Zipf-like) frequency, so a few symptoms are shared by many conditions,
+like "fatigue" or "fever", and most are distinctive. Each query is drawn
+from one target condition: some of its symptoms, padded with common
+symptoms it may not have, as a patient would list them.
+
+For every scoring mode in ranking.RANKERS it reports how often the target
+is ranked first and within the top 4 (the conditions a response details),
+and the latency of ranking a single query (top 4, and the full ranking)
+and of a batch.
+
+Run from the project directory:
+    python benchmarks/bench_ranking.py [--conditions 10000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import RANKERS
+from symptom_index import ConditionIndex
+
+BODY_PARTS = ["head", "neck", "chest", "back", "stomach", "knee", "hip", "shoulder", "wrist", "ankle",
+              "foot", "hand", "eye", "ear", "throat", "jaw", "skin", "elbow", "abdomen", "lower back"]
+DESCRIPTORS = ["pain", "ache", "swelling", "stiffness", "numbness", "itching", "burning", "tingling",
+               "cramps", "weakness", "redness", "tenderness"]
+MODIFIERS = ["", "mild ", "sharp ", "chronic ", "sudden "]
+COMMON_SYMPTOMS = ["fatigue", "fever", "nausea", "dizziness", "chills", "loss of appetite"]
+
+TOP_K = 4
+
+
+def build_index(size: int, rng: random.Random):
+    vocabulary = COMMON_SYMPTOMS + [
+        f"{modifier}{part} {descriptor}" for modifier in MODIFIERS for part in BODY_PARTS for descriptor in DESCRIPTORS
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rows = []
+    for number in range(size):
+        symptoms = set()
+        wanted = rng.randint(3, 8)
+        while len(symptoms) < wanted:
+            symptoms.add(rng.choices(vocabulary, weights)[0])
+        rows.append((number + 1, f"Synthetic Condition {number}", "Synthetic condition",
+                     ",".join(sorted(symptoms)), rng.choice(["low", "medium", "high"])))
+    return ConditionIndex(rows, 1)
+
+
+def make_queries(index: ConditionIndex, count: int, rng: random.Random):
+    queries = []
+    for _ in range(count):
+        position = rng.randrange(len(index))
+        symptoms = index.condition_symptoms[position]
+        query = rng.sample(symptoms, max(1, len(symptoms) // 2))
+        query += rng.sample(COMMON_SYMPTOMS, rng.randint(0, 2))
+        queries.append((index.condition_ids[position], list(dict.fromkeys(query))))
+    return queries
+
+
+def timed(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run(index: ConditionIndex, queries: list, mode: str) -> dict:
+    ranker = index.ranker(mode)
+    first = top = 0
+    for target, symptoms in queries:
+        ranked = [match["id"] for match in ranker.rank([symptoms], TOP_K)[0]]
+        first += bool(ranked) and ranked[0] == target
+        top += target in ranked
+
+    symptom_lists = [symptoms for _, symptoms in queries]
+    single = [timed(lambda: ranker.rank([symptoms], TOP_K), 3) for symptoms in symptom_lists]
+    full = [timed(lambda: ranker.rank([symptoms]), 3) for symptoms in symptom_lists]
+    batch = timed(lambda: ranker.rank(symptom_lists, TOP_K), 3)
+    return {
+        "top1": first / len(queries),
+        "top4": top / len(queries),
+        "single": statistics.median(single),
+        "full": statistics.median(full),
+        "batch": batch / len(queries)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ranking quality and latency per scoring mode")
+    parser.add_argument("--conditions", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    index = build_index(args.conditions, rng)
+    queries = make_queries(index, args.queries, rng)
+
+    print(f"{args.conditions} conditions, {len(index.phrase_conditions)} phrases, {len(queries)} queries")
+    for mode in RANKERS:
+        # Symptom contributions are memoized per ranker; warm them up so runs compare ranking cost
+        index.ranker(mode).rank([symptoms for _, symptoms in queries])
+        result = run(index, queries, mode)
+        print(f"  {mode:<10} top-1 {result['top1']:6.1%}  top-{TOP_K} {result['top4']:6.1%}   "
+              f"single p50 {result['single'] * 1e6:8.1f} us  full ranking {result['full'] * 1e6:8.1f} us  "
+              f"batch {result['batch'] * 1e6:8.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark: per-request cost of recommendation and advice generation,
+rebuilding pydantic objects from literals vs pre-built templates
+
+Run from the project directory:
+    python benchmarks/bench_recommendations.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from models import DetailedRecommendation, RecommendationType, SeverityLevel, SymptomAnalysis, SymptomInput
+from symptom_checker import EnhancedSymptomAnalyzer
+
+ITERATIONS = 5000
+
+INPUTS = [
+    "fever, headache, cough",
+    "nausea and vomiting",
+    "runny nose; sneezing; sore throat",
+    "sharp back pain",
+    "tired",
+]
+
+
+def legacy_recommendations(symptom_analysis: SymptomAnalysis) -> List[DetailedRecommendation]:
+    """Original per-request construction, kept for comparison"""
+    recommendations = []
+    if symptom_analysis.severity_assessment == SeverityLevel.CRITICAL:
+        return [DetailedRecommendation(
+            type=RecommendationType.EMERGENCY,
+            title="Seek Immediate Emergency Care",
+            message="Your symptoms indicate a potentially serious condition that requires immediate medical attention.",
+            urgency=SeverityLevel.CRITICAL,
+            action_steps=["Call emergency services (911) immediately", "Do not drive yourself to the hospital",
+                          "Have someone stay with you", "Bring a list of current medications"],
+            timeframe="Immediately",
+            warning_signs=["Worsening symptoms", "Loss of consciousness", "Severe difficulty breathing"]
+        )]
+    if symptom_analysis.severity_assessment == SeverityLevel.HIGH:
+        recommendations.append(DetailedRecommendation(
+            type=RecommendationType.CONSULT_DOCTOR,
+            title="Schedule Urgent Medical Consultation",
+            message="Your symptoms require prompt medical evaluation to rule out serious conditions.",
+            urgency=SeverityLevel.HIGH,
+            action_steps=["Contact your healthcare provider today", "If unavailable, visit urgent care center",
+                          "Prepare a detailed symptom timeline", "List all current medications and allergies"],
+            timeframe="Within 24 hours",
+            warning_signs=["Symptoms getting worse", "New symptoms developing", "Difficulty performing daily activities"]
+        ))
+    elif symptom_analysis.severity_assessment == SeverityLevel.MEDIUM:
+        recommendations.append(DetailedRecommendation(
+            type=RecommendationType.CONSULT_DOCTOR,
+            title="Schedule Medical Consultation",
+            message="Your symptoms warrant medical evaluation to ensure proper diagnosis and treatment.",
+            urgency=SeverityLevel.MEDIUM,
+            action_steps=["Schedule appointment with your healthcare provider", "Monitor symptoms and note any changes",
+                          "Keep a symptom diary", "Prepare questions for your doctor"],
+            timeframe="Within 2-3 days",
+            warning_signs=["Symptoms persist beyond expected timeframe", "New symptoms appear",
+                           "Symptoms interfere with daily life"]
+        ))
+
+    action_steps = ["Get adequate rest (7-9 hours of sleep)", "Stay well hydrated (8-10 glasses of water daily)",
+                    "Eat nutritious, easily digestible foods"]
+    if "respiratory" in symptom_analysis.symptom_categories:
+        action_steps.extend(["Use a humidifier or breathe steam from hot shower",
+                             "Avoid irritants like smoke and strong odors",
+                             "Consider honey for cough relief (if over 1 year old)"])
+    if "gastrointestinal" in symptom_analysis.symptom_categories:
+        action_steps.extend(["Follow BRAT diet (bananas, rice, applesauce, toast)",
+                             "Avoid dairy, fatty, and spicy foods temporarily",
+                             "Consider probiotics to restore gut health"])
+    if "general" in symptom_analysis.symptom_categories and any("fever" in s for s in symptom_analysis.extracted_symptoms):
+        action_steps.extend(["Monitor temperature regularly", "Use fever-reducing medication as directed",
+                             "Wear light, breathable clothing"])
+    recommendations.append(DetailedRecommendation(
+        type=RecommendationType.SELF_CARE,
+        title="Self-Care and Home Management",
+        message="These self-care measures can help manage your symptoms and support recovery.",
+        urgency=SeverityLevel.LOW,
+        action_steps=action_steps,
+        timeframe="Start immediately and continue as needed",
+        warning_signs=["Symptoms worsen despite self-care", "New concerning symptoms develop"]
+    ))
+    recommendations.append(DetailedRecommendation(
+        type=RecommendationType.MONITORING,
+        title="Symptom Monitoring and Tracking",
+        message="Careful monitoring of your symptoms will help track progress and identify any concerning changes.",
+        urgency=SeverityLevel.LOW,
+        action_steps=["Keep a daily symptom diary with severity ratings", "Note any triggers or patterns you observe",
+                      "Track temperature if fever is present", "Record any new symptoms that develop",
+                      "Note response to any treatments or medications"],
+        timeframe="Daily until symptoms resolve",
+        warning_signs=["Symptoms suddenly worsen", "High fever (over 103°F/39.4°C)",
+                       "Difficulty breathing or chest pain", "Severe dehydration signs"]
+    ))
+    return recommendations
+
+
+def legacy_general_advice(symptom_analysis: SymptomAnalysis) -> List[str]:
+    advice = [
+        "Maintain good hygiene by washing hands frequently",
+        "Avoid close contact with others if you feel unwell",
+        "Listen to your body and rest when needed",
+        "Stay connected with family or friends for support"
+    ]
+    if symptom_analysis.severity_assessment in [SeverityLevel.MEDIUM, SeverityLevel.HIGH]:
+        advice.append("Consider having someone check on you regularly")
+        advice.append("Keep emergency contact numbers easily accessible")
+    return advice
+
+
+def measure(label: str, generate, analyses: List[SymptomAnalysis]):
+    # CPU time
+    start = time.process_time()
+    for i in range(ITERATIONS):
+        generate(analyses[i % len(analyses)])
+    cpu_us = (time.process_time() - start) / ITERATIONS * 1e6
+
+    # Bytes allocated per call
+    tracemalloc.start()
+    kept = []
+    baseline, _ = tracemalloc.get_traced_memory()
+    for i in range(1000):
+        kept.append(generate(analyses[i % len(analyses)]))
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<10} {cpu_us:8.2f} us/request  {(allocated - baseline) / 1000:9.0f} bytes/request")
+    return cpu_us
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Categorizing misspelt symptoms needs the seeded condition index
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        run(EnhancedSymptomAnalyzer(db_manager))
+        db_manager.close()
+
+
+def run(analyzer: EnhancedSymptomAnalyzer):
+    analyses = []
+    for text in INPUTS:
+        symptoms = analyzer._parse_symptom_input(text)
+        hits = analyzer._scan_symptoms(symptoms)
+        symptom_input = SymptomInput(symptoms=text)
+        analyses.append(SymptomAnalysis(
+            extracted_symptoms=symptoms,
+            symptom_categories=analyzer._categorize_symptoms(symptoms),
+            severity_assessment=analyzer._assess_severity(symptoms, symptom_input, hits),
+            risk_factors=[]
+        ))
+
+    def legacy(symptom_analysis):
+        return legacy_recommendations(symptom_analysis), legacy_general_advice(symptom_analysis)
+
+    def templates(symptom_analysis):
+        return (analyzer._generate_detailed_recommendations(symptom_analysis, [], None),
+                analyzer._generate_general_advice(symptom_analysis))
+
+    for symptom_analysis in analyses:
+        assert [r.model_dump() for r in legacy(symptom_analysis)[0]] == \
+               [r.model_dump() for r in templates(symptom_analysis)[0]]
+
+    print(f"Recommendation and advice generation, {ITERATIONS} requests")
+    before = measure("legacy", legacy, analyses)
+    after = measure("templates", templates, analyses)
+    print(f"speedup    {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
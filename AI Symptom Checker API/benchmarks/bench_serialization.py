@@ -0,0 +1,126 @@
+"""
+Benchmark: response serialization, response_model path versus a single
+serialization pass
+
+Analyses are computed once up front. Two FastAPI routes then return them
+through the full ASGI stack (called directly, without an HTTP client):
+
+- response_model: the endpoint returns the ComprehensiveResponse and
+  FastAPI validates and serializes it again, then storage serializes it
+  a second time with model_dump_json
+- single pass: response_json serializes it once and the same bytes are
+  returned and handed to storage
+
+Also checks that both paths produce the same JSON document.
+
+Run from the project directory:
+    python benchmarks/bench_serialization.py [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Response
+
+from database import DatabaseManager
+from models import ComprehensiveResponse, SymptomInput, response_json
+from symptom_checker import EnhancedSymptomAnalyzer
+
+INPUTS = [
+    SymptomInput(symptoms="fever, headache, cough for 3 days", age=30),
+    SymptomInput(symptoms="nausea and vomiting"),
+    SymptomInput(symptoms="runny nose; sneezing; sore throat", age=70),
+    SymptomInput(symptoms="chest pain and shortness of breath"),
+    SymptomInput(symptoms="I have been feeling tired and have a runny nose"),
+]
+
+
+def build_app(results, stored: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model/{n}", response_model=ComprehensiveResponse)
+    async def response_model_path(n: int):
+        result = results[n]
+        stored.append(result.model_dump_json())
+        return result
+
+    @app.get("/single-pass/{n}", response_model=ComprehensiveResponse)
+    async def single_pass_path(n: int):
+        document = response_json(results[n])
+        stored.append(document)
+        return Response(content=document, media_type="application/json")
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def run(app: FastAPI, route: str, requests: int, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await request(app, f"/{route}/{i % count}")
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis response serialization")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db_manager.initialize_database()
+        results = [EnhancedSymptomAnalyzer(db_manager).analyze_symptoms(i) for i in INPUTS]
+        db_manager.close()
+
+    stored: list = []
+    app = build_app(results, stored)
+    loop = asyncio.new_event_loop()
+
+    for n in range(len(results)):
+        old = loop.run_until_complete(request(app, f"/response-model/{n}"))
+        new = loop.run_until_complete(request(app, f"/single-pass/{n}"))
+        assert json.loads(old) == json.loads(new), "paths returned different documents"
+        assert stored[-1] == stored[-2].encode(), "paths stored different documents"
+
+    timings = {"response-model": [], "single-pass": []}
+    for _ in range(args.rounds):
+        for route in timings:
+            stored.clear()
+            timings[route].append(loop.run_until_complete(run(app, route, args.requests, len(results))))
+    loop.close()
+
+    size = sum(len(response_json(result)) for result in results) / len(results)
+    baseline = min(timings["response-model"])
+    print(f"{args.requests} requests x {args.rounds} rounds, {size:.0f} byte responses (best round)")
+    for route, samples in timings.items():
+        per_request = min(samples)
+        print(f"  {route:<15} {per_request * 1e6:8.1f} us/request  {per_request / baseline - 1:+7.1%}")
+
+
+if __name__ == "__main__":
+    main()
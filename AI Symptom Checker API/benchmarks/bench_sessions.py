@@ -0,0 +1,90 @@
+"""
+Benchmark: follow-up answers through a session vs. resubmitting everything
+
+A synthetic knowledge base is compiled to a snapshot. Each round starts a
+session with a few symptoms, then answers follow-up questions one at a
+time: add a symptom, add another, remove one, change the age. Every answer
+is timed twice:
+
+- session: SessionStore.follow_up, which only scans, categorizes and
+  rescores what the answer changed
+- resubmit: analyze_symptoms on the session's full current input, as a
+  client without sessions would do (result cache disabled)
+
+Both produce the same analysis; this checks that too.
+
+Run from the project directory:
+    python benchmarks/bench_sessions.py [--conditions 10000] [--rounds 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from models import FollowUpInput, SymptomInput, response_json
+from sessions import SessionStore
+from symptom_checker import EnhancedSymptomAnalyzer
+from synthetic_kb import VOCABULARY, write_knowledge_base
+
+EXTRA_SYMPTOMS = ["fever", "fatigue", "nausea", "dizziness", "headahce", "light sensitivity"]
+
+
+def follow_ups(rng: random.Random, vocabulary: list) -> list:
+    first, second = rng.sample(vocabulary + EXTRA_SYMPTOMS, 2)
+    return [
+        ("add", FollowUpInput(add_symptoms=first)),
+        ("add", FollowUpInput(add_symptoms=second)),
+        ("remove", FollowUpInput(remove_symptoms=first)),
+        ("context", FollowUpInput(age=rng.choice([3, 70])))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session follow-ups against full re-analysis")
+    parser.add_argument("--conditions", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "kb.snapshot")
+        write_knowledge_base(snapshot_path, args.conditions, rng)
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"), kb_snapshot=snapshot_path)
+        db_manager.initialize_database()
+        analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0)
+        store = SessionStore(analyzer)
+
+        timings = {}
+        mismatches = 0
+        for _ in range(args.rounds):
+            symptoms = rng.sample(VOCABULARY, 4) + rng.sample(EXTRA_SYMPTOMS, 1)
+            analysis = store.start(SymptomInput(symptoms=", ".join(symptoms), age=40))
+            for kind, follow_up in follow_ups(rng, VOCABULARY):
+                started = time.perf_counter()
+                analysis = store.follow_up(analysis.session_id, follow_up)
+                session_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                fresh = analyzer.analyze_symptoms(analysis.symptom_input)
+                resubmit_seconds = time.perf_counter() - started
+
+                mismatches += response_json(fresh) != response_json(analysis.response)
+                timings.setdefault(kind, ([], []))
+                timings[kind][0].append(session_seconds)
+                timings[kind][1].append(resubmit_seconds)
+        db_manager.close()
+
+    print(f"{args.conditions} conditions, {args.rounds} sessions, {mismatches} mismatched analyses")
+    for kind, (session, resubmit) in timings.items():
+        print(f"  {kind:<8} session p50 {statistics.median(session) * 1e6:8.1f} us   "
+              f"resubmit p50 {statistics.median(resubmit) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Synthetic conditions shared by the benchmarks: the symptom vocabulary, and
+a writer for benchmarks that load conditions from a compiled snapshot (see
+knowledge_base.py).
+
+Not a benchmark itself: import it from a script under benchmarks/.
+"""
+import random
+
+from knowledge_base import KnowledgeBase, make_record, write_snapshot
+
+BODY_PARTS = ["head", "neck", "chest", "back", "stomach", "knee", "hip", "shoulder", "wrist", "ankle",
+              "foot", "hand", "eye", "ear", "throat", "jaw", "skin", "elbow", "abdomen", "lower back"]
+DESCRIPTORS = ["pain", "ache", "swelling", "stiffness", "numbness", "itching", "burning", "tingling",
+               "cramps", "weakness", "redness", "tenderness"]
+
+# Every "<body part> <descriptor>" symptom phrase
+VOCABULARY = [f"{part} {descriptor}" for part in BODY_PARTS for descriptor in DESCRIPTORS]
+
+
+def write_knowledge_base(path: str, size: int, rng: random.Random):
+    """Compile a snapshot of `size` conditions with 3-8 symptoms from VOCABULARY each"""
+    knowledge_base = KnowledgeBase()
+    for number in range(size):
+        knowledge_base.add_condition(make_record({
+            "name": f"Synthetic Condition {number}",
+            "description": f"Synthetic condition {number} used for benchmarking",
+            "symptoms": ",".join(rng.sample(VOCABULARY, rng.randint(3, 8))),
+            "severity": rng.choice(["low", "medium", "high"]),
+            "typical_duration": f"{rng.randint(1, 14)} days",
+            "self_care_tips": "Rest|Stay hydrated|Monitor symptoms"
+        }, f"condition {number}"))
+    write_snapshot(knowledge_base, path)
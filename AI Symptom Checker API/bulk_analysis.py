@@ -0,0 +1,276 @@
+"""
+Streaming bulk analysis for CSV and NDJSON uploads.
+
+Rows are parsed incrementally from the request body, analyzed in small
+batches on the analysis pool and streamed back as NDJSON in input order.
+Only a fixed number of batches is ever in flight, and the next chunk of
+the body is not read until the client has taken the results before it,
+so memory stays bounded however large the upload is.
+"""
+import asyncio
+import codecs
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from models import SymptomInput, response_json
+from analysis_pool import AnalysisPool, PoolOverloaded
+
+# Content types accepted by the bulk endpoint, mapped to their row format
+BULK_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+INPUT_FIELDS = ("symptoms", "age", "gender", "additional_info")
+
+# A parsed row: (row number, input) or (row number, error message)
+BulkRow = Tuple[int, Union[SymptomInput, str]]
+
+
+class BulkInputError(ValueError):
+    """Raised when a bulk upload cannot be parsed at all"""
+
+
+class BulkRowReader:
+    """
+    Incremental CSV/NDJSON row parser over a stream of body chunks.
+
+    Rows are numbered from 1, not counting the CSV header or blank lines.
+    Rows that fail to parse or validate are yielded as error messages so
+    one bad line does not abort the whole upload.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], row_format: str, max_record_size: int = 65536):
+        if row_format not in ("csv", "ndjson"):
+            raise BulkInputError(f"Unsupported bulk format: {row_format}")
+
+        self.row_format = row_format
+        self.max_record_size = max_record_size
+        self.header: Optional[List[str]] = None
+        self._records = self._iter_records(chunks)
+
+    async def _iter_lines(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+        """Decoded lines without their line endings, oversized lines as None"""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        pending = ""
+        oversized = False
+
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield None if oversized else line.rstrip("\r")
+                oversized = False
+            if len(pending) > self.max_record_size:
+                pending = ""
+                oversized = True
+
+        pending += decoder.decode(b"", final=True)
+        if oversized:
+            yield None
+        elif pending:
+            yield pending.rstrip("\r")
+
+    async def _iter_records(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+        """Complete records; a CSV record continues while a quoted field is open"""
+        record: List[str] = []
+        record_size = 0
+
+        async for line in self._iter_lines(chunks):
+            if line is None:
+                record, record_size = [], 0
+                yield None
+                continue
+
+            if self.row_format == "ndjson":
+                yield line
+                continue
+
+            record.append(line)
+            record_size += len(line)
+            if record_size > self.max_record_size:
+                record, record_size = [], 0
+                yield None
+            elif sum(part.count('"') for part in record) % 2 == 0:
+                yield "\n".join(record)
+                record, record_size = [], 0
+
+        if record:
+            yield "\n".join(record)
+
+    async def start(self):
+        """Read the CSV header, raising BulkInputError if it is unusable"""
+        if self.row_format != "csv" or self.header is not None:
+            return
+
+        async for record in self._records:
+            if record is None:
+                raise BulkInputError("CSV header exceeds the maximum record size")
+            if record.strip():
+                self.header = [name.strip().lower() for name in next(csv.reader([record]))]
+                break
+
+        if self.header is None:
+            raise BulkInputError("CSV upload is empty")
+        if "symptoms" not in self.header:
+            raise BulkInputError("CSV header must include a 'symptoms' column")
+
+    def _parse(self, record: str) -> Union[SymptomInput, str]:
+        try:
+            if self.row_format == "ndjson":
+                fields = json.loads(record)
+                if isinstance(fields, str):
+                    fields = {"symptoms": fields}
+                elif not isinstance(fields, dict):
+                    return "Each line must be a JSON object or string"
+            else:
+                values = next(csv.reader([record]))
+                fields = {
+                    name: value for name, value in zip(self.header, values)
+                    if name in INPUT_FIELDS and value.strip()
+                }
+
+            symptom_input = SymptomInput.model_validate(
+                {name: value for name, value in fields.items() if name in INPUT_FIELDS}
+            )
+        except json.JSONDecodeError as e:
+            return f"Invalid JSON: {e.msg}"
+        except ValidationError as e:
+            return "Invalid row: " + "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+        except csv.Error as e:
+            return f"Invalid row: {e}"
+
+        if not symptom_input.symptoms or not symptom_input.symptoms.strip():
+            return "Symptom description is required. Please describe your symptoms."
+        return symptom_input
+
+    async def __aiter__(self) -> AsyncIterator[BulkRow]:
+        await self.start()
+
+        row_number = 0
+        async for record in self._records:
+            if record is not None and not record.strip():
+                continue
+            row_number += 1
+            if record is None:
+                yield row_number, f"Row exceeds {self.max_record_size} characters"
+            else:
+                yield row_number, self._parse(record)
+
+
+class BulkAnalysisStream:
+    """
+    Analyze parsed rows in batches on the analysis pool and yield NDJSON.
+
+    Each output line is {"row": n, "result": {...}} or {"row": n, "error": "..."}.
+    At most `window` batches are in flight at a time; when the pool is full
+    the stream waits for its own oldest batch instead of failing rows.
+    """
+
+    def __init__(self, rows: BulkRowReader, pool: AnalysisPool, analyzer, db_manager=None,
+                 batch_size: int = 64, window: int = 4, retry_delay: float = 0.05):
+        self.rows = rows
+        self.pool = pool
+        self.analyzer = analyzer
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size)
+        self.window = max(1, window)
+        self.retry_delay = retry_delay
+
+    async def _submit(self, batch: List[BulkRow], in_flight: Deque) -> AsyncIterator[bytes]:
+        """Queue a batch, yielding finished output while waiting for a pool slot"""
+        inputs = [row for _, row in batch if isinstance(row, SymptomInput)]
+        while True:
+            try:
+                future = self.pool.submit(self.analyzer.analyze_symptoms_batch, inputs) if inputs else None
+                break
+            except PoolOverloaded:
+                if in_flight:
+                    yield await self._collect(*in_flight.popleft())
+                else:
+                    await asyncio.sleep(self.retry_delay)
+        in_flight.append((batch, inputs, future))
+
+    async def _collect(self, batch: List[BulkRow], inputs: List[SymptomInput], future) -> bytes:
+        """Wait for a batch and render its output lines in row order"""
+        results: List = []
+        error = None
+        if future is not None:
+            try:
+                results = await asyncio.wrap_future(future)
+            except Exception as e:
+                error = f"Error analyzing symptoms: {e}"
+
+        # Serialized once, for the output lines and the stored payloads
+        documents = [response_json(result) for result in results]
+        outputs = iter(documents)
+
+        lines = []
+        for row_number, row in batch:
+            if not isinstance(row, SymptomInput):
+                lines.append(json.dumps({"row": row_number, "error": row}).encode())
+            elif error is not None:
+                lines.append(json.dumps({"row": row_number, "error": error}).encode())
+            else:
+                lines.append(b'{"row":%d,"result":%s}' % (row_number, next(outputs)))
+
+        if self.db_manager is not None and results:
+            try:
+                self.db_manager.store_symptom_analyses(list(zip(inputs, results)), documents)
+            except Exception as e:
+                # Don't fail the stream if storage fails
+                print(f"Warning: Could not store analyses: {e}")
+
+        return b"\n".join(lines) + b"\n"
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        in_flight: Deque = deque()
+        batch: List[BulkRow] = []
+
+        async for row in self.rows:
+            batch.append(row)
+            if len(batch) < self.batch_size:
+                continue
+
+            async for output in self._submit(batch, in_flight):
+                yield output
+            batch = []
+            while len(in_flight) >= self.window:
+                yield await self._collect(*in_flight.popleft())
+
+        if batch:
+            async for output in self._submit(batch, in_flight):
+                yield output
+        while in_flight:
+            yield await self._collect(*in_flight.popleft())
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming NDJSON response for handlers that keep reading the request body.
+
+    StreamingResponse normally listens on receive() for a disconnect, which
+    would swallow body chunks the stream still has to parse; here the body
+    iterator owns receive() and a disconnect surfaces from request.stream().
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except ClientDisconnect:
+            return
+        if self.background is not None:
+            await self.background()
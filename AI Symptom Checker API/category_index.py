@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+from pattern_matcher import MultiPatternMatcher
+
+
+class CategoryIndex:
+    """
+    Body-system category lookup over category phrases, built once.
+
+    A symptom belongs to a category when one of the category's phrases
+    occurs in the symptom, or the symptom occurs in one of its phrases.
+    When several categories qualify, the one registered first wins.
+    Phrases occurring in the symptom are found with one automaton scan,
+    and phrases containing the symptom through trigram postings, so a
+    lookup does not walk every phrase of every category. Results are
+    remembered for up to memo_size distinct symptoms.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], memo_size: int = 4096):
+        # Category names in registration order; a category's rank is its position
+        self.categories: List[str] = list(categories)
+        self.ranks: Dict[str, int] = {category: rank for rank, category in enumerate(self.categories)}
+
+        # Phrase -> rank of the first category listing it
+        self.phrase_ranks: Dict[str, int] = {}
+        for rank, phrases in enumerate(categories.values()):
+            for phrase in phrases:
+                self.phrase_ranks.setdefault(phrase.lower(), rank)
+
+        self.matcher = MultiPatternMatcher(
+            {category: [phrase.lower() for phrase in phrases] for category, phrases in categories.items()}
+        )
+
+        # Trigram -> phrases containing it, to find the phrases that contain a symptom
+        self.phrase_trigrams: Dict[str, Set[str]] = {}
+        for phrase in self.phrase_ranks:
+            for trigram in self._trigrams(phrase):
+                self.phrase_trigrams.setdefault(trigram, set()).add(phrase)
+
+        # Symptom -> category (or None); emptied when full, symptom vocabularies are small
+        self.memo_size = memo_size
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.phrase_ranks)
+
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def category_for(self, symptom_lower: str) -> Optional[str]:
+        """Best ranked category with a phrase matching the (lowercase) symptom"""
+        try:
+            return self._memo[symptom_lower]
+        except KeyError:
+            pass
+
+        category = self._lookup(symptom_lower)
+        if len(self._memo) >= self.memo_size:
+            self._memo = {}
+        self._memo[symptom_lower] = category
+        return category
+
+    def _lookup(self, symptom_lower: str) -> Optional[str]:
+        best = self.phrase_ranks.get(symptom_lower, len(self.categories))
+        if best == 0:
+            return self.categories[0]
+
+        # Families are registered in category order, so the first family found
+        # is the best ranked category with a phrase inside the symptom
+        family = self.matcher.first_family(symptom_lower)
+        if family is not None:
+            best = min(best, self.ranks[family])
+
+        for phrase in self._phrases_containing(symptom_lower):
+            best = min(best, self.phrase_ranks[phrase])
+
+        return self.categories[best] if best < len(self.categories) else None
+
+    def _phrases_containing(self, text: str) -> List[str]:
+        """Category phrases that contain text as a substring"""
+        if len(text) < 3:
+            return [phrase for phrase in self.phrase_ranks if text in phrase]
+
+        postings = []
+        for trigram in self._trigrams(text):
+            phrases = self.phrase_trigrams.get(trigram)
+            if not phrases:
+                return []
+            postings.append(phrases)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for phrases in postings[1:]:
+            candidates &= phrases
+            if not candidates:
+                return []
+        return [phrase for phrase in candidates if text in phrase]
+
+    def order(self, categorized: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Categorized symptoms in category order; categories not registered here keep their order, last"""
+        unranked = len(self.categories)
+        return dict(sorted(categorized.items(), key=lambda item: self.ranks.get(item[0], unranked)))
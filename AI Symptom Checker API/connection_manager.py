@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+
+class ConnectionManager:
+    """
+    Persistent, per-thread sqlite connections for one database file.
+
+    Every thread gets its own long-lived connection in WAL mode, so readers
+    never block the background writer and each connection keeps its
+    prepared-statement cache warm. Use ConnectionManager.for_path to share
+    one manager per database file across the process.
+    """
+
+    # Applied to every new connection
+    PRAGMAS = (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", "-16000"),       # 16 MB page cache
+        ("mmap_size", "268435456"),     # 256 MB memory-mapped I/O
+        ("temp_store", "MEMORY"),
+        ("busy_timeout", "5000"),
+    )
+
+    # Prepared statements kept per connection
+    CACHED_STATEMENTS = 256
+
+    _managers: Dict[str, "ConnectionManager"] = {}
+    _managers_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "ConnectionManager":
+        """Get the process-wide connection manager for a database file"""
+        key = os.path.abspath(db_path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls(db_path)
+                cls._managers[key] = manager
+            return manager
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        # Thread ident -> connection, so connections of finished threads can be closed
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        # Connections inherited from a parent process across fork, never used
+        self._inherited: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._open()
+            self._local.connection = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.CACHED_STATEMENTS
+        )
+        for pragma, value in self.PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}={value}")
+
+        with self._lock:
+            self._close_stale(self._connections.pop(threading.get_ident(), None))
+            alive = {thread.ident for thread in threading.enumerate()}
+            for ident in [ident for ident in self._connections if ident not in alive]:
+                self._close_stale(self._connections.pop(ident))
+            self._connections[threading.get_ident()] = conn
+            self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _close_stale(conn):
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        Drop connections inherited from the parent process. They must not be
+        used, or even closed, in the child, so they are only kept referenced.
+        """
+        cls._managers_lock = threading.Lock()
+        for manager in cls._managers.values():
+            manager._inherited.extend(manager._connections.values())
+            manager._connections = {}
+            manager._local = threading.local()
+            manager._lock = threading.Lock()
+
+    def close_all(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+        for conn in connections:
+            self._close_stale(conn)
+        self._local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ConnectionManager._after_fork_in_child)
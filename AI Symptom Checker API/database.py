@@ -1,16 +1,52 @@
 import sqlite3
+import itertools
 import json
-from typing import List, Optional
-from models import SymptomInput, ComprehensiveResponse, HealthTip
-from datetime import datetime
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from models import SymptomInput, ComprehensiveResponse, HealthTip, response_json
+from connection_manager import ConnectionManager
+from symptom_index import ConditionDetails, ConditionIndex, condition_details
+from knowledge_base import KnowledgeBaseSnapshot
+from write_queue import WriteBehindQueue
+from payload_codec import AnalysisPayloadCodec
+from metrics import REGISTRY, DATABASE_OPERATION_SECONDS, DATABASE_OPERATIONS_TOTAL, ANALYSES_STORED_TOTAL
+
+# Rollup key for analyses stored without a severity level
+UNKNOWN_SEVERITY = "unknown"
+
+# Digests looked up per analysis_fragments query, below sqlite's variable limit
+FRAGMENT_QUERY_SIZE = 500
+
+def instrumented(operation: str):
+    """Count calls of a DatabaseManager method and time the sampled ones"""
+    return REGISTRY.timed(DATABASE_OPERATION_SECONDS, operation, DATABASE_OPERATIONS_TOTAL)
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "symptom_checker.db"):
+    def __init__(self, db_path: str = "symptom_checker.db", kb_snapshot: Optional[str] = None):
         self.db_path = db_path
+        self.connections = ConnectionManager.for_path(db_path)
+        self._condition_index: Optional[ConditionIndex] = None
+        self._index_lock = threading.Lock()
+        # Serializes rebuilds; readers never take it
+        self._reload_lock = threading.Lock()
+        # Set while a KnowledgeBaseReloader keeps the index current in the background
+        self.background_reload = False
+        
+        # Knowledge-base snapshot that replaces the conditions table when set
+        self.kb_snapshot = kb_snapshot
+        self._snapshot_index: Optional[ConditionIndex] = None
+        self._snapshot_signature: Optional[tuple] = None
+        self.write_queue: Optional[WriteBehindQueue] = None
+        self.payloads = AnalysisPayloadCodec(self._fetch_fragments)
     
-    def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's persistent database connection"""
+        return self.connections.get_connection()
+    
+    def close(self):
+        """Close all persistent connections to the database"""
+        self.connections.close_all()
     
     def initialize_database(self):
         """Initialize database with required tables and sample data"""
@@ -29,10 +65,63 @@ class DatabaseManager:
                 analysis_result TEXT NOT NULL,
                 confidence_score REAL,
                 severity_level TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                payload_size INTEGER
             )
         ''')
         
+        # Original analysis_result size, added after the table first shipped
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(symptom_analyses)')}
+        if 'payload_size' not in columns:
+            cursor.execute('ALTER TABLE symptom_analyses ADD COLUMN payload_size INTEGER')
+        
+        # History lookups page through (timestamp, id) keysets
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_symptom_analyses_timestamp ON symptom_analyses (timestamp, id)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_symptom_analyses_severity
+            ON symptom_analyses (severity_level, timestamp, id)
+        ''')
+        
+        # Extracted symptom -> analyses, kept up to date by trigger for history filtering
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analysis_symptoms'")
+        backfill_symptoms = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_symptoms (
+                symptom TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                analysis_id INTEGER NOT NULL,
+                severity_level TEXT,
+                PRIMARY KEY (symptom, timestamp, analysis_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS symptom_analyses_symptoms_insert
+            AFTER INSERT ON symptom_analyses
+            WHEN json_valid(NEW.extracted_symptoms)
+            BEGIN
+                INSERT OR IGNORE INTO analysis_symptoms (symptom, timestamp, analysis_id, severity_level)
+                SELECT DISTINCT value, NEW.timestamp, NEW.id, NEW.severity_level
+                FROM json_each(NEW.extracted_symptoms);
+            END
+        ''')
+        
+        # Index analyses stored before the table existed
+        if backfill_symptoms:
+            cursor.execute('''
+                INSERT OR IGNORE INTO analysis_symptoms (symptom, timestamp, analysis_id, severity_level)
+                SELECT DISTINCT each.value, a.timestamp, a.id, a.severity_level
+                FROM symptom_analyses a, json_each(a.extracted_symptoms) each
+                WHERE json_valid(a.extracted_symptoms) AND a.timestamp IS NOT NULL
+            ''')
+        
+        # Content-addressed analysis_result fragments shared between analyses
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_fragments (
+                digest TEXT PRIMARY KEY,
+                body TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS conditions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -43,6 +132,16 @@ class DatabaseManager:
             )
         ''')
         
+        # Details shown with a matched condition, keyed by conditions.id; self_care_tips is a JSON list
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS condition_details (
+                condition_id INTEGER PRIMARY KEY,
+                typical_duration TEXT,
+                when_to_see_doctor TEXT,
+                self_care_tips TEXT
+            )
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS health_tips (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -60,13 +159,112 @@ class DatabaseManager:
             )
         ''')
         
+        # Analysis rollups, updated with every write so statistics never scan symptom_analyses
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_daily_stats (
+                day TEXT NOT NULL,
+                severity_level TEXT NOT NULL,
+                analyses INTEGER NOT NULL DEFAULT 0,
+                confidence_sum REAL NOT NULL DEFAULT 0,
+                confidence_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, severity_level)
+            ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_severity_stats (
+                severity_level TEXT PRIMARY KEY,
+                analyses INTEGER NOT NULL DEFAULT 0,
+                confidence_sum REAL NOT NULL DEFAULT 0,
+                confidence_count INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        
+        # Knowledge-base version, bumped whenever the conditions, condition_details or common_symptoms table changes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS kb_version (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO kb_version (name, version) VALUES ('conditions', 0)")
+        
+        for table in ("conditions", "condition_details", "common_symptoms"):
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE kb_version SET version = version + 1 WHERE name = 'conditions';
+                    END
+                ''')
+        
         # Insert sample data
         self._insert_sample_conditions(cursor)
+        self._insert_sample_condition_details(cursor)
         self._insert_sample_health_tips(cursor)
         self._insert_common_symptoms(cursor)
         
         conn.commit()
-        conn.close()
+        
+        # Load the knowledge-base snapshot, or build the condition symptom index up front
+        if self.kb_snapshot:
+            self.load_kb_snapshot(self.kb_snapshot)
+        self.get_condition_index()
+    
+    @instrumented("load_kb_snapshot")
+    def load_kb_snapshot(self, snapshot_path: str) -> ConditionIndex:
+        """Serve conditions from a compiled knowledge-base snapshot instead of the conditions table"""
+        signature = self._file_signature(snapshot_path)
+        with KnowledgeBaseSnapshot(snapshot_path) as snapshot:
+            # Fall back to the common_symptoms table if the snapshot has none
+            common_symptoms = snapshot.common_symptoms()
+            if not common_symptoms:
+                cursor = self.get_connection().cursor()
+                cursor.execute('SELECT name, category FROM common_symptoms ORDER BY id')
+                common_symptoms = cursor.fetchall()
+            
+            index = ConditionIndex(
+                snapshot.condition_rows(),
+                snapshot.version,
+                common_symptoms,
+                snapshot.condition_details()
+            )
+        
+        with self._index_lock:
+            self.kb_snapshot = snapshot_path
+            self._snapshot_index = index
+            self._snapshot_signature = signature
+        return index
+    
+    @staticmethod
+    def _file_signature(path: str) -> tuple:
+        """Identity of a file's current contents; snapshots are replaced by renaming a new file over them"""
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+    
+    @instrumented("reload_knowledge_base")
+    def reload_knowledge_base(self, force: bool = False) -> Tuple[ConditionIndex, bool]:
+        """
+        Rebuild the condition index if its source changed, or always when forced,
+        and swap it in. The new index is built without blocking readers: requests
+        keep getting the previous index until the swap, and analyses holding it
+        finish on it. Returns the current index and whether it was replaced.
+        """
+        with self._reload_lock:
+            if self.kb_snapshot:
+                if not force and self._file_signature(self.kb_snapshot) == self._snapshot_signature:
+                    return self._snapshot_index, False
+                return self.load_kb_snapshot(self.kb_snapshot), True
+            
+            version = self.get_kb_version()
+            index = self._condition_index
+            if not force and index is not None and index.version == version:
+                return index, False
+            index = self._build_condition_index(version)
+            with self._index_lock:
+                self._condition_index = index
+            return index, True
     
     def _insert_sample_conditions(self, cursor):
         """Insert comprehensive sample medical conditions"""
@@ -108,6 +306,24 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?)
         ''', conditions)
     
+    def _insert_sample_condition_details(self, cursor):
+        """Insert details for sample conditions; the others get DEFAULT_CONDITION_DETAILS"""
+        details = [
+            ("Common Cold", "7-10 days", "If symptoms worsen after 3 days or persist beyond 10 days",
+             ["Rest and stay hydrated", "Use saline nasal rinses", "Consider honey for cough relief", "Maintain good hygiene"]),
+            ("Influenza (Flu)", "1-2 weeks", "If you have difficulty breathing, persistent fever over 3 days, or severe symptoms",
+             ["Get plenty of rest", "Stay well hydrated", "Consider antiviral medication if within 48 hours", "Monitor temperature regularly"]),
+            ("Migraine Headache", "4-72 hours", "If headaches become more frequent, severe, or are accompanied by neurological symptoms",
+             ["Rest in dark, quiet room", "Apply cold or warm compress", "Stay hydrated", "Avoid known triggers"]),
+            ("Food Poisoning", "1-5 days", "If you have severe dehydration, blood in stool, or high fever",
+             ["Stay hydrated with clear fluids", "Follow BRAT diet", "Avoid dairy and fatty foods", "Rest and recover gradually"])
+        ]
+        
+        cursor.executemany('''
+            INSERT OR IGNORE INTO condition_details (condition_id, typical_duration, when_to_see_doctor, self_care_tips)
+            SELECT id, ?, ?, ? FROM conditions WHERE name = ?
+        ''', [(duration, see_doctor, json.dumps(tips), name) for name, duration, see_doctor, tips in details])
+    
     def _insert_sample_health_tips(self, cursor):
         """Insert sample health tips"""
         tips = [
@@ -168,34 +384,323 @@ class DatabaseManager:
             VALUES (?, ?)
         ''', symptoms)
     
-    def store_symptom_analysis(self, symptom_input: SymptomInput, result: ComprehensiveResponse):
+    def _analysis_row(self, symptom_input: SymptomInput, result: ComprehensiveResponse,
+                      document: Optional[bytes] = None) -> Tuple[tuple, Dict[str, str]]:
+        """Build the symptom_analyses row for one analysis, plus the payload fragments it references"""
+        if document is None:
+            document = response_json(result)
+        payload, fragments = self.payloads.encode(document)
+        row = (
+            symptom_input.symptoms,
+            json.dumps(result.symptom_analysis.extracted_symptoms),
+            symptom_input.age,
+            symptom_input.gender,
+            symptom_input.additional_info,
+            payload,
+            result.confidence_score,
+            result.symptom_analysis.severity_assessment.value,
+            len(document)
+        )
+        return row, fragments
+    
+    def start_write_behind(self, max_size: int = 10000, batch_size: int = 100, flush_interval: float = 1.0):
+        """Buffer analyses in a bounded queue and write them from a background thread"""
+        if self.write_queue is None:
+            self.write_queue = WriteBehindQueue(
+                self._write_symptom_analyses,
+                max_size=max_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                name="analysis-writer"
+            )
+        self.write_queue.start()
+    
+    def stop_write_behind(self, timeout: Optional[float] = None):
+        """Flush buffered analyses and stop the background writer"""
+        if self.write_queue is not None:
+            self.write_queue.stop(timeout)
+    
+    def store_symptom_analysis(self, symptom_input: SymptomInput, result: ComprehensiveResponse,
+                               document: Optional[bytes] = None):
         """Store comprehensive symptom analysis in database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        self.store_symptom_analyses([(symptom_input, result)], [document])
+    
+    def store_symptom_analyses(self, analyses: List[Tuple[SymptomInput, ComprehensiveResponse]],
+                               documents: Optional[List[Optional[bytes]]] = None):
+        """
+        Store symptom analyses, through the write-behind queue when it is running.
+        documents are the analyses already serialized with response_json, if
+        available, so they are not serialized a second time.
+        """
+        items = [
+            (symptom_input, result, document)
+            for (symptom_input, result), document in zip(analyses, documents or itertools.repeat(None))
+        ]
+        if self.write_queue is not None and self.write_queue.running:
+            for item in items:
+                self.write_queue.put(item)
+            return
         
         try:
-            cursor.execute('''
+            self._write_symptom_analyses(items)
+        except Exception as e:
+            print(f"Warning: Could not store symptom analysis: {e}")
+    
+    def _write_symptom_analyses(self, analyses: List[Tuple[SymptomInput, ComprehensiveResponse, Optional[bytes]]]):
+        """Write symptom analyses and their statistics rollups in a single transaction"""
+        timer = REGISTRY.stage_timer(DATABASE_OPERATION_SECONDS)
+        rows = []
+        fragments: Dict[str, str] = {}
+        for symptom_input, result, document in analyses:
+            row, row_fragments = self._analysis_row(symptom_input, result, document)
+            rows.append(row)
+            fragments.update(row_fragments)
+        fragments = self.payloads.unknown(fragments)
+        rollups = self._statistics_rollups(rows)
+        timer.mark("encode_analyses")
+        conn = self.get_connection()
+        
+        with conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO analysis_fragments (digest, body) VALUES (?, ?)', fragments.items()
+            )
+            
+            conn.executemany('''
                 INSERT INTO symptom_analyses (
                     input_text, extracted_symptoms, age, gender, additional_info,
-                    analysis_result, confidence_score, severity_level
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                symptom_input.symptoms,
-                json.dumps(result.symptom_analysis.extracted_symptoms),
-                symptom_input.age,
-                symptom_input.gender,
-                symptom_input.additional_info,
-                result.json(),
-                result.confidence_score,
-                result.symptom_analysis.severity_assessment.value
-            ))
+                    analysis_result, confidence_score, severity_level, payload_size
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
             
-            conn.commit()
-        except Exception as e:
-            print(f"Warning: Could not store symptom analysis: {e}")
-        finally:
-            conn.close()
+            conn.executemany('''
+                INSERT INTO analysis_daily_stats (day, severity_level, analyses, confidence_sum, confidence_count)
+                VALUES (date('now'), ?, ?, ?, ?)
+                ON CONFLICT (day, severity_level) DO UPDATE SET
+                    analyses = analyses + excluded.analyses,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    confidence_count = confidence_count + excluded.confidence_count
+            ''', rollups)
+            
+            conn.executemany('''
+                INSERT INTO analysis_severity_stats (severity_level, analyses, confidence_sum, confidence_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (severity_level) DO UPDATE SET
+                    analyses = analyses + excluded.analyses,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    confidence_count = confidence_count + excluded.confidence_count
+            ''', rollups)
+    
+        self.payloads.remember(fragments)
+        timer.mark("write_analyses")
+        timer.finish()
+        DATABASE_OPERATIONS_TOTAL.inc("write_analyses")
+        ANALYSES_STORED_TOTAL.inc(amount=len(rows))
+    
+    @staticmethod
+    def _statistics_rollups(rows: List[tuple]) -> List[tuple]:
+        """(severity, analyses, confidence sum, confidence count) of a batch of symptom_analyses rows"""
+        rollups = {}
+        for row in rows:
+            confidence_score, severity_level = row[6], row[7] or UNKNOWN_SEVERITY
+            rollup = rollups.setdefault(severity_level, [0, 0.0, 0])
+            rollup[0] += 1
+            if confidence_score is not None:
+                rollup[1] += confidence_score
+                rollup[2] += 1
+        return [(severity_level, *rollup) for severity_level, rollup in rollups.items()]
+    
+    @instrumented("fetch_payload_fragments")
+    def _fetch_fragments(self, digests: List[str]) -> Dict[str, str]:
+        """Payload fragment bodies by digest"""
+        conn = self.get_connection()
+        fragments = {}
+        for start in range(0, len(digests), FRAGMENT_QUERY_SIZE):
+            chunk = digests[start:start + FRAGMENT_QUERY_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            fragments.update(conn.execute(
+                f'SELECT digest, body FROM analysis_fragments WHERE digest IN ({placeholders})', chunk
+            ).fetchall())
+        return fragments
+    
+    @instrumented("get_analysis_result")
+    def get_analysis_result(self, analysis_id: int) -> Optional[str]:
+        """Get the stored analysis_result JSON document of an analysis, whatever format it is stored in"""
+        row = self.get_connection().execute(
+            'SELECT analysis_result FROM symptom_analyses WHERE id = ?', (analysis_id,)
+        ).fetchone()
+        return self.payloads.decode(row[0]) if row else None
+    
+    @instrumented("get_analysis_history")
+    def get_analysis_history(self, start: Optional[str] = None, end: Optional[str] = None,
+                             severity: Optional[str] = None, symptom: Optional[str] = None,
+                             limit: int = 50, after: Optional[Tuple[str, int]] = None,
+                             include_results: bool = False) -> Tuple[List[dict], Optional[Tuple[str, int]]]:
+        """
+        Get one page of stored analyses, newest first, and the (timestamp, id)
+        key to pass as `after` for the next page (None on the last page).
+        
+        start and end bound the timestamp (start inclusive, end exclusive) in
+        the stored 'YYYY-MM-DD HH:MM:SS' UTC format. Pages are found by
+        seeking an index on (timestamp, id), so deep pages cost the same as
+        the first one.
+        """
+        if symptom:
+            # Filter through the per-symptom index, then fetch the page rows
+            source = 'analysis_symptoms s JOIN symptom_analyses a ON a.id = s.analysis_id'
+            conditions, params = ['s.symptom = ?'], [symptom.strip().lower()]
+            timestamp, key, severity_column = 's.timestamp', 's.analysis_id', 's.severity_level'
+        else:
+            source = 'symptom_analyses a'
+            conditions, params = [], []
+            timestamp, key, severity_column = 'a.timestamp', 'a.id', 'a.severity_level'
+        
+        if severity:
+            conditions.append(f'{severity_column} = ?')
+            params.append(severity)
+        if start:
+            conditions.append(f'{timestamp} >= ?')
+            params.append(start)
+        # A cursor from an earlier page is already below end; leaving end out lets
+        # sqlite seek straight to the cursor instead of scanning down from end
+        if end and not (after and after[0] < end):
+            conditions.append(f'{timestamp} < ?')
+            params.append(end)
+        if after:
+            conditions.append(f'({timestamp}, {key}) < (?, ?)')
+            params.extend(after)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        result_column = ', a.analysis_result' if include_results else ''
+        rows = self.get_connection().execute(f'''
+            SELECT a.id, a.timestamp, a.input_text, a.extracted_symptoms, a.age, a.gender,
+                   a.severity_level, a.confidence_score{result_column}
+            FROM {source}
+            {where}
+            ORDER BY {timestamp} DESC, {key} DESC
+            LIMIT ?
+        ''', (*params, limit + 1)).fetchall()
+        
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1][1], rows[-1][0])
+        
+        documents = self.payloads.decode_many([row[8] for row in rows]) if include_results else None
+        items = []
+        for position, row in enumerate(rows):
+            items.append({
+                "id": row[0],
+                "timestamp": row[1],
+                "input_text": row[2],
+                "extracted_symptoms": json.loads(row[3]),
+                "age": row[4],
+                "gender": row[5],
+                "severity_level": row[6],
+                "confidence_score": row[7],
+                "analysis": json.loads(documents[position]) if documents else None
+            })
+        return items, next_key
+    
+    @instrumented("compress_stored_analyses")
+    def compress_stored_analyses(self, batch_size: int = 500) -> Tuple[int, int, int]:
+        """
+        Convert analyses stored as plain JSON to the compact payload format,
+        in batches of batch_size rows per transaction. Returns the rows
+        converted and their size in bytes before and after.
+        """
+        conn = self.get_connection()
+        converted = bytes_before = bytes_after = 0
+        last_id = 0
+        
+        while True:
+            batch = conn.execute('''
+                SELECT id, analysis_result FROM symptom_analyses
+                WHERE id > ? AND typeof(analysis_result) = 'text'
+                ORDER BY id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            
+            updates = []
+            fragments: Dict[str, str] = {}
+            for analysis_id, document in batch:
+                payload, row_fragments = self.payloads.encode(document)
+                fragments.update(row_fragments)
+                size = len(document.encode("utf-8"))
+                updates.append((payload, size, analysis_id))
+                bytes_before += size
+                bytes_after += len(payload)
+            fragments = self.payloads.unknown(fragments)
+            
+            with conn:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO analysis_fragments (digest, body) VALUES (?, ?)', fragments.items()
+                )
+                # Only rows still in the old format, in case another process converted them meanwhile
+                conn.executemany('''
+                    UPDATE symptom_analyses SET analysis_result = ?, payload_size = ?
+                    WHERE id = ? AND typeof(analysis_result) = 'text'
+                ''', updates)
+            self.payloads.remember(fragments)
+            converted += len(updates)
+        
+        return converted, bytes_before, bytes_after
+    
+    def get_payload_storage_report(self) -> dict:
+        """Bytes used by stored analysis_result payloads against their original JSON size (full scan)"""
+        conn = self.get_connection()
+        rows, compact_rows, original_bytes, stored_bytes = conn.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(typeof(analysis_result) = 'blob'), 0),
+                   COALESCE(SUM(COALESCE(payload_size, length(CAST(analysis_result AS BLOB)))), 0),
+                   COALESCE(SUM(length(CAST(analysis_result AS BLOB))), 0)
+            FROM symptom_analyses
+        ''').fetchone()
+        fragments, fragment_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(length(CAST(body AS BLOB))), 0) FROM analysis_fragments'
+        ).fetchone()
+        
+        saved_bytes = original_bytes - stored_bytes - fragment_bytes
+        return {
+            "rows": rows,
+            "compact_rows": compact_rows,
+            "fragments": fragments,
+            "original_bytes": original_bytes,
+            "stored_bytes": stored_bytes,
+            "fragment_bytes": fragment_bytes,
+            "saved_bytes": saved_bytes,
+            "original_bytes_per_row": round(original_bytes / rows, 1) if rows else 0,
+            "stored_bytes_per_row": round((stored_bytes + fragment_bytes) / rows, 1) if rows else 0,
+            "saved_bytes_per_row": round(saved_bytes / rows, 1) if rows else 0
+        }
+    
+    @instrumented("rebuild_analysis_statistics")
+    def rebuild_analysis_statistics(self) -> int:
+        """Recompute the statistics rollups from every stored analysis, returns the analyses counted"""
+        conn = self.get_connection()
+        
+        # The first DELETE takes the write lock, so no analysis is written while rebuilding
+        with conn:
+            conn.execute('DELETE FROM analysis_daily_stats')
+            conn.execute('DELETE FROM analysis_severity_stats')
+            conn.execute('''
+                INSERT INTO analysis_daily_stats (day, severity_level, analyses, confidence_sum, confidence_count)
+                SELECT COALESCE(date(timestamp), date('now')), COALESCE(severity_level, ?),
+                       COUNT(*), COALESCE(SUM(confidence_score), 0), COUNT(confidence_score)
+                FROM symptom_analyses
+                GROUP BY 1, 2
+            ''', (UNKNOWN_SEVERITY,))
+            conn.execute('''
+                INSERT INTO analysis_severity_stats (severity_level, analyses, confidence_sum, confidence_count)
+                SELECT severity_level, SUM(analyses), SUM(confidence_sum), SUM(confidence_count)
+                FROM analysis_daily_stats
+                GROUP BY severity_level
+            ''')
+            total = conn.execute('SELECT COALESCE(SUM(analyses), 0) FROM analysis_severity_stats').fetchone()[0]
+        return total
     
+    @instrumented("get_health_tips")
     def get_health_tips(self, category: Optional[str] = None) -> List[HealthTip]:
         """Get health tips, optionally filtered by category"""
         conn = self.get_connection()
@@ -207,9 +712,9 @@ class DatabaseManager:
             cursor.execute('SELECT title, description, category FROM health_tips')
         
         tips = [HealthTip(title=row[0], description=row[1], category=row[2]) for row in cursor.fetchall()]
-        conn.close()
         return tips
     
+    @instrumented("get_common_symptoms")
     def get_common_symptoms(self) -> List[str]:
         """Get list of common symptoms"""
         conn = self.get_connection()
@@ -217,113 +722,126 @@ class DatabaseManager:
         
         cursor.execute('SELECT name FROM common_symptoms ORDER BY name')
         symptoms = [row[0] for row in cursor.fetchall()]
-        conn.close()
         return symptoms
     
+    @instrumented("get_all_conditions")
     def get_all_conditions(self) -> List[dict]:
         """Get all medical conditions"""
+        index = self._snapshot_index
+        if index is not None:
+            return [
+                {"name": name, "description": description, "severity": severity}
+                for name, description, severity in zip(index.names, index.descriptions, index.severities)
+            ]
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('SELECT name, description, severity FROM conditions')
         conditions = [{"name": row[0], "description": row[1], "severity": row[2]} for row in cursor.fetchall()]
-        conn.close()
         return conditions
     
-    def get_conditions_by_symptoms(self, symptoms: List[str]) -> List[dict]:
-        """Get conditions that match given symptoms with improved matching algorithm"""
+    def get_kb_version(self) -> int:
+        """Get the current version of the conditions knowledge base"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT name, description, symptoms, severity FROM conditions')
-        all_conditions = cursor.fetchall()
+        cursor.execute("SELECT version FROM kb_version WHERE name = 'conditions'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    
+    def get_condition_index(self) -> ConditionIndex:
+        """
+        Get the condition symptom index. While background reload is on this
+        returns the current index without checking its version; otherwise it
+        is rebuilt here if the conditions table changed.
+        """
+        if self._snapshot_index is not None:
+            return self._snapshot_index
         
-        matching_conditions = []
+        index = self._condition_index
+        if index is not None and self.background_reload:
+            return index
         
-        for condition in all_conditions:
-            condition_symptoms = [s.strip().lower() for s in condition[2].split(',')]
-            
-            # Calculate match score using multiple methods
-            exact_matches = 0
-            partial_matches = 0
-            
-            for input_symptom in symptoms:
-                input_symptom_lower = input_symptom.lower()
-                
-                # Check for exact matches
-                for condition_symptom in condition_symptoms:
-                    if condition_symptom in input_symptom_lower or input_symptom_lower in condition_symptom:
-                        exact_matches += 1
-                        break
-                else:
-                    # Check for partial matches (word overlap)
-                    input_words = set(input_symptom_lower.split())
-                    for condition_symptom in condition_symptoms:
-                        condition_words = set(condition_symptom.split())
-                        if input_words & condition_words:  # If there's any word overlap
-                            partial_matches += 0.5
-                            break
-            
-            total_score = exact_matches + partial_matches
-            
-            if total_score > 0:
-                # Calculate probability based on matches and condition symptom count
-                probability = min(total_score / len(condition_symptoms), 1.0)
-                
-                # Boost probability for exact matches
-                if exact_matches > 0:
-                    probability = min(probability * 1.3, 1.0)
-                
-                matching_conditions.append({
-                    "name": condition[0],
-                    "description": condition[1],
-                    "symptoms": condition_symptoms,
-                    "severity": condition[3],
-                    "probability": probability,
-                    "match_count": exact_matches,
-                    "total_score": total_score
-                })
-        
-        # Sort by probability, then by total score, then by exact matches
-        matching_conditions.sort(
-            key=lambda x: (x["probability"], x["total_score"], x["match_count"]), 
-            reverse=True
-        )
+        version = self.get_kb_version()
+        if index is not None and index.version == version:
+            return index
         
-        conn.close()
-        return matching_conditions
+        with self._index_lock:
+            index = self._condition_index
+            if index is None or index.version != version:
+                index = self._build_condition_index(version)
+                self._condition_index = index
+        return index
+    
+    @instrumented("build_condition_index")
+    def _build_condition_index(self, version: int) -> ConditionIndex:
+        """Build the condition symptom index from the conditions table"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id, name, description, symptoms, severity FROM conditions ORDER BY id')
+        conditions = cursor.fetchall()
+        cursor.execute('SELECT condition_id, typical_duration, when_to_see_doctor, self_care_tips FROM condition_details')
+        details = {row[0]: self._condition_details(row) for row in cursor.fetchall()}
+        cursor.execute('SELECT name, category FROM common_symptoms ORDER BY id')
+        index = ConditionIndex(conditions, version, cursor.fetchall(), details)
+        return index
+    
+    @staticmethod
+    def _condition_details(row: tuple) -> ConditionDetails:
+        """ConditionDetails from a condition_details row, defaults filling missing columns"""
+        _, typical_duration, when_to_see_doctor, self_care_tips = row
+        return condition_details(typical_duration, when_to_see_doctor, json.loads(self_care_tips) if self_care_tips else ())
+    
+    def get_conditions_by_symptoms(self, symptoms: List[str]) -> List[dict]:
+        """Get conditions that match given symptoms with improved matching algorithm"""
+        return self.get_condition_index().get_conditions_by_symptoms(symptoms)
     
+    @instrumented("get_analysis_statistics")
     def get_analysis_statistics(self) -> dict:
-        """Get statistics about stored analyses (optional analytics)"""
+        """Get statistics about stored analyses from the severity rollups (optional analytics)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute('SELECT COUNT(*) FROM symptom_analyses')
-            total_analyses = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT severity_level, COUNT(*) 
-                FROM symptom_analyses 
-                GROUP BY severity_level
-            ''')
-            severity_stats = dict(cursor.fetchall())
-            
             cursor.execute('''
-                SELECT AVG(confidence_score) 
-                FROM symptom_analyses 
-                WHERE confidence_score IS NOT NULL
+                SELECT severity_level, analyses, confidence_sum, confidence_count
+                FROM analysis_severity_stats
             ''')
-            avg_confidence = cursor.fetchone()[0] or 0
-            
-            return {
-                "total_analyses": total_analyses,
-                "severity_distribution": severity_stats,
-                "average_confidence": round(avg_confidence, 2)
-            }
+            return self._summarize_rollups(cursor.fetchall())
         except Exception as e:
             print(f"Warning: Could not get statistics: {e}")
             return {"error": "Statistics unavailable"}
-        finally:
-            conn.close()
-
+    
+    @instrumented("get_daily_analysis_statistics")
+    def get_daily_analysis_statistics(self, days: int = 7) -> List[dict]:
+        """Get per-day statistics for the last `days` days (UTC), oldest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT day, severity_level, analyses, confidence_sum, confidence_count
+            FROM analysis_daily_stats
+            WHERE day > date('now', ?)
+            ORDER BY day
+        ''', (f"-{days} days",))
+        
+        by_day = {}
+        for day, *rollup in cursor.fetchall():
+            by_day.setdefault(day, []).append(rollup)
+        return [{"date": day, **self._summarize_rollups(rollups)} for day, rollups in by_day.items()]
+    
+    @staticmethod
+    def _summarize_rollups(rollups: List[tuple]) -> dict:
+        """Totals, severity distribution and average confidence of (severity, count, sum, count) rollups"""
+        total_analyses = sum(rollup[1] for rollup in rollups)
+        confidence_sum = sum(rollup[2] for rollup in rollups)
+        confidence_count = sum(rollup[3] for rollup in rollups)
+        average_confidence = confidence_sum / confidence_count if confidence_count else 0
+        
+        return {
+            "total_analyses": total_analyses,
+            "severity_distribution": {rollup[0]: rollup[1] for rollup in rollups},
+            "average_confidence": round(average_confidence, 2)
+        }
@@ -0,0 +1,186 @@
+import math
+from collections import Counter
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def padded_trigrams(text: str) -> Set[str]:
+    """Distinct trigrams of text padded with two leading and one trailing space"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> Optional[int]:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions
+    and adjacent transpositions), or None if it exceeds max_distance
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return None
+
+    # Only cells within max_distance of the diagonal can stay under the limit;
+    # everything outside the band is held at max_distance + 1
+    width = len(target)
+    beyond = max_distance + 1
+    previous_row: List[int] = []
+    row = [j if j <= max_distance else beyond for j in range(width + 1)]
+    for i in range(1, len(source) + 1):
+        before_previous, previous_row = previous_row, row
+        row = [beyond] * (width + 1)
+        if i <= max_distance:
+            row[0] = i
+        char = source[i - 1]
+        lowest = row[0]
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            value = min(previous_row[j] + 1, row[j - 1] + 1,
+                        previous_row[j - 1] + (char != target[j - 1]))
+            if (i > 1 and j > 1 and char == target[j - 2]
+                    and source[i - 2] == target[j - 1] and before_previous[j - 2] + 1 < value):
+                value = before_previous[j - 2] + 1
+            row[j] = value
+            if value < lowest:
+                lowest = value
+        if lowest > max_distance:
+            return None
+
+    return row[width] if row[width] <= max_distance else None
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup over a vocabulary of symptom phrases.
+
+    Phrases are indexed by (length, padded trigram). A query is searched one
+    edit distance at a time: candidates come from the posting lists of its
+    rarest trigrams within the lengths that distance allows, and survivors
+    are verified with a banded edit-distance check. Similarity is
+    1 - distance / longer length.
+    """
+
+    # Queries shorter than this are only matched exactly
+    MIN_QUERY_LENGTH = 4
+
+    # Above this many candidates, shared trigrams are counted from the
+    # posting lists instead of per candidate
+    COUNT_CUTOFF = 256
+
+    def __init__(self, phrases: Iterable[str], min_similarity: float = 0.8, max_edits: int = 2):
+        self.min_similarity = min_similarity
+        # Typos are one or two edits; capping the distance keeps long queries
+        # from searching (and verifying) most of the vocabulary
+        self.max_edits = max_edits
+
+        self.phrases: List[str] = []
+        self._phrase_ids: Dict[str, int] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        self._postings: Dict[Tuple[int, str], List[int]] = {}
+
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if not phrase or phrase in self._phrase_ids:
+                continue
+            phrase_id = len(self.phrases)
+            self.phrases.append(phrase)
+            self._phrase_ids[phrase] = phrase_id
+            self._by_length.setdefault(len(phrase), []).append(phrase_id)
+            for trigram in padded_trigrams(phrase):
+                self._postings.setdefault((len(phrase), trigram), []).append(phrase_id)
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def __contains__(self, phrase: str) -> bool:
+        return phrase in self._phrase_ids
+
+    def _posting_lists(self, trigrams: Iterable[str], lengths: Iterable[int]) -> Iterator[List[int]]:
+        for trigram in trigrams:
+            for length in lengths:
+                ids = self._postings.get((length, trigram))
+                if ids:
+                    yield ids
+
+    def lookup(self, text: str, limit: int = 1, min_similarity: Optional[float] = None,
+               accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """
+        Canonical phrases closest to text as (phrase, similarity), best first.
+        With accept, only phrases it returns True for; the search stops at the
+        first edit distance that yields limit of them.
+        """
+        query = text.strip().lower()
+        threshold = self.min_similarity if min_similarity is None else min_similarity
+
+        is_phrase = query in self._phrase_ids and (accept is None or accept(query))
+        if is_phrase:
+            if limit == 1:
+                return [(query, 1.0)]
+        elif len(query) < self.MIN_QUERY_LENGTH:
+            return []
+
+        trigrams = padded_trigrams(query)
+        longest = math.floor(len(query) / threshold) if threshold > 0 else len(query) * 2
+        most_edits = min(int((1 - threshold) * max(len(query), longest) + 1e-9), self.max_edits)
+        lengths = range(max(len(query) - most_edits, 1), len(query) + most_edits + 1)
+
+        # Query trigrams ordered by how many phrases in the length window share them
+        rarest = sorted(trigrams, key=lambda trigram: sum(len(ids) for ids in self._posting_lists((trigram,), lengths)))
+
+        results = [(query, 1.0)] if is_phrase else []
+
+        # Edit distance of every phrase verified so far (None if beyond its limit or not accepted)
+        verified: Dict[int, Optional[int]] = {self._phrase_ids[query]: 0 if is_phrase else None} \
+            if query in self._phrase_ids else {}
+
+        # Search one edit distance at a time; a closer phrase always outranks a
+        # farther one, so stop as soon as there are enough results
+        for distance in range(1, most_edits + 1):
+            if len(results) >= limit:
+                break
+
+            window = [
+                length for length in range(len(query) - distance, len(query) + distance + 1)
+                if length > 0 and 1 - distance / max(len(query), length) >= threshold - 1e-9
+            ]
+
+            # Each edit destroys at most four query trigrams, so a phrase within
+            # `distance` shares at least `required` of them, and so at least one
+            # of the rarest 4 * distance + 1
+            required = len(trigrams) - 4 * distance
+            if required < 1:
+                candidates = set(chain.from_iterable(self._by_length.get(length, ()) for length in window))
+            else:
+                candidates = set(chain.from_iterable(self._posting_lists(rarest[:4 * distance + 1], window)))
+            candidates.difference_update(verified)
+
+            check_shared = required > 1
+            if check_shared and len(candidates) > self.COUNT_CUTOFF:
+                # Such a phrase also shares at least `required - (len(trigrams) - prefix)`
+                # of the rarest `prefix`; counting those skips the longest posting lists
+                prefix = min(len(trigrams), 2 * (4 * distance + 1))
+                counts = Counter(chain.from_iterable(self._posting_lists(rarest[:prefix], window)))
+                least = required - (len(trigrams) - prefix)
+                candidates = {phrase_id for phrase_id in candidates if counts[phrase_id] >= least}
+                check_shared = prefix < len(trigrams)
+
+            # Verify each new candidate once, against the most edits its length allows
+            for phrase_id in candidates:
+                phrase = self.phrases[phrase_id]
+                if check_shared and len(trigrams & padded_trigrams(phrase)) < required:
+                    continue
+                if accept is not None and not accept(phrase):
+                    verified[phrase_id] = None
+                    continue
+                longer = max(len(query), len(phrase))
+                verified[phrase_id] = edit_distance(
+                    query, phrase, min(int((1 - threshold) * longer + 1e-9), self.max_edits)
+                )
+
+            matches = []
+            for phrase_id, actual in verified.items():
+                if actual == distance:
+                    phrase = self.phrases[phrase_id]
+                    matches.append((phrase, round(1 - actual / max(len(query), len(phrase)), 4)))
+
+            matches.sort(key=lambda result: (-result[1], result[0]))
+            results.extend(matches)
+
+        return results[:limit]
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+
+class HealthMonitor:
+    """
+    Readiness state refreshed by a background probe thread.
+
+    Every interval seconds the probe checks that the database answers on
+    the probe thread's own persistent connection, that the knowledge base
+    is loaded, how full the write-behind queue is and how saturated the
+    analyzer pool is. The result is kept as a ready-made JSON body, so the
+    health endpoints answer from memory without touching the database.
+    A probe result older than stale_after seconds counts as not ready.
+    
+    Liveness only depends on the database check: a saturated pool or a
+    full queue makes the service not ready, never not alive.
+    """
+
+    def __init__(self, db_manager, analysis_pool, interval: float = 2.0,
+                 stale_after: Optional[float] = None, max_pool_saturation: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.db_manager = db_manager
+        self.analysis_pool = analysis_pool
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self.max_pool_saturation = max_pool_saturation
+        self._clock = clock
+
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # (ready, JSON body, monotonic time of the probe), replaced as a whole
+        self._state: Tuple[bool, bytes, float] = (False, b'{"status":"starting"}', float("-inf"))
+        # (alive, JSON body) from the last database check
+        self._liveness: Tuple[bool, bytes] = self._liveness_state("unknown")
+        self.probes = 0
+        self.failures = 0
+
+    def start(self):
+        """Probe once, then keep probing from a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self.probe()
+        self._thread = threading.Thread(target=self._run, name="health-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop probing and report not ready from now on, e.g. while draining"""
+        self._stopping.set()
+        self._state = (False, b'{"status":"stopping"}', self._clock())
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.probe()
+
+    def probe(self) -> dict:
+        """Check every dependency once and cache the result"""
+        checked = self._clock()
+        report = {"status": "ready", "checked_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds")}
+        problems = []
+
+        try:
+            self.db_manager.get_connection().execute("SELECT 1").fetchone()
+            report["database"] = "connected"
+        except Exception as e:
+            report["database"] = "unreachable"
+            problems.append(f"database: {e}")
+        self._liveness = self._liveness_state(report["database"])
+
+        try:
+            condition_index = self.db_manager.get_condition_index()
+            report["knowledge_base"] = {
+                "source": "snapshot" if self.db_manager.kb_snapshot else "database",
+                "version": condition_index.version,
+                "conditions": len(condition_index)
+            }
+            if not len(condition_index):
+                problems.append("knowledge_base: no conditions loaded")
+        except Exception as e:
+            report["knowledge_base"] = None
+            problems.append(f"knowledge_base: {e}")
+
+        write_queue = self.db_manager.write_queue
+        if write_queue is not None:
+            queue_stats = write_queue.stats()
+            report["storage_queue"] = queue_stats
+            if not write_queue.running:
+                problems.append("storage_queue: writer not running")
+            elif queue_stats["queue_depth"] >= queue_stats["capacity"]:
+                problems.append("storage_queue: full")
+        else:
+            report["storage_queue"] = None
+
+        pool_stats = self.analysis_pool.stats()
+        report["analyzer_pool"] = pool_stats
+        if pool_stats["saturation"] >= self.max_pool_saturation:
+            problems.append("analyzer_pool: saturated")
+
+        ready = not problems
+        if not ready:
+            report["status"] = "not ready"
+            report["problems"] = problems
+            self.failures += 1
+        self.probes += 1
+
+        if self._stopping.is_set():
+            return report
+        self._state = (ready, json.dumps(report).encode(), checked)
+        return report
+
+    @staticmethod
+    def _liveness_state(database: str) -> Tuple[bool, bytes]:
+        alive = database != "unreachable"
+        return alive, json.dumps({"status": "alive" if alive else "not alive", "database": database}).encode()
+
+    def liveness(self) -> Tuple[bool, bytes]:
+        """Whether the process is up with its database reachable, and the JSON body"""
+        return self._liveness
+
+    def readiness(self) -> Tuple[bool, bytes]:
+        """Whether the service is ready, and the JSON body of the last probe"""
+        ready, body, checked = self._state
+        if ready and self._clock() - checked > self.stale_after:
+            return False, b'{"status":"not ready","problems":["health probe is stale"]}'
+        return ready, body
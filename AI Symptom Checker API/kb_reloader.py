@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable, List, Optional
+
+
+class KnowledgeBaseReloader:
+    """
+    Keeps the condition index current without making requests wait.
+
+    A background thread checks the knowledge-base source every interval
+    seconds (the conditions table version, or the KB_SNAPSHOT file) and on
+    request, builds the new index itself and swaps it in. While it runs,
+    DatabaseManager.get_condition_index returns the current index without
+    a version check, so requests never rebuild or wait for a rebuild.
+    An interval of 0 reloads only on request.
+    """
+
+    def __init__(self, db_manager, interval: float = 5.0):
+        self.db_manager = db_manager
+        self.interval = interval
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+
+        self.checks = 0
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_reload: Optional[float] = None
+
+    def start(self):
+        """Start the background reload thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self.db_manager.background_reload = True
+        self._thread = threading.Thread(target=self._run, name="kb-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop reloading; requests go back to checking the version themselves"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.db_manager.background_reload = False
+
+        # Fail reloads still waiting rather than cancelling them: a cancelled
+        # future would abort the request awaiting it instead of answering it
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.set_exception(RuntimeError("Knowledge base reloader stopped"))
+
+    def request_reload(self) -> Future:
+        """Rebuild the index from its source now, even if it looks unchanged; the future gets the stats"""
+        future: Future = Future()
+        with self._lock:
+            if self._stopping.is_set() or self._thread is None:
+                future.set_exception(RuntimeError("Knowledge base reloader is not running"))
+                return future
+            self._pending.append(future)
+        self._wake.set()
+        return future
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval or None)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+
+            with self._lock:
+                pending, self._pending = self._pending, []
+            self.reload(force=bool(pending), waiting=pending)
+
+    def reload(self, force: bool = False, waiting: Iterable[Future] = ()) -> dict:
+        """Reload if the source changed (or when forced), resolving waiting futures with the outcome"""
+        self.checks += 1
+        try:
+            _, replaced = self.db_manager.reload_knowledge_base(force=force)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Warning: Could not reload knowledge base: {e}")
+            for future in waiting:
+                future.set_exception(e)
+            return self.stats()
+
+        if replaced:
+            self.reloads += 1
+            self.last_reload = time.time()
+        stats = dict(self.stats(), replaced=replaced)
+        for future in waiting:
+            future.set_result(stats)
+        return stats
+
+    def stats(self) -> dict:
+        """Loaded knowledge-base version and reload counters"""
+        condition_index = self.db_manager.get_condition_index()
+        return {
+            "source": "snapshot" if self.db_manager.kb_snapshot else "database",
+            "version": condition_index.version,
+            "conditions": len(condition_index),
+            "interval": self.interval,
+            "checks": self.checks,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload": self.last_reload
+        }
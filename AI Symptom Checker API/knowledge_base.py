@@ -0,0 +1,437 @@
+"""
+Condition knowledge-base import and binary snapshots.
+
+CSV and JSON sources are compiled once into a compact snapshot file that
+workers memory-map at startup instead of reparsing the sources. Strings
+are deduplicated into a single table and conditions refer to them by
+number, so a snapshot of tens of thousands of conditions stays small and
+loads with one pass over the string table.
+
+Snapshot layout (little-endian):
+
+    header          magic, format version, sha256 of everything after the
+                    header, and the condition, common symptom, string and
+                    reference counts
+    string offsets  uint32 x (strings + 1)
+    string data     utf-8
+    conditions      uint32 x 9 per condition: name, description, severity,
+                    typical duration, when to see a doctor (string ids, or
+                    NO_STRING), then start and count of its symptoms and of
+                    its self-care tips in the reference array
+    references      uint32 string ids
+    common symptoms uint32 x 2 per symptom: name, category
+
+The snapshot version is the hex digest from the header, so the same
+sources always produce the same version and caches keyed on it stay valid
+across workers and rebuilds.
+
+Build a snapshot from the project directory:
+    python knowledge_base.py conditions.csv details.json -o kb.snapshot [--include-db symptom_checker.db]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from symptom_index import ConditionDetails, condition_details
+
+MAGIC = b"SCKB"
+FORMAT_VERSION = 1
+
+# magic, format version, body sha256, conditions, common symptoms, strings, references
+HEADER = struct.Struct("<4sH2x32sIIII")
+
+CONDITION_FIELDS = 9
+NO_STRING = 0xFFFFFFFF
+
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# Separators inside a single CSV field
+SYMPTOM_SEPARATORS = (",", ";")
+TIP_SEPARATOR = "|"
+
+
+class KnowledgeBaseError(ValueError):
+    """Raised when a knowledge-base source or snapshot is invalid"""
+
+
+class ConditionRecord(NamedTuple):
+    name: str
+    description: str
+    symptoms: Tuple[str, ...]
+    severity: str
+    typical_duration: Optional[str] = None
+    when_to_see_doctor: Optional[str] = None
+    self_care_tips: Tuple[str, ...] = ()
+
+    def details(self) -> Optional[ConditionDetails]:
+        """Condition details as the analyzer uses them, or None if the source had none"""
+        if self.typical_duration is None and self.when_to_see_doctor is None and not self.self_care_tips:
+            return None
+        return condition_details(self.typical_duration, self.when_to_see_doctor, self.self_care_tips)
+
+
+class KnowledgeBase:
+    """Conditions and common symptoms collected from one or more sources"""
+
+    def __init__(self):
+        # Condition name -> record, in first-seen order; later sources replace earlier ones
+        self.conditions: Dict[str, ConditionRecord] = {}
+        # Common symptom name -> body-system category
+        self.common_symptoms: Dict[str, str] = {}
+        self.replaced = 0
+
+    def add_condition(self, record: ConditionRecord):
+        if record.name in self.conditions:
+            self.replaced += 1
+        self.conditions[record.name] = record
+
+    def add_common_symptom(self, name: str, category: str):
+        self.common_symptoms[name.strip().lower()] = category.strip()
+
+    def load(self, path: str):
+        """Add the conditions (and common symptoms) from a CSV or JSON file"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            self._load_csv(path)
+        elif extension == ".json":
+            self._load_json(path)
+        else:
+            raise KnowledgeBaseError(f"{path}: unsupported source type, expected .csv or .json")
+
+    def load_database(self, db_path: str):
+        """Add the conditions, their details and common symptoms stored in a symptom checker database"""
+        conn = sqlite3.connect(db_path)
+        try:
+            # Databases created before condition_details existed have conditions only
+            has_details = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'condition_details'"
+            ).fetchone() is not None
+            query = (
+                "SELECT c.name, c.description, c.symptoms, c.severity, "
+                "d.typical_duration, d.when_to_see_doctor, d.self_care_tips "
+                "FROM conditions c LEFT JOIN condition_details d ON d.condition_id = c.id ORDER BY c.id"
+                if has_details else
+                "SELECT name, description, symptoms, severity, NULL, NULL, NULL FROM conditions ORDER BY id"
+            )
+            for name, description, symptoms, severity, duration, see_doctor, tips in conn.execute(query):
+                self.add_condition(make_record(
+                    {"name": name, "description": description, "symptoms": symptoms, "severity": severity,
+                     "typical_duration": duration, "when_to_see_doctor": see_doctor,
+                     "self_care_tips": json.loads(tips) if tips else None},
+                    db_path
+                ))
+            for name, category in conn.execute("SELECT name, category FROM common_symptoms ORDER BY id"):
+                self.add_common_symptom(name, category)
+        except sqlite3.Error as e:
+            raise KnowledgeBaseError(f"{db_path}: {e}")
+        finally:
+            conn.close()
+
+    def _load_csv(self, path: str):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            columns = {column.strip().lower() for column in reader.fieldnames or ()}
+
+            # A name,category file lists common symptoms rather than conditions
+            if "symptoms" not in columns and {"name", "category"} <= columns:
+                for line, row in enumerate(reader, start=2):
+                    row = {key.strip().lower(): value for key, value in row.items() if key}
+                    if not row.get("name") or not row.get("category"):
+                        raise KnowledgeBaseError(f"{path}:{line}: name and category are required")
+                    self.add_common_symptom(row["name"], row["category"])
+                return
+
+            for line, row in enumerate(reader, start=2):
+                row = {key.strip().lower(): value for key, value in row.items() if key}
+                self.add_condition(make_record(row, f"{path}:{line}"))
+
+    def _load_json(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise KnowledgeBaseError(f"{path}: invalid JSON: {e}")
+
+        if isinstance(data, list):
+            data = {"conditions": data}
+        if not isinstance(data, dict):
+            raise KnowledgeBaseError(f"{path}: expected a list of conditions or an object")
+
+        for number, item in enumerate(data.get("conditions", []), start=1):
+            if not isinstance(item, dict):
+                raise KnowledgeBaseError(f"{path}: condition {number} is not an object")
+            self.add_condition(make_record(item, f"{path}: condition {number}"))
+
+        common_symptoms = data.get("common_symptoms", {})
+        if isinstance(common_symptoms, dict):
+            common_symptoms = common_symptoms.items()
+        else:
+            common_symptoms = [(item.get("name"), item.get("category")) for item in common_symptoms]
+        for name, category in common_symptoms:
+            if not name or not category:
+                raise KnowledgeBaseError(f"{path}: common symptoms need a name and category")
+            self.add_common_symptom(name, category)
+
+
+def _split(value, separators: Iterable[str]) -> Tuple[str, ...]:
+    """Non-empty stripped items of a list, or of a string split on any separator"""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        for separator in separators:
+            value = value.replace(separator, "\0")
+        value = value.split("\0")
+    return tuple(str(item).strip() for item in value if str(item).strip())
+
+
+def make_record(source: dict, where: str) -> ConditionRecord:
+    """Validate one condition from a CSV row or JSON object"""
+    name = (source.get("name") or "").strip()
+    description = (source.get("description") or "").strip()
+    severity = (source.get("severity") or "").strip().lower()
+    symptoms = tuple(symptom.lower() for symptom in _split(source.get("symptoms"), SYMPTOM_SEPARATORS))
+
+    if not name:
+        raise KnowledgeBaseError(f"{where}: condition name is required")
+    if not description:
+        raise KnowledgeBaseError(f"{where}: {name}: description is required")
+    if not symptoms:
+        raise KnowledgeBaseError(f"{where}: {name}: at least one symptom is required")
+    if severity not in SEVERITIES:
+        raise KnowledgeBaseError(f"{where}: {name}: severity must be one of {', '.join(SEVERITIES)}")
+
+    return ConditionRecord(
+        name=name,
+        description=description,
+        symptoms=symptoms,
+        severity=severity,
+        typical_duration=(source.get("typical_duration") or "").strip() or None,
+        when_to_see_doctor=(source.get("when_to_see_doctor") or "").strip() or None,
+        self_care_tips=_split(source.get("self_care_tips"), (TIP_SEPARATOR,))
+    )
+
+
+def _uint32(values) -> bytes:
+    packed = array("I", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def write_snapshot(knowledge_base: KnowledgeBase, path: str) -> str:
+    """Compile a knowledge base into a snapshot file and return its version"""
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        return string_id
+
+    condition_fields: List[int] = []
+    references: List[int] = []
+    for record in knowledge_base.conditions.values():
+        condition_fields.extend((
+            intern(record.name), intern(record.description), intern(record.severity),
+            intern(record.typical_duration), intern(record.when_to_see_doctor)
+        ))
+        condition_fields.extend((len(references), len(record.symptoms)))
+        references.extend(intern(symptom) for symptom in record.symptoms)
+        condition_fields.extend((len(references), len(record.self_care_tips)))
+        references.extend(intern(tip) for tip in record.self_care_tips)
+
+    common_fields: List[int] = []
+    for name, category in knowledge_base.common_symptoms.items():
+        common_fields.extend((intern(name), intern(category)))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    data = b"".join(encoded)
+    # Keep the uint32 sections 4-byte aligned
+    data += b"\0" * (-len(data) % 4)
+
+    body = b"".join((_uint32(offsets), data, _uint32(condition_fields), _uint32(references), _uint32(common_fields)))
+    digest = hashlib.sha256(body).digest()
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, digest,
+        len(knowledge_base.conditions), len(knowledge_base.common_symptoms), len(strings), len(references)
+    )
+
+    # Write next to the target and rename, so workers never map a half-written file
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(temporary_path, path)
+    return digest.hex()
+
+
+class KnowledgeBaseSnapshot:
+    """
+    Read-only view of a snapshot file, memory-mapped rather than read.
+
+    Only the string table is decoded on open; condition rows are assembled
+    from the mapped uint32 sections when iterated.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        # Views into the map, released before it is closed
+        self._views: List[memoryview] = []
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise KnowledgeBaseError(f"{path}: empty snapshot file")
+
+        try:
+            self._open(verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, verify: bool):
+        if len(self._map) < HEADER.size:
+            raise KnowledgeBaseError(f"{self.path}: not a knowledge-base snapshot")
+        magic, format_version, digest, conditions, common_symptoms, strings, references = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise KnowledgeBaseError(f"{self.path}: not a knowledge-base snapshot")
+        if format_version != FORMAT_VERSION:
+            raise KnowledgeBaseError(
+                f"{self.path}: snapshot format {format_version} is not supported, rebuild it"
+            )
+
+        body = self._view(memoryview(self._map))[HEADER.size:]
+        self._view(body)
+        if verify and hashlib.sha256(body).digest() != digest:
+            raise KnowledgeBaseError(f"{self.path}: snapshot is corrupt (checksum mismatch)")
+
+        self.version = digest.hex()
+        self.condition_count = conditions
+        self.common_symptom_count = common_symptoms
+
+        position = 0
+        offsets, position = self._uint32_section(body, position, strings + 1)
+        data = bytes(body[position:position + offsets[-1]])
+        position += offsets[-1] + (-offsets[-1] % 4)
+        self._fields, position = self._uint32_section(body, position, conditions * CONDITION_FIELDS)
+        self._references, position = self._uint32_section(body, position, references)
+        self._common, position = self._uint32_section(body, position, common_symptoms * 2)
+        if position != len(body):
+            raise KnowledgeBaseError(f"{self.path}: snapshot is truncated or has trailing data")
+
+        self.strings: List[str] = [
+            data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(strings)
+        ]
+
+    def _uint32_section(self, body: memoryview, position: int, count: int):
+        end = position + count * 4
+        if end > len(body):
+            raise KnowledgeBaseError(f"{self.path}: snapshot is truncated")
+        section = self._view(body[position:end])
+        if sys.byteorder == "little":
+            return self._view(section.cast("I")), end
+        values = array("I", section.tobytes())
+        values.byteswap()
+        return values, end
+
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _string(self, string_id: int) -> Optional[str]:
+        return None if string_id == NO_STRING else self.strings[string_id]
+
+    def _strings(self, start: int, count: int) -> Tuple[str, ...]:
+        return tuple(self.strings[string_id] for string_id in self._references[start:start + count])
+
+    def records(self) -> Iterable[ConditionRecord]:
+        """Every condition in the snapshot, in source order"""
+        fields = self._fields
+        for base in range(0, len(fields), CONDITION_FIELDS):
+            yield ConditionRecord(
+                name=self.strings[fields[base]],
+                description=self.strings[fields[base + 1]],
+                symptoms=self._strings(fields[base + 5], fields[base + 6]),
+                severity=self.strings[fields[base + 2]],
+                typical_duration=self._string(fields[base + 3]),
+                when_to_see_doctor=self._string(fields[base + 4]),
+                self_care_tips=self._strings(fields[base + 7], fields[base + 8])
+            )
+
+    def condition_rows(self) -> List[tuple]:
+        """Conditions as (id, name, description, symptoms, severity) rows, ids numbered from 1"""
+        return [
+            (number, record.name, record.description, ",".join(record.symptoms), record.severity)
+            for number, record in enumerate(self.records(), start=1)
+        ]
+
+    def condition_details(self) -> Dict[int, ConditionDetails]:
+        """Condition id -> details, for conditions whose source provided any; ids as in condition_rows"""
+        details = {}
+        for number, record in enumerate(self.records(), start=1):
+            record_details = record.details()
+            if record_details is not None:
+                details[number] = record_details
+        return details
+
+    def common_symptoms(self) -> List[Tuple[str, str]]:
+        """(name, category) pairs of the snapshot's common symptoms"""
+        common = self._common
+        return [(self.strings[common[i]], self.strings[common[i + 1]]) for i in range(0, len(common), 2)]
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self) -> "KnowledgeBaseSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile condition knowledge-base sources into a snapshot")
+    parser.add_argument("sources", nargs="*", help="CSV or JSON knowledge-base files, later ones take precedence")
+    parser.add_argument("-o", "--output", required=True, help="snapshot file to write")
+    parser.add_argument("--include-db", help="start from the conditions stored in this symptom checker database")
+    args = parser.parse_args()
+
+    if not args.sources and not args.include_db:
+        parser.error("no knowledge-base sources given")
+
+    knowledge_base = KnowledgeBase()
+    try:
+        if args.include_db:
+            knowledge_base.load_database(args.include_db)
+        for source in args.sources:
+            knowledge_base.load(source)
+        version = write_snapshot(knowledge_base, args.output)
+    except (OSError, KnowledgeBaseError) as e:
+        sys.exit(f"error: {e}")
+
+    print(f"Wrote {args.output}: {len(knowledge_base.conditions)} conditions, "
+          f"{len(knowledge_base.common_symptoms)} common symptoms, "
+          f"{knowledge_base.replaced} replaced, version {version[:16]}")
+
+
+if __name__ == "__main__":
+    main()
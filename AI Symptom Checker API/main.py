@@ -1,9 +1,31 @@
-from fastapi import FastAPI, HTTPException
+from typing import List, Optional, Tuple
+import asyncio
+from datetime import datetime, timezone
+import base64
+import json
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from models import SymptomInput, ComprehensiveResponse
+from models import (
+    SymptomInput, ComprehensiveResponse, AnalysisHistoryPage, SeverityLevel, FollowUpInput, SessionResponse,
+    response_json, session_json
+)
 from symptom_checker import EnhancedSymptomAnalyzer
+from ranking import DEFAULT_RANKING_MODE, RANKERS
 from database import DatabaseManager
+from analysis_pool import AnalysisPool, PoolOverloaded
+from health import HealthMonitor
+from kb_reloader import KnowledgeBaseReloader
+from sessions import NoSymptomsLeft, SessionAnalysis, SessionNotFound, SessionStore
+from preload import preload, warm_up
+from bulk_analysis import (
+    BULK_CONTENT_TYPES, BulkAnalysisStream, BulkInputError, BulkRowReader, NDJSONStreamingResponse
+)
+from metrics import (
+    REGISTRY, HTTP_REQUEST_SECONDS, HTTP_STAGE_SECONDS, NULL_STAGE_TIMER, MetricsMiddleware
+)
 import uvicorn
+import os
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,14 +43,153 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request latency; runs outermost so it sees the whole request
+app.add_middleware(
+    MetricsMiddleware,
+    registry=REGISTRY,
+    histogram=HTTP_REQUEST_SECONDS,
+    stage_histogram=HTTP_STAGE_SECONDS
+)
+
+# Condition scoring mode, checked before anything else starts
+RANKING_MODE = os.getenv("RANKING_MODE", DEFAULT_RANKING_MODE).strip().lower()
+if RANKING_MODE not in RANKERS:
+    raise ValueError(
+        f"Invalid RANKING_MODE {RANKING_MODE!r}: set it to one of {', '.join(RANKERS)} "
+        f"or leave it unset for {DEFAULT_RANKING_MODE}"
+    )
+
 # Initialize components
-db_manager = DatabaseManager()
-symptom_analyzer = EnhancedSymptomAnalyzer()
+db_manager = DatabaseManager(kb_snapshot=os.getenv("KB_SNAPSHOT") or None)
+symptom_analyzer = EnhancedSymptomAnalyzer(
+    db_manager,
+    cache_size=int(os.getenv("ANALYSIS_CACHE_SIZE", "1024")),
+    cache_ttl=float(os.getenv("ANALYSIS_CACHE_TTL", "300")),
+    ranking_mode=RANKING_MODE
+)
+
+# Analysis runs on a bounded thread pool so it never blocks the event loop
+analysis_pool = AnalysisPool(
+    max_workers=int(os.getenv("ANALYZER_WORKERS", "2")),
+    queue_limit=int(os.getenv("ANALYZER_QUEUE_LIMIT", "64"))
+)
+RETRY_AFTER_SECONDS = os.getenv("ANALYZER_RETRY_AFTER", "1")
+
+# Follow-up sessions, held in process: a pre-forking server needs sticky
+# routing for a session's follow-ups to reach the worker that holds it
+session_store = SessionStore(
+    symptom_analyzer,
+    max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+    ttl=float(os.getenv("SESSION_TTL", "1800"))
+)
+
+# Build analyzer state once in the master of a pre-forking server, so workers
+# share it instead of each building a copy (see preload.py)
+PRELOADED = os.getenv("PRELOAD_ANALYZER", "0") == "1"
+if PRELOADED:
+    preload(db_manager, symptom_analyzer)
+
+# Knowledge-base changes are picked up and indexed in the background
+kb_reloader = KnowledgeBaseReloader(db_manager, interval=float(os.getenv("KB_RELOAD_INTERVAL", "5")))
+
+# Readiness is probed in the background and served from memory
+health_monitor = HealthMonitor(
+    db_manager,
+    analysis_pool,
+    interval=float(os.getenv("HEALTH_PROBE_INTERVAL", "2.0")),
+    max_pool_saturation=float(os.getenv("HEALTH_MAX_POOL_SATURATION", "1.0"))
+)
+LIVENESS_BODY = b'{"status":"alive"}'
+
+# Gauges and counters read from the components when /metrics is scraped
+REGISTRY.callback("symptom_checker_analyzer_pool_in_flight", "Analysis jobs running or queued",
+                  lambda: analysis_pool.stats()["in_flight"])
+REGISTRY.callback("symptom_checker_analyzer_pool_rejected_total", "Analysis jobs rejected because the pool was full",
+                  lambda: analysis_pool.stats()["rejected"], kind="counter")
+REGISTRY.callback("symptom_checker_storage_queue_depth", "Analyses waiting in the write-behind queue",
+                  lambda: db_manager.write_queue.stats()["queue_depth"] if db_manager.write_queue else None)
+REGISTRY.callback("symptom_checker_storage_dropped_total", "Analyses dropped because the write-behind queue was full",
+                  lambda: db_manager.write_queue.stats()["dropped"] if db_manager.write_queue else None,
+                  kind="counter")
+REGISTRY.callback("symptom_checker_sessions", "Follow-up sessions held in process", lambda: len(session_store))
+REGISTRY.callback("symptom_checker_result_cache_entries", "Analysis results held in the result cache",
+                  lambda: len(symptom_analyzer.result_cache))
+REGISTRY.callback("symptom_checker_result_cache_lookups_total", "Analysis result cache lookups, by outcome",
+                  lambda: {"hit": symptom_analyzer.result_cache.hits, "miss": symptom_analyzer.result_cache.misses},
+                  kind="counter", labelname="outcome")
+
+def overloaded_error(error: PoolOverloaded) -> HTTPException:
+    """503 response telling clients when to retry"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Service overloaded, please retry later: {error}",
+        headers={"Retry-After": RETRY_AFTER_SECONDS}
+    )
+
+def record_handler_time(request: Request, timer):
+    """Record an endpoint's stages and hand its duration to MetricsMiddleware"""
+    if timer is NULL_STAGE_TIMER:
+        return
+    timer.finish("handler")
+    request.state.handler_seconds = timer.last - timer.started
+
+def analyze_serialized(symptom_input: SymptomInput) -> Tuple[ComprehensiveResponse, bytes]:
+    """Analyze on a pool worker and serialize the result there, once"""
+    result = symptom_analyzer.analyze_symptoms(symptom_input)
+    return result, response_json(result)
+
+def analyze_batch_serialized(symptom_inputs: List[SymptomInput]) -> Tuple[List[ComprehensiveResponse], List[bytes]]:
+    """Batch counterpart of analyze_serialized"""
+    results = symptom_analyzer.analyze_symptoms_batch(symptom_inputs)
+    return results, [response_json(result) for result in results]
+
+def session_serialized(operation, *args) -> Tuple[SessionAnalysis, bytes]:
+    """Run a session operation on a pool worker and serialize its analysis there, once"""
+    analysis = operation(*args)
+    return analysis, response_json(analysis.response)
+
+def encode_history_cursor(key: Tuple[str, int]) -> str:
+    """Opaque cursor for the (timestamp, id) key of the last analysis on a page"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        timestamp, analysis_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(timestamp, str) or not isinstance(analysis_id, int):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+    return timestamp, analysis_id
+
+def stored_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """Timestamp in the UTC format sqlite stores (naive datetimes are taken as UTC)"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
-    db_manager.initialize_database()
+    """Initialize database, warm up and start the background analysis writer on startup"""
+    if not PRELOADED:
+        warm_up(db_manager, symptom_analyzer)
+    db_manager.start_write_behind(
+        max_size=int(os.getenv("STORAGE_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("STORAGE_BATCH_SIZE", "100")),
+        flush_interval=float(os.getenv("STORAGE_FLUSH_INTERVAL", "1.0"))
+    )
+    kb_reloader.start()
+    health_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered analyses and close database connections before shutting down"""
+    health_monitor.stop()
+    kb_reloader.stop()
+    analysis_pool.shutdown()
+    db_manager.stop_write_behind()
+    db_manager.close()
 
 @app.get("/")
 async def root():
@@ -46,12 +207,21 @@ async def root():
             "Emergency warning system"
         ],
         "main_endpoint": "/analyze-symptoms",
+        "batch_endpoint": "/analyze-symptoms/batch",
+        "bulk_endpoint": "/analyze-symptoms/bulk",
+        "sessions": "/sessions",
+        "statistics": "/statistics",
+        "history": "/analyses",
+        "metrics": "/metrics",
+        "knowledge_base_reload": "/knowledge-base/reload",
         "documentation": "/docs",
-        "health_check": "/health"
+        "health_check": "/health",
+        "liveness": "/health/live",
+        "readiness": "/health/ready"
     }
 
 @app.post("/analyze-symptoms", response_model=ComprehensiveResponse)
-async def analyze_symptoms(symptom_input: SymptomInput):
+async def analyze_symptoms(symptom_input: SymptomInput, request: Request):
     """
     Comprehensive symptom analysis endpoint
     
@@ -76,48 +246,356 @@ async def analyze_symptoms(symptom_input: SymptomInput):
                 detail="Symptom description is required. Please describe your symptoms."
             )
         
-        # Perform comprehensive analysis
-        result = symptom_analyzer.analyze_symptoms(symptom_input)
+        timer = REGISTRY.stage_timer(HTTP_STAGE_SECONDS, "/analyze-symptoms")
+        
+        # Perform comprehensive analysis; the result is serialized once, already
+        # validated, and the same bytes are returned and stored
+        result, document = await analysis_pool.run(analyze_serialized, symptom_input)
+        timer.mark("analysis")
         
         # Store analysis for learning (optional - can be disabled for privacy)
         try:
-            db_manager.store_symptom_analysis(symptom_input, result)
+            db_manager.store_symptom_analysis(symptom_input, result, document)
         except Exception as e:
             # Don't fail the request if storage fails
             print(f"Warning: Could not store analysis: {e}")
+        timer.mark("storage")
         
-        return result
+        record_handler_time(request, timer)
+        return Response(content=document, media_type="application/json")
     
     except HTTPException:
         raise
+    except PoolOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error analyzing symptoms: {str(e)}"
         )
 
-@app.get("/health")
-async def health_check():
+@app.post("/analyze-symptoms/batch", response_model=List[ComprehensiveResponse])
+async def analyze_symptoms_batch(symptom_inputs: List[SymptomInput], request: Request):
+    """
+    Batch symptom analysis endpoint
+    
+    Accepts a list of symptom inputs and returns one comprehensive analysis per
+    input, in the same order. Condition scoring for the whole batch is done in
+    a single vectorized pass, and each result matches what /analyze-symptoms
+    returns for the same input.
+    """
+    try:
+        # Validate input
+        for position, symptom_input in enumerate(symptom_inputs):
+            if not symptom_input.symptoms or not symptom_input.symptoms.strip():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Symptom description is required for item {position}. Please describe your symptoms."
+                )
+        
+        timer = REGISTRY.stage_timer(HTTP_STAGE_SECONDS, "/analyze-symptoms/batch")
+        
+        # Perform comprehensive analysis for the whole batch
+        results, documents = await analysis_pool.run(analyze_batch_serialized, symptom_inputs)
+        timer.mark("analysis")
+        
+        # Store analyses for learning (optional - can be disabled for privacy)
+        try:
+            db_manager.store_symptom_analyses(list(zip(symptom_inputs, results)), documents)
+        except Exception as e:
+            # Don't fail the request if storage fails
+            print(f"Warning: Could not store analyses: {e}")
+        timer.mark("storage")
+        
+        record_handler_time(request, timer)
+        return Response(content=b"[" + b",".join(documents) + b"]", media_type="application/json")
+    
+    except HTTPException:
+        raise
+    except PoolOverloaded as e:
+        raise overloaded_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing symptoms: {str(e)}"
+        )
+
+@app.post("/analyze-symptoms/bulk")
+async def analyze_symptoms_bulk(request: Request, format: Optional[str] = None):
+    """
+    Streaming bulk symptom analysis for CSV or NDJSON uploads
+    
+    Send rows as text/csv (with a header containing a "symptoms" column and
+    optionally age, gender and additional_info) or application/x-ndjson (one
+    SymptomInput object or plain symptom string per line); pass ?format=csv
+    or ?format=ndjson to override the content type. Results stream back as
+    NDJSON in input order, one line per row:
+    
+    - {"row": 1, "result": {...comprehensive analysis...}}
+    - {"row": 2, "error": "Symptom description is required. ..."}
+    
+    Rows are read and analyzed incrementally, so memory stays bounded and a
+    slow reader slows down how fast the upload is consumed.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    row_format = (format or BULK_CONTENT_TYPES.get(content_type, "")).lower()
+    if row_format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=415,
+            detail="Bulk uploads must be text/csv or application/x-ndjson (or pass ?format=csv|ndjson)"
+        )
+    
+    rows = BulkRowReader(
+        request.stream(),
+        row_format,
+        max_record_size=int(os.getenv("BULK_MAX_RECORD_SIZE", "65536"))
+    )
+    try:
+        await rows.start()
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results = BulkAnalysisStream(
+        rows,
+        analysis_pool,
+        symptom_analyzer,
+        db_manager,
+        batch_size=int(os.getenv("BULK_BATCH_SIZE", "64")),
+        window=int(os.getenv("BULK_WINDOW", "4"))
+    )
+    return NDJSONStreamingResponse(results)
+
+@app.post("/sessions", response_model=SessionResponse)
+async def start_session(symptom_input: SymptomInput, request: Request):
+    """
+    Start a follow-up session
+    
+    Analyzes the input like /analyze-symptoms and returns the analysis with a
+    session id. Answers to the follow-up questions go to
+    /sessions/{session_id}/follow-up, which adds or removes symptoms and
+    updates the context, recomputing only what the answers change. Sessions
+    expire SESSION_TTL seconds (default 1800) after their last analysis.
+    """
+    try:
+        if not symptom_input.symptoms or not symptom_input.symptoms.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="Symptom description is required. Please describe your symptoms."
+            )
+        
+        timer = REGISTRY.stage_timer(HTTP_STAGE_SECONDS, "/sessions")
+        analysis, document = await analysis_pool.run(session_serialized, session_store.start, symptom_input)
+        timer.mark("analysis")
+        
+        # Store analysis for learning (optional - can be disabled for privacy)
+        try:
+            db_manager.store_symptom_analysis(analysis.symptom_input, analysis.response, document)
+        except Exception as e:
+            print(f"Warning: Could not store analysis: {e}")
+        timer.mark("storage")
+        
+        record_handler_time(request, timer)
+        return Response(
+            content=session_json(analysis.session_id, analysis.revision, document),
+            media_type="application/json"
+        )
+    
+    except HTTPException:
+        raise
+    except PoolOverloaded as e:
+        raise overloaded_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing symptoms: {str(e)}"
+        )
+
+@app.post("/sessions/{session_id}/follow-up", response_model=SessionResponse)
+async def follow_up_session(session_id: str, follow_up: FollowUpInput, request: Request):
     """
-    API health check endpoint
+    Answer a session's follow-up questions
+    
+    Adds and removes symptoms (in the same flexible format as the initial
+    input) and updates age, gender or additional information. Only the
+    changed symptoms are scanned and categorized, and only the conditions
+    they match are rescored; the analysis equals a fresh one of the
+    session's current symptoms and context.
     """
     try:
-        # Test database connection
-        db_manager.get_connection().close()
+        timer = REGISTRY.stage_timer(HTTP_STAGE_SECONDS, "/sessions/{session_id}/follow-up")
+        analysis, document = await analysis_pool.run(
+            session_serialized, session_store.follow_up, session_id, follow_up
+        )
+        timer.mark("analysis")
+        
+        # Store analysis for learning (optional - can be disabled for privacy)
+        try:
+            db_manager.store_symptom_analysis(analysis.symptom_input, analysis.response, document)
+        except Exception as e:
+            print(f"Warning: Could not store analysis: {e}")
+        timer.mark("storage")
         
-        return {
-            "status": "healthy",
-            "service": "AI Symptom Checker API",
-            "version": "2.0.0",
-            "database": "connected",
-            "ai_analyzer": "ready"
-        }
+        record_handler_time(request, timer)
+        return Response(
+            content=session_json(analysis.session_id, analysis.revision, document),
+            media_type="application/json"
+        )
+    
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found or expired")
+    except NoSymptomsLeft as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(
-            status_code=503,
-            detail=f"Service unhealthy: {str(e)}"
+            status_code=500,
+            detail=f"Error analyzing symptoms: {str(e)}"
         )
 
+@app.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    """
+    End a follow-up session and forget its state
+    """
+    try:
+        session_store.end(session_id)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found or expired")
+    return {"session_id": session_id, "ended": True}
+
+@app.get("/symptoms/lookup")
+def lookup_symptom(q: str, limit: int = 5):
+    """
+    Typo-tolerant symptom lookup
+    
+    Returns up to 10 canonical symptom names closest to the query (for example
+    "headahce" -> "headache") with a similarity score between 0.0 and 1.0.
+    """
+    # A plain def: FastAPI runs it on its threadpool, keeping the lookup off the event loop
+    matches = db_manager.get_condition_index().resolve_symptom(q, limit=max(1, min(limit, 10)))
+    return {
+        "query": q,
+        "matches": [{"symptom": symptom, "similarity": similarity} for symptom, similarity in matches]
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Latency histograms and counters in the Prometheus text format
+    
+    Covers every analysis stage, DatabaseManager operations, analyzer pool
+    waits and HTTP requests by route. METRICS_SAMPLE_RATE (default 0.1) is
+    the fraction of operations timed; counters are always exact.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/knowledge-base/reload")
+async def reload_knowledge_base():
+    """
+    Rebuild the condition index from the conditions table or the KB_SNAPSHOT file
+    
+    The new index is built on a background thread and swapped in atomically:
+    analyses in flight finish on the previous version and no request waits
+    for the rebuild. Changes are also picked up every KB_RELOAD_INTERVAL
+    seconds (default 5, 0 to reload only through this endpoint); with
+    several workers this endpoint reloads the worker that serves it.
+    """
+    try:
+        return await asyncio.wrap_future(kb_reloader.request_reload())
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Knowledge base reload failed: {e}")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Analysis result cache statistics (hits, misses, evictions)
+    """
+    return symptom_analyzer.result_cache.stats()
+
+@app.get("/analyses", response_model=AnalysisHistoryPage)
+def analysis_history(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     severity: Optional[SeverityLevel] = None, symptom: Optional[str] = None,
+                     limit: int = 50, cursor: Optional[str] = None, include_results: bool = False):
+    """
+    Stored analysis history, newest first
+    
+    Filter by time range (start inclusive, end exclusive), severity level
+    and extracted symptom (for example "fever"). Pass the returned
+    next_cursor to get the following page; every page costs the same
+    however deep it is. Set include_results=true to get each full analysis.
+    """
+    # A plain def: FastAPI runs it on its threadpool, keeping sqlite reads and
+    # payload decoding off the event loop
+    after = decode_history_cursor(cursor) if cursor else None
+    items, next_key = db_manager.get_analysis_history(
+        start=stored_timestamp(start),
+        end=stored_timestamp(end),
+        severity=severity.value if severity else None,
+        symptom=symptom,
+        limit=max(1, min(limit, 500)),
+        after=after,
+        include_results=include_results
+    )
+    return {"items": items, "next_cursor": encode_history_cursor(next_key) if next_key else None}
+
+@app.get("/analyses/{analysis_id}")
+def stored_analysis(analysis_id: int):
+    """
+    One stored analysis, exactly as it was returned when it was made
+    """
+    # A plain def, run on the threadpool like analysis_history
+    document = db_manager.get_analysis_result(analysis_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Analysis {analysis_id} not found")
+    return Response(content=document, media_type="application/json")
+
+@app.get("/statistics")
+def analysis_statistics(days: Optional[int] = None):
+    """
+    Statistics about stored analyses
+    
+    Served from rollup tables kept up to date on every write, so the cost
+    does not grow with the number of stored analyses. Pass ?days=N to also
+    get per-day statistics for the last N days (UTC).
+    """
+    # A plain def: FastAPI runs it on its threadpool, keeping sqlite reads off the event loop
+    statistics = db_manager.get_analysis_statistics()
+    if days is not None:
+        statistics["daily"] = db_manager.get_daily_analysis_statistics(max(1, min(days, 366)))
+    return statistics
+
+@app.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: answers as long as the event loop is serving requests
+    """
+    return Response(content=LIVENESS_BODY, media_type="application/json")
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe, answered from the last background health probe
+    
+    Reports database reachability, the loaded knowledge base and its
+    version, write-behind queue depth and analyzer pool saturation, without
+    touching the database. Returns 503 while any check fails, while
+    shutting down, or when the probe has stopped refreshing.
+    """
+    ready, body = health_monitor.readiness()
+    return Response(content=body, status_code=200 if ready else 503, media_type="application/json")
+
+@app.get("/health")
+async def health_check():
+    """
+    API health check endpoint: the process is up and the database answers
+    
+    Answered from the last background probe's database check. Load (pool
+    saturation, queue depth) only shows up in /health/ready.
+    """
+    alive, body = health_monitor.liveness()
+    return Response(content=body, status_code=200 if alive else 503, media_type="application/json")
+
 
 if __name__ == "__main__":
    
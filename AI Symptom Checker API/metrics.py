@@ -0,0 +1,361 @@
+"""
+Low-overhead latency metrics in the Prometheus text exposition format.
+
+Counters are always updated. Latency histograms can be sampled: with a
+sample rate below 1.0 only that fraction of operations is timed, and a
+whole analysis is either timed end to end or not at all, so the
+per-stage breakdown stays consistent. A stage timer collects its stage
+durations locally and takes the histogram lock once when it finishes.
+"""
+import bisect
+import functools
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from 25 microseconds to 10 seconds
+DEFAULT_BUCKETS = (
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, labels), value) for labels, value in values]
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, optionally labelled"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        self.observe_many(((labels, value),))
+
+    def observe_many(self, observations: Iterable[Tuple[LabelValues, float]]):
+        """Record several (label values, seconds) observations under one lock"""
+        buckets = self.buckets
+        with self._lock:
+            for labels, value in observations:
+                series = self._series.get(labels)
+                if series is None:
+                    series = self._series[labels] = [[0] * (len(buckets) + 1), 0.0, 0]
+                series[0][bisect.bisect_left(buckets, value)] += 1
+                series[1] += value
+                series[2] += 1
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            series = sorted((labels, [list(data[0]), data[1], data[2]]) for labels, data in self._series.items())
+
+        samples = []
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, labels, le), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, labels), total))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, labels), count))
+        return samples
+
+
+class CallbackMetric:
+    """
+    Gauge or counter read from another component when metrics are scraped.
+
+    The callback returns a number, or {label value: number} for a metric
+    with one label.
+    """
+
+    def __init__(self, name: str, help_text: str, callback: Callable[[], object],
+                 kind: str = "gauge", labelname: Optional[str] = None):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelname = labelname
+        self._callback = callback
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        value = self._callback()
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            return [(self.name, _format_labels((self.labelname,), (label,)), number)
+                    for label, number in sorted(value.items())]
+        return [(self.name, "", value)]
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one operation into a histogram whose last
+    label is the stage, after any fixed leading labels
+    """
+
+    __slots__ = ("histogram", "labels", "started", "last", "stages")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues = ()):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = self.last = time.perf_counter()
+        self.stages: List[Tuple[LabelValues, float]] = []
+
+    def mark(self, stage: str):
+        """Close the stage that started at the previous mark"""
+        now = time.perf_counter()
+        self.stages.append((self.labels + (stage,), now - self.last))
+        self.last = now
+
+    def finish(self, total_stage: Optional[str] = None):
+        """Record every marked stage, plus the time since creation as total_stage"""
+        if total_stage is not None:
+            self.stages.append((self.labels + (total_stage,), self.last - self.started))
+        self.histogram.observe_many(self.stages)
+        self.stages = []
+
+
+class _NullStageTimer:
+    """Stand-in for StageTimer when an operation is not sampled"""
+
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+    def finish(self, total_stage: Optional[str] = None):
+        pass
+
+
+NULL_STAGE_TIMER = _NullStageTimer()
+
+
+class _Timed:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class _NotTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NOT_TIMED = _NotTimed()
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together, sharing one sample rate"""
+
+    def __init__(self, sample_rate: float = 1.0):
+        self.sample_rate = sample_rate
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, callback: Callable[[], object],
+                 kind: str = "gauge", labelname: Optional[str] = None) -> CallbackMetric:
+        """Register (or replace) a metric read from callback at scrape time"""
+        metric = CallbackMetric(name, help_text, callback, kind, labelname)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def sampled(self) -> bool:
+        """Whether the current operation should be timed"""
+        rate = self.sample_rate
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def stage_timer(self, histogram: Histogram, *labels: str):
+        """A StageTimer for a sampled operation, otherwise a no-op timer"""
+        return StageTimer(histogram, labels) if self.sampled() else NULL_STAGE_TIMER
+
+    def time(self, histogram: Histogram, *labels: str):
+        """Context manager timing a block into histogram when the operation is sampled"""
+        return _Timed(histogram, labels) if self.sampled() else NOT_TIMED
+
+    def timed(self, histogram: Histogram, operation: str, counter: Optional[Counter] = None):
+        """Decorator counting calls of a function and timing the sampled ones, labelled operation"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if counter is not None:
+                    counter.inc(operation)
+                if not self.sampled():
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, operation)
+            return wrapper
+        return decorate
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request until its response starts.
+
+    Requests are labelled with the matched route template rather than the
+    raw path. An endpoint that stores its own duration as
+    request.state.handler_seconds also gets a "framework" stage: request
+    parsing, response validation and serialization around the endpoint.
+    Streaming responses are passed through untouched.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry", histogram: Histogram, stage_histogram: Histogram):
+        self.app = app
+        self.registry = registry
+        self.histogram = histogram
+        self.stage_histogram = stage_histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                route = scope.get("route")
+                route_path = getattr(route, "path", "unmatched")
+                self.histogram.observe(elapsed, scope["method"], route_path, str(message["status"]))
+                handler_seconds = scope.get("state", {}).get("handler_seconds")
+                if handler_seconds is not None:
+                    self.stage_histogram.observe(max(elapsed - handler_seconds, 0.0), route_path, "framework")
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+REGISTRY = MetricsRegistry(sample_rate=float(os.getenv("METRICS_SAMPLE_RATE", "0.1")))
+
+ANALYSIS_STAGE_SECONDS = REGISTRY.histogram(
+    "symptom_checker_analysis_stage_seconds",
+    "Time spent in each stage of a symptom analysis",
+    ("stage",)
+)
+ANALYSES_TOTAL = REGISTRY.counter(
+    "symptom_checker_analyses_total",
+    "Symptom analyses performed, by how the result was produced",
+    ("source",)
+)
+DATABASE_OPERATION_SECONDS = REGISTRY.histogram(
+    "symptom_checker_database_operation_seconds",
+    "Time spent in DatabaseManager operations",
+    ("operation",)
+)
+DATABASE_OPERATIONS_TOTAL = REGISTRY.counter(
+    "symptom_checker_database_operations_total",
+    "DatabaseManager operations performed",
+    ("operation",)
+)
+ANALYSES_STORED_TOTAL = REGISTRY.counter(
+    "symptom_checker_analyses_stored_total",
+    "Analyses written to the database"
+)
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "symptom_checker_pool_wait_seconds",
+    "Time analysis jobs waited for a pool worker"
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "symptom_checker_http_request_seconds",
+    "HTTP request latency until the response starts, by route",
+    ("method", "route", "status")
+)
+HTTP_STAGE_SECONDS = REGISTRY.histogram(
+    "symptom_checker_http_stage_seconds",
+    "Time spent in each stage of an HTTP request, by route",
+    ("route", "stage")
+)
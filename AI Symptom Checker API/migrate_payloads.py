@@ -0,0 +1,54 @@
+"""
+One-off migration of stored analyses to the compact payload format.
+
+Rows written before analysis_result payloads were deduplicated and
+compressed hold the full JSON document. This converts them in batches
+(each batch in its own transaction, so the API can keep running) and
+prints how many bytes were saved per row. Running it again only touches
+rows that are still plain JSON.
+
+Run from the project directory:
+    python migrate_payloads.py [--db symptom_checker.db] [--batch-size 500] [--report-only] [--vacuum]
+"""
+import argparse
+import time
+
+from database import DatabaseManager
+
+
+def print_report(report: dict):
+    print(f"{report['rows']} analyses ({report['compact_rows']} compact), {report['fragments']} shared fragments")
+    print(f"  original JSON  {report['original_bytes']:>14,} bytes  {report['original_bytes_per_row']:>10,.1f} per row")
+    print(f"  stored         {report['stored_bytes'] + report['fragment_bytes']:>14,} bytes  "
+          f"{report['stored_bytes_per_row']:>10,.1f} per row (fragments included)")
+    print(f"  saved          {report['saved_bytes']:>14,} bytes  {report['saved_bytes_per_row']:>10,.1f} per row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stored analyses to the compact payload format")
+    parser.add_argument("--db", default="symptom_checker.db", help="symptom checker database")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows converted per transaction")
+    parser.add_argument("--report-only", action="store_true", help="only print the storage report")
+    parser.add_argument("--vacuum", action="store_true", help="reclaim freed pages afterwards")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_database()
+
+    if not args.report_only:
+        start = time.perf_counter()
+        converted, bytes_before, bytes_after = db_manager.compress_stored_analyses(args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"Converted {converted} analyses in {elapsed:.2f}s: "
+              f"{bytes_before:,} -> {bytes_after:,} bytes of row payload")
+
+        # Freed pages are reused by new rows; VACUUM gives them back to the filesystem
+        if args.vacuum:
+            db_manager.get_connection().execute("VACUUM")
+
+    print_report(db_manager.get_payload_storage_report())
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
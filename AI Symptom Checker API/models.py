@@ -1,3 +1,4 @@
+import json
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
@@ -76,6 +77,65 @@ class ComprehensiveResponse(BaseModel):
     confidence_score: float = Field(..., description="Overall confidence in the analysis (0.0 to 1.0)")
     disclaimer: str = Field(..., description="Medical disclaimer")
 
+def response_json(response: ComprehensiveResponse) -> bytes:
+    """
+    JSON bytes of an analysis, the same document as model_dump_json().
+    Serialize once and reuse the bytes for the HTTP response and the stored payload.
+    """
+    return response.__pydantic_serializer__.to_json(response)
+
+class FollowUpInput(BaseModel):
+    """Answers to an analysis session's follow-up questions"""
+    add_symptoms: Optional[str] = Field(
+        None,
+        description="Symptoms to add, in the same flexible format as the initial input",
+        example="light sensitivity, nausea"
+    )
+    remove_symptoms: Optional[str] = Field(
+        None,
+        description="Symptoms that no longer apply, in the same format",
+        example="fever"
+    )
+    age: Optional[int] = Field(None, description="Patient age, if not given before or changed", example=30)
+    gender: Optional[str] = Field(None, description="Patient gender, if not given before or changed", example="male")
+    additional_info: Optional[str] = Field(
+        None,
+        description="Replaces the session's additional information",
+        example="Worse in bright light"
+    )
+
+class SessionResponse(BaseModel):
+    """Analysis of a follow-up session's current symptoms and context"""
+    session_id: str = Field(..., description="Session id to send follow-up answers to")
+    revision: int = Field(..., description="Number of follow-up answers applied")
+    analysis: ComprehensiveResponse = Field(..., description="Analysis as of this revision")
+
+def session_json(session_id: str, revision: int, analysis_document: bytes) -> bytes:
+    """
+    JSON bytes of a SessionResponse around an analysis already serialized with
+    response_json, the same document as SessionResponse.model_dump_json().
+    """
+    return b'{"session_id":%s,"revision":%d,"analysis":%s}' % (
+        json.dumps(session_id).encode(), revision, analysis_document
+    )
+
+class AnalysisHistoryItem(BaseModel):
+    """One stored analysis in the history listing"""
+    id: int = Field(..., description="Analysis id")
+    timestamp: str = Field(..., description="When the analysis was stored (UTC, YYYY-MM-DD HH:MM:SS)")
+    input_text: str = Field(..., description="Original symptom input")
+    extracted_symptoms: List[str] = Field(..., description="Symptoms extracted from the input")
+    age: Optional[int] = Field(None, description="Patient age")
+    gender: Optional[str] = Field(None, description="Patient gender")
+    severity_level: Optional[str] = Field(None, description="Overall severity assessment")
+    confidence_score: Optional[float] = Field(None, description="Overall confidence in the analysis")
+    analysis: Optional[Dict[str, Any]] = Field(None, description="Full stored analysis, when requested")
+
+class AnalysisHistoryPage(BaseModel):
+    """A page of stored analyses, newest first"""
+    items: List[AnalysisHistoryItem] = Field(..., description="Analyses on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, absent on the last page")
+
 class HealthTip(BaseModel):
     """Health tip model (kept for potential future use)"""
     title: str
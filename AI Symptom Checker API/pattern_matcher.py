@@ -0,0 +1,92 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Pattern hits for one text: rule family -> matched patterns in registration order
+PatternHits = Dict[str, List[str]]
+
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton over several families of phrases.
+
+    The automaton is compiled once and scans a text in a single pass,
+    reporting every (possibly overlapping) phrase occurrence tagged with the
+    family it was registered under.
+    """
+
+    def __init__(self, families: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, str]] = []
+
+        for family, patterns in families.items():
+            for pattern in patterns:
+                self._add_pattern(family, pattern.lower())
+
+        self._build_failure_links()
+
+    def _add_pattern(self, family: str, pattern: str):
+        if not pattern:
+            return
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._output[state].append(len(self._patterns))
+        self._patterns.append((family, pattern))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text: str) -> PatternHits:
+        """Return every pattern found in text, grouped by family"""
+        goto, fail, output = self._goto, self._fail, self._output
+        matched = set()
+
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                matched.update(output[state])
+
+        hits: PatternHits = {}
+        for pattern_id in sorted(matched):
+            family, pattern = self._patterns[pattern_id]
+            hits.setdefault(family, []).append(pattern)
+        return hits
+
+    def first_family(self, text: str) -> Optional[str]:
+        """Family of the earliest registered pattern found in text, without collecting every hit"""
+        goto, fail, output = self._goto, self._fail, self._output
+        first = len(self._patterns)
+
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                first = min(first, min(output[state]))
+
+        return self._patterns[first][0] if first < len(self._patterns) else None
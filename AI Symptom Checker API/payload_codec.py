@@ -0,0 +1,174 @@
+"""
+Compact storage format for stored analysis_result documents.
+
+Most of a ComprehensiveResponse is text shared with many other responses:
+the disclaimer, advice lists, recommendations, red flags, follow-up
+questions and the condition details. Those parts are stored once as
+content-addressed fragments; each row keeps a zlib-compressed skeleton
+with the request-specific parts and references to its fragments.
+
+Stored values are either legacy JSON text (rows written before this
+format) or bytes starting with FORMAT_PREFIX. decode returns the original
+JSON document for both.
+"""
+import hashlib
+import json
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from result_cache import LRUCache
+
+FORMAT_PREFIX = b"\x01"
+
+# Top-level fields replaced by a single fragment reference
+SHARED_FIELDS = ("priority_recommendations", "general_advice", "red_flags", "follow_up_questions", "disclaimer")
+
+# Per-condition field kept in the skeleton, with its key position; the rest of
+# each condition is a fragment
+CONDITION_VARIABLE_FIELD = "probability"
+
+COMPRESSION_LEVEL = 6
+
+
+class PayloadError(ValueError):
+    """Raised when a stored analysis payload cannot be decoded"""
+
+
+def _dumps(value) -> str:
+    # Same layout as pydantic's model_dump_json, so decoded documents match the originals
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def fragment_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class AnalysisPayloadCodec:
+    """
+    Encodes analysis documents into deduplicated, compressed payloads.
+
+    Fragment bodies are looked up through fetch_fragments (digest list ->
+    {digest: text}) and cached, so decoding a page of analyses usually
+    costs no extra query.
+    """
+
+    def __init__(self, fetch_fragments: Callable[[List[str]], Dict[str, str]], cache_size: int = 4096):
+        self._fetch_fragments = fetch_fragments
+        self._fragments = LRUCache(max_size=cache_size)
+
+    def encode(self, document_json: Union[str, bytes]) -> Tuple[bytes, Dict[str, str]]:
+        """Compressed payload for a JSON document, plus its fragments as {digest: text}"""
+        document = json.loads(document_json)
+        fragments: Dict[str, str] = {}
+
+        def reference(value) -> str:
+            text = _dumps(value)
+            digest = fragment_digest(text)
+            fragments[digest] = text
+            return digest
+
+        skeleton = {}
+        for field, value in document.items():
+            if field in SHARED_FIELDS:
+                skeleton[field] = reference(value)
+            elif field == "possible_conditions":
+                conditions = []
+                for condition in value:
+                    keys = list(condition)
+                    place = keys.index(CONDITION_VARIABLE_FIELD) if CONDITION_VARIABLE_FIELD in condition else -1
+                    fixed = {key: item for key, item in condition.items() if key != CONDITION_VARIABLE_FIELD}
+                    conditions.append([reference(fixed), condition.get(CONDITION_VARIABLE_FIELD), place])
+                skeleton[field] = conditions
+            else:
+                skeleton[field] = value
+
+        payload = FORMAT_PREFIX + zlib.compress(_dumps(skeleton).encode("utf-8"), COMPRESSION_LEVEL)
+        return payload, fragments
+
+    @staticmethod
+    def is_encoded(value: Union[str, bytes]) -> bool:
+        return isinstance(value, bytes) and value.startswith(FORMAT_PREFIX)
+
+    def decode(self, value: Union[str, bytes]) -> str:
+        """The original JSON document of a stored payload"""
+        return self.decode_many([value])[0]
+
+    def decode_many(self, values: Iterable[Union[str, bytes]]) -> List[str]:
+        """Decode several stored payloads, fetching their missing fragments in one lookup"""
+        skeletons: List[Optional[dict]] = []
+        documents: List[Optional[str]] = []
+        wanted = set()
+
+        for value in values:
+            if isinstance(value, str):
+                skeletons.append(None)
+                documents.append(value)
+                continue
+            if not self.is_encoded(value):
+                raise PayloadError("Unknown analysis payload format")
+            try:
+                skeleton = json.loads(zlib.decompress(value[len(FORMAT_PREFIX):]))
+            except (zlib.error, ValueError) as e:
+                raise PayloadError(f"Corrupt analysis payload: {e}")
+            skeletons.append(skeleton)
+            documents.append(None)
+            wanted.update(self._references(skeleton))
+
+        fragments = self._load_fragments(wanted)
+        for position, skeleton in enumerate(skeletons):
+            if skeleton is not None:
+                documents[position] = _dumps(self._assemble(skeleton, fragments))
+        return documents
+
+    @staticmethod
+    def _references(skeleton: dict) -> List[str]:
+        references = [skeleton[field] for field in SHARED_FIELDS if field in skeleton]
+        references.extend(condition[0] for condition in skeleton.get("possible_conditions", ()))
+        return references
+
+    def _load_fragments(self, digests: Iterable[str]) -> Dict[str, str]:
+        fragments = {}
+        missing = []
+        for digest in digests:
+            text = self._fragments.get(digest)
+            if text is None:
+                missing.append(digest)
+            else:
+                fragments[digest] = text
+
+        if missing:
+            fetched = self._fetch_fragments(missing)
+            for digest in missing:
+                if digest not in fetched:
+                    raise PayloadError(f"Missing analysis payload fragment {digest}")
+                self._fragments.put(digest, fetched[digest])
+            fragments.update(fetched)
+        return fragments
+
+    @staticmethod
+    def _assemble(skeleton: dict, fragments: Dict[str, str]) -> dict:
+        document = {}
+        for field, value in skeleton.items():
+            if field in SHARED_FIELDS:
+                document[field] = json.loads(fragments[value])
+            elif field == "possible_conditions":
+                conditions = []
+                for digest, variable, place in value:
+                    items = list(json.loads(fragments[digest]).items())
+                    # Put the variable field back at its original key position
+                    if place >= 0:
+                        items.insert(place, (CONDITION_VARIABLE_FIELD, variable))
+                    conditions.append(dict(items))
+                document[field] = conditions
+            else:
+                document[field] = value
+        return document
+
+    def remember(self, fragments: Dict[str, str]):
+        """Cache fragments known to be stored, so later writes can skip them"""
+        for digest, text in fragments.items():
+            self._fragments.put(digest, text)
+
+    def unknown(self, fragments: Dict[str, str]) -> Dict[str, str]:
+        """The fragments not yet known to be stored"""
+        return {digest: text for digest, text in fragments.items() if self._fragments.get(digest) is None}
@@ -0,0 +1,63 @@
+"""
+Analyzer warm-up, and preloading before worker processes are forked.
+
+Under a pre-forking server the application module can be imported once in
+the master process, e.g.
+
+    PRELOAD_ANALYZER=1 gunicorn main:app -k uvicorn.workers.UvicornWorker -w 8 --preload
+
+With PRELOAD_ANALYZER=1 the master loads the knowledge base (or its
+compiled snapshot), builds the condition index with its fuzzy index, and
+runs warm-up analyses through every code path before forking. Workers
+inherit all of it as shared copy-on-write pages instead of each building
+its own copy. Without preloading each worker warms up at startup, before
+its readiness probe starts.
+"""
+import gc
+import time
+
+from models import SymptomInput
+
+# Cover the single and batch paths: exact, partial and typo-corrected
+# matches, emergency patterns and every age bucket
+WARMUP_INPUTS = (
+    ("fever, headache, cough for 3 days", 30),
+    ("nausea and vomiting", None),
+    ("runny nose; sneezing; sore throat", 70),
+    ("severe chest pain and shortness of breath", 55),
+    ("I have been feeling tired with a headahce", 8),
+)
+
+
+def warm_up(db_manager, analyzer) -> float:
+    """
+    Initialize the database and build everything analysis needs, so the
+    first request is not slow. Returns the seconds taken.
+    """
+    started = time.perf_counter()
+    db_manager.initialize_database()
+    db_manager.get_condition_index()
+
+    inputs = [SymptomInput(symptoms=symptoms, age=age) for symptoms, age in WARMUP_INPUTS]
+    for symptom_input in inputs:
+        analyzer.analyze_symptoms(symptom_input)
+    analyzer.analyze_symptoms_batch(inputs)
+    # Warm-up results are not worth keeping in the cache of every worker
+    analyzer.result_cache.clear()
+    return time.perf_counter() - started
+
+
+def preload(db_manager, analyzer) -> float:
+    """
+    Warm up in a process that is about to fork workers. Returns the seconds taken.
+    """
+    seconds = warm_up(db_manager, analyzer)
+
+    # sqlite connections must not be carried across fork; workers open their own
+    db_manager.close()
+
+    # Move everything built so far into the permanent generation, so garbage
+    # collections in workers do not write to (and so copy) the shared pages
+    gc.collect()
+    gc.freeze()
+    return seconds
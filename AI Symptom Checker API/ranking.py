@@ -0,0 +1,257 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Inputs scored per contribution matrix, bounds matrix memory
+BATCH_CHUNK_SIZE = 256
+
+# Contribution weights and scores are kept as whole multiples of 1 / WEIGHT_SCALE
+# (typo similarities have 4 decimals), so sums are exact and do not depend on
+# the order symptoms were added or removed in
+WEIGHT_SCALE = 1e6
+
+# Per-symptom contribution: condition positions (ascending), their scaled
+# weights, and whether the symptom matched each of them exactly
+Contribution = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Scores of a symptom list: matched condition positions (ascending), their
+# scaled total scores and exact match counts
+Scores = Tuple[np.ndarray, np.ndarray, np.ndarray]
+EMPTY_SCORES: Scores = (np.zeros(0, dtype=np.intp), np.zeros(0), np.zeros(0))
+
+
+class Ranker:
+    """
+    Scores conditions of one ConditionIndex against lists of input symptoms.
+
+    Every input symptom contributes a weight to each condition it matches:
+    the weight of the condition phrase it matches exactly (substring in
+    either direction), else a share of the weight of the phrase words it
+    has in common, else the similarity-scaled weight of the phrase it is a
+    typo of. A condition's score is the sum of its contributions, and its
+    probability is the score over the condition's norm. Subclasses choose
+    the weights and norms.
+
+    Contributions are computed once per distinct symptom and remembered for
+    up to memo_size symptoms. Conditions are scored with matrix products,
+    and only the top_k best get a match dict.
+    """
+
+    name = ""
+    # Probability multiplier for conditions matched exactly by some symptom
+    exact_boost = 1.0
+
+    def __init__(self, index, memo_size: int = 4096):
+        self.index = index
+        self.positions: Dict[str, np.ndarray] = {
+            phrase: self._array(conditions) for phrase, conditions in index.phrase_conditions.items()
+        }
+        self.token_positions: Dict[str, np.ndarray] = {
+            token: self._array(conditions) for token, conditions in index.token_conditions.items()
+        }
+
+        # Set by subclasses: phrase and word weights, and per-condition norms by position
+        self.phrase_weights: Dict[str, float] = {}
+        self.token_weights: Dict[str, float] = {}
+        self.norms = np.ones(len(index))
+
+        # Symptom -> contribution; emptied when full, symptom vocabularies are small
+        self.memo_size = memo_size
+        self._memo: Dict[str, Contribution] = {}
+
+    @staticmethod
+    def _array(positions) -> np.ndarray:
+        return np.fromiter(sorted(positions), dtype=np.intp, count=len(positions))
+
+    def contribution(self, symptom: str) -> Contribution:
+        """Weights an input symptom adds to the conditions it matches"""
+        try:
+            return self._memo[symptom]
+        except KeyError:
+            pass
+
+        exact_phrases, words, corrections = self.index.match_phrases(symptom)
+        exact = np.zeros(len(self.index))
+        for phrase in exact_phrases:
+            positions = self.positions[phrase]
+            exact[positions] = np.maximum(exact[positions], self.phrase_weights[phrase])
+
+        other = np.zeros(len(self.index))
+        for word in words:
+            positions = self.token_positions[word]
+            other[positions] = np.maximum(other[positions], 0.5 * self.token_weights[word])
+        for phrase, similarity in corrections:
+            positions = self.positions[phrase]
+            other[positions] = np.maximum(other[positions], similarity * self.phrase_weights[phrase])
+
+        is_exact = exact > 0
+        weights = np.round(np.where(is_exact, exact, other) * WEIGHT_SCALE)
+        positions = np.flatnonzero(weights)
+        contribution = (positions, weights[positions], is_exact[positions])
+
+        if len(self._memo) >= self.memo_size:
+            self._memo = {}
+        self._memo[symptom] = contribution
+        return contribution
+
+    def rank(self, symptom_lists: List[List[str]], top_k: Optional[int] = None) -> List[List[dict]]:
+        """
+        Matching conditions for each symptom list, best first: by probability,
+        then score, then exact match count, then table order. With top_k, only
+        the best top_k of each list.
+        """
+        results = []
+        for start in range(0, len(symptom_lists), BATCH_CHUNK_SIZE):
+            results.extend(self._rank_chunk(symptom_lists[start:start + BATCH_CHUNK_SIZE], top_k))
+        return results
+
+    def _rank_chunk(self, symptom_lists: List[List[str]], top_k: Optional[int]) -> List[List[dict]]:
+        distinct_symptoms = dict.fromkeys(symptom for symptoms in symptom_lists for symptom in symptoms)
+        symptom_rows = {symptom: row for row, symptom in enumerate(distinct_symptoms)}
+        contributions = [self.contribution(symptom) for symptom in symptom_rows]
+
+        # Only conditions matched by some symptom get a column, in table order
+        matched = np.zeros(len(self.index), dtype=bool)
+        for positions, _, _ in contributions:
+            matched[positions] = True
+        columns = np.flatnonzero(matched)
+        if not len(columns):
+            return [[] for _ in symptom_lists]
+        column_of = np.empty(len(self.index), dtype=np.intp)
+        column_of[columns] = np.arange(len(columns))
+
+        weight_matrix = np.zeros((len(symptom_rows), len(columns)))
+        exact_matrix = np.zeros((len(symptom_rows), len(columns)))
+        for row, (positions, weights, is_exact) in enumerate(contributions):
+            row_columns = column_of[positions]
+            weight_matrix[row, row_columns] = weights
+            exact_matrix[row, row_columns] = is_exact
+
+        # Input x symptom occurrence counts, repeated symptoms count every time
+        occurrences = np.zeros((len(symptom_lists), len(symptom_rows)))
+        for item, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                occurrences[item, symptom_rows[symptom]] += 1
+
+        total_scores = occurrences @ weight_matrix / WEIGHT_SCALE
+        exact_counts = occurrences @ exact_matrix
+        probabilities = self._probabilities(columns, total_scores, exact_counts)
+
+        return [
+            self._top(columns, probabilities[item], total_scores[item], exact_counts[item], top_k)
+            for item in range(len(symptom_lists))
+        ]
+
+    def update_scores(self, scores: Scores, added: Iterable[str] = (), removed: Iterable[str] = ()) -> Scores:
+        """
+        Scores of a symptom list after adding and removing symptoms. Only the
+        contributions of the changed symptoms are applied, to the conditions
+        they match; the scores of every other condition carry over.
+        """
+        positions, scaled_scores, exact_counts = scores
+        dense_scores = np.zeros(len(self.index))
+        dense_exact = np.zeros(len(self.index))
+        dense_scores[positions] = scaled_scores
+        dense_exact[positions] = exact_counts
+
+        for sign, symptoms in ((-1.0, removed), (1.0, added)):
+            for symptom in symptoms:
+                changed, weights, is_exact = self.contribution(symptom)
+                dense_scores[changed] += sign * weights
+                dense_exact[changed] += sign * is_exact
+
+        positions = np.flatnonzero(dense_scores)
+        return positions, dense_scores[positions], dense_exact[positions]
+
+    def rank_scores(self, scores: Scores, top_k: Optional[int] = None) -> List[dict]:
+        """Matching conditions for scores kept with update_scores, ordered like rank()"""
+        positions, scaled_scores, exact_counts = scores
+        if not len(positions):
+            return []
+        total_scores = scaled_scores / WEIGHT_SCALE
+        probabilities = self._probabilities(positions, total_scores, exact_counts)
+        return self._top(positions, probabilities, total_scores, exact_counts, top_k)
+
+    def _probabilities(self, columns: np.ndarray, total_scores: np.ndarray, exact_counts: np.ndarray) -> np.ndarray:
+        probabilities = np.minimum(total_scores / self.norms[columns], 1.0)
+        if self.exact_boost != 1.0:
+            probabilities = np.where(exact_counts > 0, np.minimum(probabilities * self.exact_boost, 1.0), probabilities)
+        return probabilities
+
+    def _top(self, columns: np.ndarray, probabilities: np.ndarray, total_scores: np.ndarray,
+             exact_counts: np.ndarray, top_k: Optional[int]) -> List[dict]:
+        matched = np.flatnonzero(total_scores)
+        if top_k is not None and len(matched) > top_k:
+            # Probability is the first sort key: only conditions at least as likely
+            # as the top_k-th best (ties included) can make the top_k
+            threshold = np.partition(probabilities[matched], -top_k)[-top_k]
+            matched = matched[probabilities[matched] >= threshold]
+        # Negated positions make earlier conditions win ties
+        keys = zip(
+            probabilities[matched].tolist(),
+            total_scores[matched].tolist(),
+            exact_counts[matched].astype(int).tolist(),
+            (-columns[matched]).tolist()
+        )
+        best = sorted(keys, reverse=True) if top_k is None else heapq.nlargest(top_k, keys)
+        return [
+            self.index.condition_match(-position, probability, match_count, total_score)
+            for probability, total_score, match_count, position in best
+        ]
+
+
+class HeuristicRanker(Ranker):
+    """
+    Every condition phrase weighs 1 (word overlaps 0.5), the norm is the
+    condition's symptom count, and exact matches boost probability 1.3x.
+    """
+
+    name = "heuristic"
+    exact_boost = 1.3
+
+    def __init__(self, index, memo_size: int = 4096):
+        super().__init__(index, memo_size)
+        self.phrase_weights = dict.fromkeys(index.phrase_conditions, 1.0)
+        self.token_weights = dict.fromkeys(index.token_conditions, 1.0)
+        self.norms = np.array([len(phrases) for phrases in index.condition_symptoms], dtype=float)
+
+
+class IdfRanker(Ranker):
+    """
+    Phrases and words weigh their inverse document frequency over the
+    conditions, log(1 + conditions / conditions using it), and the norm is
+    the sum of a condition's phrase weights. A symptom shared by many
+    conditions ("fatigue") moves the ranking less than a distinctive one
+    ("light sensitivity"), and probability is the share of the condition's
+    weight the input covers.
+    """
+
+    name = "idf"
+
+    def __init__(self, index, memo_size: int = 4096):
+        super().__init__(index, memo_size)
+        conditions = len(index)
+        self.phrase_weights = {
+            phrase: math.log1p(conditions / len(positions)) for phrase, positions in index.phrase_conditions.items()
+        }
+        self.token_weights = {
+            token: math.log1p(conditions / len(positions)) for token, positions in index.token_conditions.items()
+        }
+        self.norms = np.array(
+            [sum(self.phrase_weights[phrase] for phrase in phrases) for phrases in index.condition_symptoms]
+        )
+
+
+# Scoring mode name -> ranker class; idf is opt-in, the heuristic stays the default
+RANKERS = {ranker.name: ranker for ranker in (HeuristicRanker, IdfRanker)}
+DEFAULT_RANKING_MODE = HeuristicRanker.name
+
+
+def make_ranker(mode: str, index) -> Ranker:
+    """Ranker for a scoring mode over a condition index"""
+    ranker = RANKERS.get(mode)
+    if ranker is None:
+        raise ValueError(f"Unknown ranking mode {mode!r}, expected one of {', '.join(RANKERS)}")
+    return ranker(index)
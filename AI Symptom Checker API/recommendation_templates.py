@@ -0,0 +1,159 @@
+"""
+Recommendation and advice templates, validated once at import time.
+
+The analyzer assembles responses from these shared objects instead of
+rebuilding and revalidating the same pydantic models on every request.
+"""
+from typing import Dict, Optional, Tuple
+from pydantic import ConfigDict
+from models import DetailedRecommendation, RecommendationType, SeverityLevel
+
+
+class RecommendationTemplate(DetailedRecommendation):
+    """Immutable, pre-validated recommendation shared between responses"""
+    model_config = ConfigDict(frozen=True)
+
+    action_steps: Tuple[str, ...]
+    warning_signs: Optional[Tuple[str, ...]] = None
+
+    def for_response(self) -> DetailedRecommendation:
+        """A response's own copy, with lists of its own and no revalidation"""
+        return DetailedRecommendation.model_construct(**{
+            **dict(self),
+            "action_steps": list(self.action_steps),
+            "warning_signs": list(self.warning_signs) if self.warning_signs is not None else None
+        })
+
+
+EMERGENCY_RECOMMENDATION = RecommendationTemplate(
+    type=RecommendationType.EMERGENCY,
+    title="Seek Immediate Emergency Care",
+    message="Your symptoms indicate a potentially serious condition that requires immediate medical attention.",
+    urgency=SeverityLevel.CRITICAL,
+    action_steps=[
+        "Call emergency services (911) immediately",
+        "Do not drive yourself to the hospital",
+        "Have someone stay with you",
+        "Bring a list of current medications"
+    ],
+    timeframe="Immediately",
+    warning_signs=["Worsening symptoms", "Loss of consciousness", "Severe difficulty breathing"]
+)
+
+URGENT_CONSULTATION_RECOMMENDATION = RecommendationTemplate(
+    type=RecommendationType.CONSULT_DOCTOR,
+    title="Schedule Urgent Medical Consultation",
+    message="Your symptoms require prompt medical evaluation to rule out serious conditions.",
+    urgency=SeverityLevel.HIGH,
+    action_steps=[
+        "Contact your healthcare provider today",
+        "If unavailable, visit urgent care center",
+        "Prepare a detailed symptom timeline",
+        "List all current medications and allergies"
+    ],
+    timeframe="Within 24 hours",
+    warning_signs=["Symptoms getting worse", "New symptoms developing", "Difficulty performing daily activities"]
+)
+
+CONSULTATION_RECOMMENDATION = RecommendationTemplate(
+    type=RecommendationType.CONSULT_DOCTOR,
+    title="Schedule Medical Consultation",
+    message="Your symptoms warrant medical evaluation to ensure proper diagnosis and treatment.",
+    urgency=SeverityLevel.MEDIUM,
+    action_steps=[
+        "Schedule appointment with your healthcare provider",
+        "Monitor symptoms and note any changes",
+        "Keep a symptom diary",
+        "Prepare questions for your doctor"
+    ],
+    timeframe="Within 2-3 days",
+    warning_signs=["Symptoms persist beyond expected timeframe", "New symptoms appear", "Symptoms interfere with daily life"]
+)
+
+MONITORING_RECOMMENDATION = RecommendationTemplate(
+    type=RecommendationType.MONITORING,
+    title="Symptom Monitoring and Tracking",
+    message="Careful monitoring of your symptoms will help track progress and identify any concerning changes.",
+    urgency=SeverityLevel.LOW,
+    action_steps=[
+        "Keep a daily symptom diary with severity ratings",
+        "Note any triggers or patterns you observe",
+        "Track temperature if fever is present",
+        "Record any new symptoms that develop",
+        "Note response to any treatments or medications"
+    ],
+    timeframe="Daily until symptoms resolve",
+    warning_signs=[
+        "Symptoms suddenly worsen",
+        "High fever (over 103°F/39.4°C)",
+        "Difficulty breathing or chest pain",
+        "Severe dehydration signs"
+    ]
+)
+
+# Self-care action steps: always included, then per symptom group
+GENERAL_SELF_CARE_STEPS = (
+    "Get adequate rest (7-9 hours of sleep)",
+    "Stay well hydrated (8-10 glasses of water daily)",
+    "Eat nutritious, easily digestible foods"
+)
+
+RESPIRATORY_SELF_CARE_STEPS = (
+    "Use a humidifier or breathe steam from hot shower",
+    "Avoid irritants like smoke and strong odors",
+    "Consider honey for cough relief (if over 1 year old)"
+)
+
+GASTROINTESTINAL_SELF_CARE_STEPS = (
+    "Follow BRAT diet (bananas, rice, applesauce, toast)",
+    "Avoid dairy, fatty, and spicy foods temporarily",
+    "Consider probiotics to restore gut health"
+)
+
+FEVER_SELF_CARE_STEPS = (
+    "Monitor temperature regularly",
+    "Use fever-reducing medication as directed",
+    "Wear light, breathable clothing"
+)
+
+
+def _build_self_care_recommendation(respiratory: bool, gastrointestinal: bool, fever: bool) -> RecommendationTemplate:
+    action_steps = list(GENERAL_SELF_CARE_STEPS)
+    if respiratory:
+        action_steps.extend(RESPIRATORY_SELF_CARE_STEPS)
+    if gastrointestinal:
+        action_steps.extend(GASTROINTESTINAL_SELF_CARE_STEPS)
+    if fever:
+        action_steps.extend(FEVER_SELF_CARE_STEPS)
+
+    return RecommendationTemplate(
+        type=RecommendationType.SELF_CARE,
+        title="Self-Care and Home Management",
+        message="These self-care measures can help manage your symptoms and support recovery.",
+        urgency=SeverityLevel.LOW,
+        action_steps=action_steps,
+        timeframe="Start immediately and continue as needed",
+        warning_signs=["Symptoms worsen despite self-care", "New concerning symptoms develop"]
+    )
+
+
+# Every self-care variant, keyed by (respiratory, gastrointestinal, fever)
+SELF_CARE_RECOMMENDATIONS: Dict[Tuple[bool, bool, bool], RecommendationTemplate] = {
+    (respiratory, gastrointestinal, fever): _build_self_care_recommendation(respiratory, gastrointestinal, fever)
+    for respiratory in (False, True)
+    for gastrointestinal in (False, True)
+    for fever in (False, True)
+}
+
+# General advice, copied into each response
+GENERAL_ADVICE: Tuple[str, ...] = (
+    "Maintain good hygiene by washing hands frequently",
+    "Avoid close contact with others if you feel unwell",
+    "Listen to your body and rest when needed",
+    "Stay connected with family or friends for support"
+)
+
+ELEVATED_SEVERITY_ADVICE: Tuple[str, ...] = GENERAL_ADVICE + (
+    "Consider having someone check on you regularly",
+    "Keep emergency contact numbers easily accessible"
+)
@@ -0,0 +1,111 @@
+"""
+Follow-up sessions over an analysis.
+
+Starting a session analyzes the input like /analyze-symptoms and keeps the
+analysis state under a session id. Follow-up answers then add or remove
+symptoms and update the context (age, gender, additional information), and
+only what the change affects is recomputed: the pattern hits and category
+of the new symptoms, and the scores of the conditions the added or removed
+symptoms match. The result equals a fresh analysis of the session's
+current symptoms and context.
+
+Sessions live in process, in a bounded store that drops the least recently
+used session when full and expires sessions left idle for ttl seconds.
+"""
+import secrets
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from models import ComprehensiveResponse, FollowUpInput, SymptomInput
+from pattern_matcher import PatternHits
+from ranking import EMPTY_SCORES, Scores
+from result_cache import LRUCache
+
+
+class SessionNotFound(KeyError):
+    """Raised for an unknown or expired session id"""
+
+
+class NoSymptomsLeft(ValueError):
+    """Raised for follow-up answers that would remove every symptom of a session"""
+
+
+class AnalysisSession:
+    """Analysis state of one session, reused by its follow-up answers"""
+
+    def __init__(self, session_id: str, symptom_input: SymptomInput):
+        self.session_id = session_id
+        self.symptom_input = symptom_input
+        # Symptom -> (pattern hits, category or None for general), in input order
+        self.symptoms: Dict[str, Tuple[PatternHits, Optional[str]]] = {}
+        # Condition scores of the symptoms, for the index version they were computed with
+        self.condition_index = None
+        self.scores: Scores = EMPTY_SCORES
+        # Follow-up answers applied so far
+        self.revision = 0
+        # Follow-ups to one session are applied one at a time
+        self.lock = threading.Lock()
+
+
+class SessionAnalysis(NamedTuple):
+    """A session's analysis as of one revision"""
+    session_id: str
+    revision: int
+    symptom_input: SymptomInput
+    response: ComprehensiveResponse
+
+
+class SessionStore:
+    """
+    Bounded, expiring in-process store of analysis sessions.
+
+    Holds up to max_sessions sessions, dropping the least recently used,
+    and forgets a session ttl seconds after its last analysis.
+    """
+
+    def __init__(self, analyzer, max_sessions: int = 10000, ttl: Optional[float] = 1800.0):
+        self.analyzer = analyzer
+        self._sessions = LRUCache(max_size=max_sessions, ttl=ttl)
+
+        self.started = 0
+        self.follow_ups = 0
+
+    def start(self, symptom_input: SymptomInput) -> SessionAnalysis:
+        """Analyze an initial input and open a session for its follow-up answers"""
+        session = AnalysisSession(secrets.token_urlsafe(16), symptom_input)
+        with session.lock:
+            response = self.analyzer.start_session(session)
+            analysis = SessionAnalysis(session.session_id, session.revision, session.symptom_input, response)
+        self._sessions.put(session.session_id, session)
+        self.started += 1
+        return analysis
+
+    def follow_up(self, session_id: str, follow_up: FollowUpInput) -> SessionAnalysis:
+        """Apply follow-up answers to a session and return its updated analysis"""
+        session = self._get(session_id)
+        with session.lock:
+            # Leaves the session as it was if the answers are rejected or analysis fails
+            response = self.analyzer.follow_up_session(session, follow_up)
+            analysis = SessionAnalysis(session.session_id, session.revision, session.symptom_input, response)
+        # Storing it again restarts its expiry
+        self._sessions.put(session_id, session)
+        self.follow_ups += 1
+        return analysis
+
+    def end(self, session_id: str):
+        """Forget a session"""
+        if self._sessions.pop(session_id) is None:
+            raise SessionNotFound(session_id)
+
+    def _get(self, session_id: str) -> AnalysisSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise SessionNotFound(session_id)
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        """Session counters and store occupancy"""
+        return dict(self._sessions.stats(), started=self.started, follow_ups=self.follow_ups)
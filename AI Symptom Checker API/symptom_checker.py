@@ -1,14 +1,57 @@
 import re
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Optional
 from models import (
     SymptomInput, ComprehensiveResponse, DetailedCondition, DetailedRecommendation,
-    SymptomAnalysis, SeverityLevel, RecommendationType
+    SymptomAnalysis, SeverityLevel, FollowUpInput
 )
 from database import DatabaseManager
+from symptom_index import ConditionIndex
+from ranking import DEFAULT_RANKING_MODE, EMPTY_SCORES, RANKERS
+from sessions import AnalysisSession, NoSymptomsLeft
+from pattern_matcher import MultiPatternMatcher, PatternHits
+from category_index import CategoryIndex
+from result_cache import LRUCache
+from metrics import REGISTRY, ANALYSIS_STAGE_SECONDS, ANALYSES_TOTAL, NULL_STAGE_TIMER
+from recommendation_templates import (
+    EMERGENCY_RECOMMENDATION, URGENT_CONSULTATION_RECOMMENDATION, CONSULTATION_RECOMMENDATION,
+    MONITORING_RECOMMENDATION, SELF_CARE_RECOMMENDATIONS, GENERAL_ADVICE, ELEVATED_SEVERITY_ADVICE,
+    RecommendationTemplate
+)
+
+# Separators between individual symptoms in free-text input
+SYMPTOM_SEPARATORS = re.compile(r'[,;\n]| (?:and|&|also|plus) ')
+
+# Time references and filler phrases stripped from each symptom
+SYMPTOM_NOISE = re.compile(
+    r'\b\d+\s*(?:day|days|hour|hours|week|weeks)\b'
+    r'|\b(?:since|for|about|around)\s+\w+\b'
+    r'|\bi (?:have|am)\b'
+)
+
+# Common non-symptom words
+FILTER_WORDS = frozenset({
+    'experiencing', 'feeling', 'symptoms', 'symptom',
+    'for', 'days', 'hours', 'weeks', 'since', 'yesterday', 'today',
+    'the', 'a', 'an', 'my', 'me', 'is', 'are', 'been', 'being'
+})
+
+# Matched conditions detailed in a response
+MAX_DETAILED_CONDITIONS = 4
 
 class EnhancedSymptomAnalyzer:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager: Optional[DatabaseManager] = None,
+                 cache_size: int = 1024, cache_ttl: Optional[float] = 300.0,
+                 ranking_mode: str = DEFAULT_RANKING_MODE):
+        self.db_manager = db_manager or DatabaseManager()
+        
+        # Condition scoring mode, see ranking.RANKERS
+        if ranking_mode not in RANKERS:
+            raise ValueError(f"Unknown ranking mode {ranking_mode!r}, expected one of {', '.join(RANKERS)}")
+        self.ranking_mode = ranking_mode
+        
+        # Results keyed on canonical symptoms, age bucket and knowledge-base version
+        self.result_cache = LRUCache(max_size=cache_size, ttl=cache_ttl)
+        self._cache_kb_version: Optional[int] = None
         self.disclaimer = (
             "This AI symptom analysis is for informational purposes only and should not replace "
             "professional medical advice. Always consult with a qualified healthcare provider for "
@@ -27,6 +70,8 @@ class EnhancedSymptomAnalyzer:
             "general": ["fever", "fatigue", "weight loss", "weight gain", "night sweats", "chills"],
             "mental_health": ["anxiety", "depression", "mood changes", "sleep problems", "stress", "panic"]
         }
+        # Phrase lookup over the categories, built once; rebuild it after changing them
+        self.category_index = CategoryIndex(self.symptom_categories)
         
         # Emergency symptoms that require immediate attention
         self.emergency_symptoms = {
@@ -34,22 +79,256 @@ class EnhancedSymptomAnalyzer:
             "severe allergic reaction", "stroke symptoms", "heart attack symptoms",
             "severe abdominal pain", "high fever", "seizure", "severe bleeding"
         }
+        
+        # Indicators of high severity
+        self.high_severity_indicators = [
+            "severe", "intense", "unbearable", "excruciating", "sharp", "stabbing",
+            "difficulty breathing", "chest pain", "high fever"
+        ]
+        
+        # Emergency patterns and the warning raised for each
+        self.emergency_patterns = {
+            "chest pain": "Severe or crushing chest pain, especially with shortness of breath",
+            "difficulty breathing": "Severe difficulty breathing or inability to catch your breath",
+            "high fever": "Fever over 103°F (39.4°C) or fever with severe symptoms",
+            "severe headache": "Sudden, severe headache unlike any you've had before",
+            "confusion": "Sudden confusion, disorientation, or difficulty speaking",
+            "severe pain": "Pain that is unbearable or prevents normal activities"
+        }
+        
+        # Symptom-based risk factors
+        self.risk_indicators = {
+            "fever": "Presence of fever (indicates possible infection)",
+            "chest pain": "Chest pain (requires cardiac evaluation)"
+        }
+        
+        # Symptoms specific enough to raise confidence
+        self.specific_symptoms = ["chest pain", "difficulty breathing", "severe headache"]
+        
+        # Single automaton over every rule family, scanned once per symptom
+        self.pattern_matcher = MultiPatternMatcher({
+            "emergency": self.emergency_symptoms,
+            "high_severity": self.high_severity_indicators,
+            "red_flag": self.emergency_patterns,
+            "risk": self.risk_indicators,
+            "specific": self.specific_symptoms
+        })
     
     def analyze_symptoms(self, symptom_input: SymptomInput) -> ComprehensiveResponse:
         """
         Main method to perform comprehensive symptom analysis
         """
+        timer = REGISTRY.stage_timer(ANALYSIS_STAGE_SECONDS)
+        
         # Parse and extract symptoms from flexible input
         extracted_symptoms = self._parse_symptom_input(symptom_input.symptoms)
+        timer.mark("parse")
+        
+        # Drop cached results as soon as the conditions knowledge base changes
+        condition_index = self.db_manager.get_condition_index()
+        if condition_index.version != self._cache_kb_version:
+            if self._cache_kb_version is not None:
+                self.result_cache.clear()
+            self._cache_kb_version = condition_index.version
+        timer.mark("kb_version")
+        
+        cache_key = (
+            tuple(sorted(extracted_symptoms)),
+            self._age_bucket(symptom_input.age),
+            condition_index.version
+        )
+        cached = self.result_cache.get(cache_key)
+        timer.mark("cache_lookup")
+        if cached is not None:
+            result = self._from_cached_response(cached, symptom_input, extracted_symptoms)
+            timer.mark("cache_copy")
+            timer.finish("total")
+            ANALYSES_TOTAL.inc("cache")
+            return result
+        
+        # Match conditions against the extracted symptoms
+        matching_conditions = condition_index.get_conditions_by_symptoms(
+            extracted_symptoms, top_k=MAX_DETAILED_CONDITIONS, mode=self.ranking_mode
+        )
+        timer.mark("condition_match")
+        
+        result = self._build_response(symptom_input, extracted_symptoms, matching_conditions, timer, condition_index)
+        self.result_cache.put(cache_key, result)
+        timer.mark("cache_store")
+        timer.finish("total")
+        ANALYSES_TOTAL.inc("computed")
+        return result
+    
+    @staticmethod
+    def _age_bucket(age: Optional[int]) -> str:
+        """
+        Age bucket used by the analysis (only under 5 and over 65 change the result)
+        """
+        if age and age > 65:
+            return "over_65"
+        if age and age < 5:
+            return "under_5"
+        return "5_to_65"
+    
+    def _from_cached_response(self, cached: ComprehensiveResponse, symptom_input: SymptomInput,
+                              extracted_symptoms: List[str]) -> ComprehensiveResponse:
+        """
+        Reuse a cached analysis for an equivalent input, keeping this request's own text
+        and symptom order: categorized symptoms and red flags follow the input order
+        """
+        position = {symptom: index for index, symptom in enumerate(extracted_symptoms)}
+        symptom_categories = {
+            category: sorted(symptoms, key=position.__getitem__)
+            for category, symptoms in cached.symptom_analysis.symptom_categories.items()
+        }
+        symptom_analysis = cached.symptom_analysis.model_copy(
+            update={"extracted_symptoms": extracted_symptoms, "symptom_categories": symptom_categories}
+        )
+        return cached.model_copy(update={
+            "input_text": symptom_input.symptoms,
+            "symptom_analysis": symptom_analysis,
+            "red_flags": self._identify_red_flags(self._scan_symptoms(extracted_symptoms))
+        })
+    
+    def analyze_symptoms_batch(self, symptom_inputs: List[SymptomInput]) -> List[ComprehensiveResponse]:
+        """
+        Analyze many inputs at once, scoring all of their conditions in one vectorized pass
+        """
+        timer = REGISTRY.stage_timer(ANALYSIS_STAGE_SECONDS)
+        extracted = [self._parse_symptom_input(symptom_input.symptoms) for symptom_input in symptom_inputs]
+        timer.mark("batch_parse")
+        # One index version for the whole batch, even if a reload swaps in another meanwhile
+        condition_index = self.db_manager.get_condition_index()
+        matches = condition_index.score_batch(extracted, top_k=MAX_DETAILED_CONDITIONS, mode=self.ranking_mode)
+        timer.mark("batch_condition_match")
+        
+        results = [
+            self._build_response(symptom_input, extracted_symptoms, matching_conditions, timer, condition_index)
+            for symptom_input, extracted_symptoms, matching_conditions in zip(symptom_inputs, extracted, matches)
+        ]
+        timer.finish("batch_total")
+        ANALYSES_TOTAL.inc("batch", amount=len(results))
+        return results
+    
+    def start_session(self, session: AnalysisSession) -> ComprehensiveResponse:
+        """
+        Analyze a session's initial input, keeping per-symptom state for follow-up answers
+        """
+        symptoms = self._parse_symptom_input(session.symptom_input.symptoms)
+        return self._update_session(session, session.symptom_input, symptoms)
+    
+    def follow_up_session(self, session: AnalysisSession, follow_up: FollowUpInput) -> ComprehensiveResponse:
+        """
+        Apply follow-up answers to a session, recomputing only what the changed symptoms affect
+        
+        Raises NoSymptomsLeft, leaving the session unchanged, if the answers
+        remove every symptom.
+        """
+        removed = set(self._parse_symptom_input(follow_up.remove_symptoms or ""))
+        symptoms = dict.fromkeys(symptom for symptom in session.symptoms if symptom not in removed)
+        symptoms.update(dict.fromkeys(self._parse_symptom_input(follow_up.add_symptoms or "")))
+        if not symptoms:
+            raise NoSymptomsLeft("Follow-up answers cannot remove every symptom; end the session instead")
+        
+        # The session input becomes its current symptoms and context, so the
+        # result equals a fresh analysis of it
+        update = {
+            field: value for field, value in (
+                ("age", follow_up.age), ("gender", follow_up.gender), ("additional_info", follow_up.additional_info)
+            ) if value is not None
+        }
+        if list(symptoms) != list(session.symptoms):
+            update["symptoms"] = ", ".join(symptoms)
+        symptom_input = session.symptom_input.model_copy(update=update) if update else session.symptom_input
+        result = self._update_session(session, symptom_input, list(symptoms))
+        session.revision += 1
+        return result
+    
+    def _update_session(self, session: AnalysisSession, symptom_input: SymptomInput,
+                        symptoms: List[str]) -> ComprehensiveResponse:
+        """
+        Analyze a session brought to the given input and symptoms
+        
+        The new state is stored on the session only once the analysis is
+        complete, so a failed update leaves the session as it was.
+        """
+        timer = REGISTRY.stage_timer(ANALYSIS_STAGE_SECONDS)
+        condition_index = self.db_manager.get_condition_index()
+        if session.condition_index is condition_index:
+            previous, scores = session.symptoms, session.scores
+        else:
+            # Scores and typo-corrected categories belong to one knowledge-base version
+            previous, scores = {}, EMPTY_SCORES
+        
+        removed = [symptom for symptom in previous if symptom not in symptoms]
+        added = [symptom for symptom in symptoms if symptom not in previous]
+        
+        # Pattern hits and categories of the added symptoms only
+        symptom_states = {
+            symptom: previous.get(symptom) or (
+                self.pattern_matcher.scan(symptom), self._symptom_category(symptom, condition_index)
+            )
+            for symptom in symptoms
+        }
+        timer.mark("session_symptoms")
+        
+        # Rescore only the conditions the added and removed symptoms match
+        ranker = condition_index.ranker(self.ranking_mode)
+        scores = ranker.update_scores(scores, added, removed)
+        matching_conditions = ranker.rank_scores(scores, MAX_DETAILED_CONDITIONS)
+        timer.mark("condition_match")
+        
+        categorized: Dict[str, List[str]] = {}
+        for symptom, (_, category) in symptom_states.items():
+            categorized.setdefault(category or "general", []).append(symptom)
+        pattern_hits = [hits for hits, _ in symptom_states.values()]
+        
+        result = self._compose_response(
+            symptom_input, symptoms, matching_conditions, pattern_hits,
+            self.category_index.order(categorized), timer, condition_index
+        )
+        
+        session.symptom_input = symptom_input
+        session.symptoms, session.scores, session.condition_index = symptom_states, scores, condition_index
+        timer.finish("session_total")
+        ANALYSES_TOTAL.inc("session")
+        return result
+    
+    def _build_response(self, symptom_input: SymptomInput, extracted_symptoms: List[str],
+                        matching_conditions: List[dict], timer=NULL_STAGE_TIMER,
+                        condition_index: Optional[ConditionIndex] = None) -> ComprehensiveResponse:
+        """
+        Build the comprehensive analysis from extracted symptoms and matched conditions,
+        using the condition index version the conditions were matched with
+        """
+        if condition_index is None:
+            condition_index = self.db_manager.get_condition_index()
+        # Scan symptoms for severity, red-flag and risk patterns
+        pattern_hits = self._scan_symptoms(extracted_symptoms)
+        timer.mark("pattern_scan")
         
         # Categorize symptoms
-        symptom_categories = self._categorize_symptoms(extracted_symptoms)
+        symptom_categories = self._categorize_symptoms(extracted_symptoms, condition_index)
+        timer.mark("categorize")
         
+        return self._compose_response(
+            symptom_input, extracted_symptoms, matching_conditions, pattern_hits, symptom_categories,
+            timer, condition_index
+        )
+    
+    def _compose_response(self, symptom_input: SymptomInput, extracted_symptoms: List[str],
+                          matching_conditions: List[dict], pattern_hits: List[PatternHits],
+                          symptom_categories: Dict[str, List[str]], timer=NULL_STAGE_TIMER,
+                          condition_index: Optional[ConditionIndex] = None) -> ComprehensiveResponse:
+        """
+        Build the analysis from the per-symptom results: pattern hits and categories
+        """
         # Assess overall severity
-        severity_assessment = self._assess_severity(extracted_symptoms, symptom_input)
+        severity_assessment = self._assess_severity(extracted_symptoms, symptom_input, pattern_hits)
+        timer.mark("severity")
         
         # Identify risk factors
-        risk_factors = self._identify_risk_factors(symptom_input, extracted_symptoms)
+        risk_factors = self._identify_risk_factors(symptom_input, extracted_symptoms, pattern_hits)
         
         # Create symptom analysis
         symptom_analysis = SymptomAnalysis(
@@ -58,9 +337,11 @@ class EnhancedSymptomAnalyzer:
             severity_assessment=severity_assessment,
             risk_factors=risk_factors
         )
+        timer.mark("risk_factors")
         
         # Get matching conditions with detailed information
-        possible_conditions = self._get_detailed_conditions(extracted_symptoms, symptom_input)
+        possible_conditions = self._get_detailed_conditions(matching_conditions, symptom_input, condition_index)
+        timer.mark("condition_details")
         
         # Generate comprehensive recommendations
         priority_recommendations = self._generate_detailed_recommendations(
@@ -71,15 +352,16 @@ class EnhancedSymptomAnalyzer:
         general_advice = self._generate_general_advice(symptom_analysis)
         
         # Identify red flags
-        red_flags = self._identify_red_flags(extracted_symptoms)
+        red_flags = self._identify_red_flags(pattern_hits)
         
         # Generate follow-up questions
         follow_up_questions = self._generate_follow_up_questions(symptom_analysis, possible_conditions)
         
         # Calculate confidence score
-        confidence_score = self._calculate_confidence_score(extracted_symptoms, possible_conditions)
+        confidence_score = self._calculate_confidence_score(extracted_symptoms, possible_conditions, pattern_hits)
+        timer.mark("recommendations")
         
-        return ComprehensiveResponse(
+        response = ComprehensiveResponse(
             input_text=symptom_input.symptoms,
             symptom_analysis=symptom_analysis,
             possible_conditions=possible_conditions,
@@ -90,104 +372,122 @@ class EnhancedSymptomAnalyzer:
             confidence_score=confidence_score,
             disclaimer=self.disclaimer
         )
+        timer.mark("response_model")
+        return response
     
     def _parse_symptom_input(self, symptoms_text: str) -> List[str]:
         """
         Parse flexible symptom input and extract individual symptoms
         """
-        # Clean and normalize the input
-        symptoms_text = symptoms_text.lower().strip()
-        
-        # Common separators and patterns
-        separators = [',', ';', ' and ', ' & ', '\n', ' also ', ' plus ']
-        
-        # Split by separators
-        symptoms = [symptoms_text]
-        for sep in separators:
-            new_symptoms = []
-            for symptom in symptoms:
-                new_symptoms.extend([s.strip() for s in symptom.split(sep) if s.strip()])
-            symptoms = new_symptoms
-        
-        # Remove common non-symptom words and phrases
-        filter_words = {
-            'i have', 'i am', 'experiencing', 'feeling', 'symptoms', 'symptom',
-            'for', 'days', 'hours', 'weeks', 'since', 'yesterday', 'today',
-            'the', 'a', 'an', 'my', 'me', 'is', 'are', 'been', 'being'
-        }
+        cleaned_symptoms = {}
         
-        cleaned_symptoms = []
-        for symptom in symptoms:
-            # Remove time references but keep the core symptom
-            symptom = re.sub(r'\b\d+\s*(day|days|hour|hours|week|weeks)\b', '', symptom)
-            symptom = re.sub(r'\b(since|for|about|around)\s+\w+\b', '', symptom)
+        # Split on every separator at once
+        for fragment in SYMPTOM_SEPARATORS.split(symptoms_text.lower()):
+            # Remove time references and filler phrases but keep the core symptom
+            fragment = SYMPTOM_NOISE.sub('', fragment)
             
             # Remove filter words
-            words = symptom.split()
-            filtered_words = [w for w in words if w not in filter_words and len(w) > 1]
+            filtered_words = [w for w in fragment.split() if w not in FILTER_WORDS and len(w) > 1]
             
             if filtered_words:
-                cleaned_symptom = ' '.join(filtered_words).strip()
+                cleaned_symptom = ' '.join(filtered_words)
                 if len(cleaned_symptom) > 2:  # Minimum length check
-                    cleaned_symptoms.append(cleaned_symptom)
+                    cleaned_symptoms[cleaned_symptom] = None
         
-        return list(set(cleaned_symptoms))  # Remove duplicates
+        return list(cleaned_symptoms)  # Remove duplicates, keep input order
+    
+    def _scan_symptoms(self, symptoms: List[str]) -> List[PatternHits]:
+        """
+        Scan each symptom once for all severity, red-flag and risk patterns
+        """
+        return [self.pattern_matcher.scan(symptom) for symptom in symptoms]
+    
+    @staticmethod
+    def _has_hit(pattern_hits: List[PatternHits], family: str, pattern: str = None) -> bool:
+        """
+        Check whether any symptom matched a rule family (or one pattern of it)
+        """
+        for hits in pattern_hits:
+            matched = hits.get(family)
+            if matched and (pattern is None or pattern in matched):
+                return True
+        return False
     
-    def _categorize_symptoms(self, symptoms: List[str]) -> Dict[str, List[str]]:
+    def _categorize_symptoms(self, symptoms: List[str],
+                             condition_index: Optional[ConditionIndex] = None) -> Dict[str, List[str]]:
         """
         Categorize symptoms by body system
         """
-        categorized = {category: [] for category in self.symptom_categories.keys()}
+        categorized: Dict[str, List[str]] = {}
         
         for symptom in symptoms:
-            symptom_lower = symptom.lower()
-            categorized_this_symptom = False
-            
-            for category, category_symptoms in self.symptom_categories.items():
-                for cat_symptom in category_symptoms:
-                    if cat_symptom in symptom_lower or symptom_lower in cat_symptom:
-                        categorized[category].append(symptom)
-                        categorized_this_symptom = True
-                        break
-                
-                if categorized_this_symptom:
-                    break
+            category = self._symptom_category(symptom, condition_index)
             
             # If not categorized, add to general
-            if not categorized_this_symptom:
-                categorized["general"].append(symptom)
+            categorized.setdefault(category or "general", []).append(symptom)
         
-        # Remove empty categories
-        return {k: v for k, v in categorized.items() if v}
+        return self.category_index.order(categorized)
+    
+    def _symptom_category(self, symptom: str, condition_index: Optional[ConditionIndex] = None) -> Optional[str]:
+        """
+        Body-system category of one symptom, or None if it has none
+        """
+        symptom_lower = symptom.lower()
+        category = self._category_for(symptom_lower)
+        
+        # Fall back to the closest known symptom for misspelled input
+        if category is None:
+            category = self._fuzzy_category(symptom_lower, condition_index)
+        return category
+    
+    def _category_for(self, symptom_lower: str) -> Optional[str]:
+        """
+        First body-system category with a phrase matching the symptom
+        """
+        return self.category_index.category_for(symptom_lower)
+    
+    def _fuzzy_category(self, symptom_lower: str, condition_index: Optional[ConditionIndex] = None) -> Optional[str]:
+        """
+        Category of the closest canonical symptom to a possibly misspelled symptom
+        """
+        if condition_index is None:
+            condition_index = self.db_manager.get_condition_index()
+        candidates = [symptom_lower]
+        if ' ' in symptom_lower:
+            candidates.extend(symptom_lower.split())
+        
+        def canonical_category(canonical: str) -> Optional[str]:
+            return self._category_for(canonical) or condition_index.common_symptom_categories.get(canonical)
+        
+        # Closest canonical symptom that has a category
+        for candidate in candidates:
+            for canonical, _ in condition_index.resolve_symptom(
+                candidate, accept=lambda canonical: canonical_category(canonical) is not None
+            ):
+                return canonical_category(canonical)
+        return None
     
-    def _assess_severity(self, symptoms: List[str], symptom_input: SymptomInput) -> SeverityLevel:
+    def _assess_severity(self, symptoms: List[str], symptom_input: SymptomInput,
+                         pattern_hits: List[PatternHits]) -> SeverityLevel:
         """
         Assess overall severity based on symptoms and context
         """
         # Check for emergency symptoms
-        for symptom in symptoms:
-            for emergency in self.emergency_symptoms:
-                if emergency in symptom.lower():
-                    return SeverityLevel.CRITICAL
+        if self._has_hit(pattern_hits, "emergency"):
+            return SeverityLevel.CRITICAL
         
         # High severity indicators
-        high_severity_indicators = [
-            "severe", "intense", "unbearable", "excruciating", "sharp", "stabbing",
-            "difficulty breathing", "chest pain", "high fever"
-        ]
-        
-        for symptom in symptoms:
-            for indicator in high_severity_indicators:
-                if indicator in symptom.lower():
-                    return SeverityLevel.HIGH
+        if self._has_hit(pattern_hits, "high_severity"):
+            return SeverityLevel.HIGH
         
         # Medium severity: multiple symptoms or concerning combinations
-        if len(symptoms) >= 4 or any("fever" in s.lower() for s in symptoms):
+        if len(symptoms) >= 4 or self._has_hit(pattern_hits, "risk", "fever"):
             return SeverityLevel.MEDIUM
         
         return SeverityLevel.LOW
     
-    def _identify_risk_factors(self, symptom_input: SymptomInput, symptoms: List[str]) -> List[str]:
+    def _identify_risk_factors(self, symptom_input: SymptomInput, symptoms: List[str],
+                               pattern_hits: List[PatternHits]) -> List[str]:
         """
         Identify risk factors based on age, symptoms, and additional info
         """
@@ -204,24 +504,25 @@ class EnhancedSymptomAnalyzer:
         if len(symptoms) > 5:
             risk_factors.append("Multiple concurrent symptoms")
         
-        if any("fever" in s.lower() for s in symptoms):
-            risk_factors.append("Presence of fever (indicates possible infection)")
-        
-        if any("chest pain" in s.lower() for s in symptoms):
-            risk_factors.append("Chest pain (requires cardiac evaluation)")
+        for indicator, risk_factor in self.risk_indicators.items():
+            if self._has_hit(pattern_hits, "risk", indicator):
+                risk_factors.append(risk_factor)
         
         return risk_factors
     
-    def _get_detailed_conditions(self, symptoms: List[str], symptom_input: SymptomInput) -> List[DetailedCondition]:
+    def _get_detailed_conditions(self, matching_conditions: List[dict], symptom_input: SymptomInput,
+                                 condition_index: Optional[ConditionIndex] = None) -> List[DetailedCondition]:
         """
         Get detailed condition information with enhanced matching
         """
-        matching_conditions = self.db_manager.get_conditions_by_symptoms(symptoms)
+        if condition_index is None:
+            condition_index = self.db_manager.get_condition_index()
+        # Loaded with the index for its knowledge-base version, defaults included
+        condition_details = condition_index.condition_details
         detailed_conditions = []
         
-        for condition_data in matching_conditions[:4]:  # Top 4 matches
-            # Get additional details for the condition
-            condition_details = self._get_condition_details(condition_data["name"])
+        for condition_data in matching_conditions[:MAX_DETAILED_CONDITIONS]:
+            details = condition_details[condition_data["id"]]
             
             detailed_condition = DetailedCondition(
                 name=condition_data["name"],
@@ -229,106 +530,33 @@ class EnhancedSymptomAnalyzer:
                 description=condition_data["description"],
                 severity=SeverityLevel(condition_data["severity"]),
                 common_symptoms=condition_data["symptoms"],
-                typical_duration=condition_details["typical_duration"],
-                when_to_see_doctor=condition_details["when_to_see_doctor"],
-                self_care_tips=condition_details["self_care_tips"]
+                typical_duration=details.typical_duration,
+                when_to_see_doctor=details.when_to_see_doctor,
+                self_care_tips=list(details.self_care_tips)
             )
             detailed_conditions.append(detailed_condition)
         
         return detailed_conditions
     
-    def _get_condition_details(self, condition_name: str) -> Dict[str, any]:
-        """
-        Get additional details for specific conditions
-        """
-        condition_details = {
-            "Common Cold": {
-                "typical_duration": "7-10 days",
-                "when_to_see_doctor": "If symptoms worsen after 3 days or persist beyond 10 days",
-                "self_care_tips": ["Rest and stay hydrated", "Use saline nasal rinses", "Consider honey for cough relief", "Maintain good hygiene"]
-            },
-            "Flu": {
-                "typical_duration": "1-2 weeks",
-                "when_to_see_doctor": "If you have difficulty breathing, persistent fever over 3 days, or severe symptoms",
-                "self_care_tips": ["Get plenty of rest", "Stay well hydrated", "Consider antiviral medication if within 48 hours", "Monitor temperature regularly"]
-            },
-            "Migraine": {
-                "typical_duration": "4-72 hours",
-                "when_to_see_doctor": "If headaches become more frequent, severe, or are accompanied by neurological symptoms",
-                "self_care_tips": ["Rest in dark, quiet room", "Apply cold or warm compress", "Stay hydrated", "Avoid known triggers"]
-            },
-            "Food Poisoning": {
-                "typical_duration": "1-5 days",
-                "when_to_see_doctor": "If you have severe dehydration, blood in stool, or high fever",
-                "self_care_tips": ["Stay hydrated with clear fluids", "Follow BRAT diet", "Avoid dairy and fatty foods", "Rest and recover gradually"]
-            }
-        }
-        
-        return condition_details.get(condition_name, {
-            "typical_duration": "Variable",
-            "when_to_see_doctor": "If symptoms persist or worsen",
-            "self_care_tips": ["Monitor symptoms", "Stay hydrated", "Get adequate rest", "Seek medical advice if concerned"]
-        })
-    
     def _generate_detailed_recommendations(self, symptom_analysis: SymptomAnalysis, 
                                          conditions: List[DetailedCondition], 
                                          symptom_input: SymptomInput) -> List[DetailedRecommendation]:
         """
         Generate comprehensive, prioritized recommendations
         """
-        recommendations = []
-        
         # Emergency recommendation if critical severity
         if symptom_analysis.severity_assessment == SeverityLevel.CRITICAL:
-            recommendations.append(DetailedRecommendation(
-                type=RecommendationType.EMERGENCY,
-                title="Seek Immediate Emergency Care",
-                message="Your symptoms indicate a potentially serious condition that requires immediate medical attention.",
-                urgency=SeverityLevel.CRITICAL,
-                action_steps=[
-                    "Call emergency services (911) immediately",
-                    "Do not drive yourself to the hospital",
-                    "Have someone stay with you",
-                    "Bring a list of current medications"
-                ],
-                timeframe="Immediately",
-                warning_signs=["Worsening symptoms", "Loss of consciousness", "Severe difficulty breathing"]
-            ))
-            return recommendations
+            return [EMERGENCY_RECOMMENDATION.for_response()]
+        
+        recommendations: List[RecommendationTemplate] = []
         
         # High priority medical consultation
         if symptom_analysis.severity_assessment == SeverityLevel.HIGH:
-            recommendations.append(DetailedRecommendation(
-                type=RecommendationType.CONSULT_DOCTOR,
-                title="Schedule Urgent Medical Consultation",
-                message="Your symptoms require prompt medical evaluation to rule out serious conditions.",
-                urgency=SeverityLevel.HIGH,
-                action_steps=[
-                    "Contact your healthcare provider today",
-                    "If unavailable, visit urgent care center",
-                    "Prepare a detailed symptom timeline",
-                    "List all current medications and allergies"
-                ],
-                timeframe="Within 24 hours",
-                warning_signs=["Symptoms getting worse", "New symptoms developing", "Difficulty performing daily activities"]
-            ))
+            recommendations.append(URGENT_CONSULTATION_RECOMMENDATION)
         
         # Medium priority consultation
         elif symptom_analysis.severity_assessment == SeverityLevel.MEDIUM:
-            recommendations.append(DetailedRecommendation(
-                type=RecommendationType.CONSULT_DOCTOR,
-                title="Schedule Medical Consultation",
-                message="Your symptoms warrant medical evaluation to ensure proper diagnosis and treatment.",
-                urgency=SeverityLevel.MEDIUM,
-                action_steps=[
-                    "Schedule appointment with your healthcare provider",
-                    "Monitor symptoms and note any changes",
-                    "Keep a symptom diary",
-                    "Prepare questions for your doctor"
-                ],
-                timeframe="Within 2-3 days",
-                warning_signs=["Symptoms persist beyond expected timeframe", "New symptoms appear", "Symptoms interfere with daily life"]
-            ))
+            recommendations.append(CONSULTATION_RECOMMENDATION)
         
         # Self-care recommendations based on symptoms
         self_care_rec = self._generate_self_care_recommendations(symptom_analysis, conditions)
@@ -340,115 +568,43 @@ class EnhancedSymptomAnalyzer:
         if monitoring_rec:
             recommendations.append(monitoring_rec)
         
-        return recommendations
+        # Responses get copies, so nothing changes the shared templates
+        return [recommendation.for_response() for recommendation in recommendations]
     
     def _generate_self_care_recommendations(self, symptom_analysis: SymptomAnalysis, 
-                                          conditions: List[DetailedCondition]) -> DetailedRecommendation:
+                                          conditions: List[DetailedCondition]) -> RecommendationTemplate:
         """
         Generate self-care recommendations based on symptoms
         """
-        action_steps = []
-        
-        # General self-care
-        action_steps.extend([
-            "Get adequate rest (7-9 hours of sleep)",
-            "Stay well hydrated (8-10 glasses of water daily)",
-            "Eat nutritious, easily digestible foods"
-        ])
-        
-        # Symptom-specific recommendations
-        if "respiratory" in symptom_analysis.symptom_categories:
-            action_steps.extend([
-                "Use a humidifier or breathe steam from hot shower",
-                "Avoid irritants like smoke and strong odors",
-                "Consider honey for cough relief (if over 1 year old)"
-            ])
+        categories = symptom_analysis.symptom_categories
+        has_fever = "general" in categories and any("fever" in s for s in symptom_analysis.extracted_symptoms)
         
-        if "gastrointestinal" in symptom_analysis.symptom_categories:
-            action_steps.extend([
-                "Follow BRAT diet (bananas, rice, applesauce, toast)",
-                "Avoid dairy, fatty, and spicy foods temporarily",
-                "Consider probiotics to restore gut health"
-            ])
-        
-        if "general" in symptom_analysis.symptom_categories and any("fever" in s for s in symptom_analysis.extracted_symptoms):
-            action_steps.extend([
-                "Monitor temperature regularly",
-                "Use fever-reducing medication as directed",
-                "Wear light, breathable clothing"
-            ])
-        
-        return DetailedRecommendation(
-            type=RecommendationType.SELF_CARE,
-            title="Self-Care and Home Management",
-            message="These self-care measures can help manage your symptoms and support recovery.",
-            urgency=SeverityLevel.LOW,
-            action_steps=action_steps,
-            timeframe="Start immediately and continue as needed",
-            warning_signs=["Symptoms worsen despite self-care", "New concerning symptoms develop"]
-        )
+        return SELF_CARE_RECOMMENDATIONS[("respiratory" in categories, "gastrointestinal" in categories, has_fever)]
     
-    def _generate_monitoring_recommendations(self, symptom_analysis: SymptomAnalysis) -> DetailedRecommendation:
+    def _generate_monitoring_recommendations(self, symptom_analysis: SymptomAnalysis) -> RecommendationTemplate:
         """
         Generate monitoring recommendations
         """
-        return DetailedRecommendation(
-            type=RecommendationType.MONITORING,
-            title="Symptom Monitoring and Tracking",
-            message="Careful monitoring of your symptoms will help track progress and identify any concerning changes.",
-            urgency=SeverityLevel.LOW,
-            action_steps=[
-                "Keep a daily symptom diary with severity ratings",
-                "Note any triggers or patterns you observe",
-                "Track temperature if fever is present",
-                "Record any new symptoms that develop",
-                "Note response to any treatments or medications"
-            ],
-            timeframe="Daily until symptoms resolve",
-            warning_signs=[
-                "Symptoms suddenly worsen",
-                "High fever (over 103°F/39.4°C)",
-                "Difficulty breathing or chest pain",
-                "Severe dehydration signs"
-            ]
-        )
+        return MONITORING_RECOMMENDATION
     
     def _generate_general_advice(self, symptom_analysis: SymptomAnalysis) -> List[str]:
         """
         Generate general health advice
         """
-        advice = [
-            "Maintain good hygiene by washing hands frequently",
-            "Avoid close contact with others if you feel unwell",
-            "Listen to your body and rest when needed",
-            "Stay connected with family or friends for support"
-        ]
-        
         if symptom_analysis.severity_assessment in [SeverityLevel.MEDIUM, SeverityLevel.HIGH]:
-            advice.append("Consider having someone check on you regularly")
-            advice.append("Keep emergency contact numbers easily accessible")
+            return list(ELEVATED_SEVERITY_ADVICE)
         
-        return advice
+        return list(GENERAL_ADVICE)
     
-    def _identify_red_flags(self, symptoms: List[str]) -> List[str]:
+    def _identify_red_flags(self, pattern_hits: List[PatternHits]) -> List[str]:
         """
         Identify warning signs that require immediate attention
         """
         red_flags = []
         
-        emergency_patterns = {
-            "chest pain": "Severe or crushing chest pain, especially with shortness of breath",
-            "difficulty breathing": "Severe difficulty breathing or inability to catch your breath",
-            "high fever": "Fever over 103°F (39.4°C) or fever with severe symptoms",
-            "severe headache": "Sudden, severe headache unlike any you've had before",
-            "confusion": "Sudden confusion, disorientation, or difficulty speaking",
-            "severe pain": "Pain that is unbearable or prevents normal activities"
-        }
-        
-        for symptom in symptoms:
-            for pattern, warning in emergency_patterns.items():
-                if pattern in symptom.lower():
-                    red_flags.append(warning)
+        for hits in pattern_hits:
+            for pattern in hits.get("red_flag", []):
+                red_flags.append(self.emergency_patterns[pattern])
         
         # General red flags
         red_flags.extend([
@@ -458,7 +614,7 @@ class EnhancedSymptomAnalyzer:
             "Any symptom that causes you significant concern"
         ])
         
-        return list(set(red_flags))  # Remove duplicates
+        return list(dict.fromkeys(red_flags))  # Remove duplicates, keep order
     
     def _generate_follow_up_questions(self, symptom_analysis: SymptomAnalysis, 
                                     conditions: List[DetailedCondition]) -> List[str]:
@@ -487,7 +643,8 @@ class EnhancedSymptomAnalyzer:
         
         return questions
     
-    def _calculate_confidence_score(self, symptoms: List[str], conditions: List[DetailedCondition]) -> float:
+    def _calculate_confidence_score(self, symptoms: List[str], conditions: List[DetailedCondition],
+                                    pattern_hits: List[PatternHits]) -> float:
         """
         Calculate confidence score for the analysis
         """
@@ -506,8 +663,7 @@ class EnhancedSymptomAnalyzer:
             base_confidence -= 0.2
         
         # Adjust based on symptom specificity
-        specific_symptoms = ["chest pain", "difficulty breathing", "severe headache"]
-        if any(spec in ' '.join(symptoms).lower() for spec in specific_symptoms):
+        if self._has_hit(pattern_hits, "specific"):
             base_confidence += 0.1
         
         return min(max(base_confidence, 0.1), 0.9)  # Keep between 0.1 and 0.9
@@ -0,0 +1,211 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from fuzzy_index import FuzzyIndex
+from ranking import DEFAULT_RANKING_MODE, Ranker, make_ranker
+
+# Per-symptom match: (condition phrases matched exactly, phrase words in the
+# symptom, (phrase, similarity) typo corrections when neither matched)
+PhraseMatch = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[Tuple[str, float], ...]]
+
+
+class ConditionDetails(NamedTuple):
+    """Typical duration, when to see a doctor and self-care tips for a condition"""
+    typical_duration: str
+    when_to_see_doctor: str
+    self_care_tips: Tuple[str, ...]
+
+
+# Shown for conditions whose knowledge base has no details
+DEFAULT_CONDITION_DETAILS = ConditionDetails(
+    typical_duration="Variable",
+    when_to_see_doctor="If symptoms persist or worsen",
+    self_care_tips=("Monitor symptoms", "Stay hydrated", "Get adequate rest", "Seek medical advice if concerned")
+)
+
+
+def condition_details(typical_duration: Optional[str], when_to_see_doctor: Optional[str],
+                      self_care_tips: Iterable[str]) -> ConditionDetails:
+    """ConditionDetails with DEFAULT_CONDITION_DETAILS filling each missing or empty field"""
+    return ConditionDetails(
+        typical_duration=typical_duration or DEFAULT_CONDITION_DETAILS.typical_duration,
+        when_to_see_doctor=when_to_see_doctor or DEFAULT_CONDITION_DETAILS.when_to_see_doctor,
+        self_care_tips=tuple(self_care_tips) or DEFAULT_CONDITION_DETAILS.self_care_tips
+    )
+
+
+class ConditionIndex:
+    """
+    Immutable inverted index over condition symptoms.
+
+    Built once per knowledge-base version so that lookups only touch the
+    conditions that can match an input symptom instead of scanning the whole
+    conditions table on every request.
+    """
+
+    def __init__(self, conditions: Iterable[tuple], version: Union[int, str],
+                 common_symptoms: Iterable[Tuple[str, str]] = (),
+                 condition_details: Optional[Dict[int, ConditionDetails]] = None):
+        # Conditions table version, or the snapshot digest for snapshot-loaded knowledge bases
+        self.version = version
+
+        # Condition id -> details for every condition, the defaults where none are stored
+        stored_details = condition_details or {}
+        self.condition_details: Dict[int, ConditionDetails] = {}
+
+        # Condition rows (id, name, description, symptoms, severity) in table order
+        self.condition_ids: List[int] = []
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.severities: List[str] = []
+        self.condition_symptoms: List[List[str]] = []
+
+        # Normalized phrase -> condition positions using that phrase
+        self.phrase_conditions: Dict[str, Set[int]] = {}
+        # Word token -> condition positions having a phrase with that word
+        self.token_conditions: Dict[str, Set[int]] = {}
+
+        for position, (condition_id, name, description, symptoms, severity) in enumerate(conditions):
+            phrases = [s.strip().lower() for s in symptoms.split(',')]
+            self.condition_ids.append(condition_id)
+            self.condition_details[condition_id] = stored_details.get(condition_id, DEFAULT_CONDITION_DETAILS)
+            self.names.append(name)
+            self.descriptions.append(description)
+            self.severities.append(severity)
+            self.condition_symptoms.append(phrases)
+
+            for phrase in phrases:
+                self.phrase_conditions.setdefault(phrase, set()).add(position)
+                for token in phrase.split():
+                    self.token_conditions.setdefault(token, set()).add(position)
+
+        # Distinct phrase lengths, used to enumerate candidate substrings of an input
+        self.phrase_lengths = sorted({len(phrase) for phrase in self.phrase_conditions})
+
+        # Trigram -> phrases containing it, used to find phrases that contain an input
+        self.phrase_trigrams: Dict[str, Set[str]] = {}
+        for phrase in self.phrase_conditions:
+            for trigram in self._trigrams(phrase):
+                self.phrase_trigrams.setdefault(trigram, set()).add(phrase)
+
+        # Common symptom name -> body-system category
+        self.common_symptom_categories: Dict[str, str] = {
+            name.strip().lower(): category for name, category in common_symptoms
+        }
+
+        # Typo-tolerant lookup over condition phrases and common symptom names
+        self.fuzzy = FuzzyIndex(list(self.phrase_conditions) + list(self.common_symptom_categories))
+
+        # Scoring mode -> ranker over this version, built on first use
+        self._rankers: Dict[str, Ranker] = {}
+
+    def __len__(self) -> int:
+        return len(self.condition_ids)
+
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def _phrases_in(self, text: str) -> List[str]:
+        """Condition phrases that occur as a substring of text"""
+        found = []
+        text_length = len(text)
+        for length in self.phrase_lengths:
+            if length > text_length:
+                break
+            for start in range(text_length - length + 1):
+                candidate = text[start:start + length]
+                if candidate in self.phrase_conditions:
+                    found.append(candidate)
+        return found
+
+    def _phrases_containing(self, text: str) -> List[str]:
+        """Condition phrases that contain text as a substring"""
+        if len(text) < 3:
+            return [phrase for phrase in self.phrase_conditions if text in phrase]
+
+        postings = []
+        for trigram in self._trigrams(text):
+            phrases = self.phrase_trigrams.get(trigram)
+            if not phrases:
+                return []
+            postings.append(phrases)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for phrases in postings[1:]:
+            candidates &= phrases
+            if not candidates:
+                return []
+        return [phrase for phrase in candidates if text in phrase]
+
+    def resolve_symptom(self, text: str, limit: int = 1,
+                        accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """Canonical symptom names closest to text, with similarity scores; only accepted ones if given"""
+        return self.fuzzy.lookup(text, limit=limit, accept=accept)
+
+    def _fuzzy_condition_phrase(self, text: str) -> Optional[Tuple[str, float]]:
+        """Closest condition phrase to a possibly misspelled text"""
+        matches = self.fuzzy.lookup(text, accept=self.phrase_conditions.__contains__)
+        return matches[0] if matches else None
+
+    def _fuzzy_corrections(self, symptom_lower: str) -> Tuple[Tuple[str, float], ...]:
+        """Condition phrases the whole symptom, else its words, are typos of"""
+        resolved = self._fuzzy_condition_phrase(symptom_lower)
+        if resolved is not None:
+            return (resolved,)
+        if ' ' in symptom_lower:
+            corrections = (self._fuzzy_condition_phrase(word) for word in symptom_lower.split())
+            return tuple(correction for correction in corrections if correction is not None)
+        return ()
+
+    def match_phrases(self, symptom: str) -> PhraseMatch:
+        """
+        Find the condition phrases an input symptom matches exactly (substring
+        in either direction) and the phrase words it contains. Symptoms that
+        match neither fall back to the phrases they are typos of.
+        """
+        symptom_lower = symptom.lower()
+
+        exact = dict.fromkeys(self._phrases_in(symptom_lower))
+        exact.update(dict.fromkeys(self._phrases_containing(symptom_lower)))
+        words = tuple(word for word in dict.fromkeys(symptom_lower.split()) if word in self.token_conditions)
+
+        corrections: Tuple[Tuple[str, float], ...] = ()
+        if not exact and not words:
+            corrections = self._fuzzy_corrections(symptom_lower)
+
+        return tuple(exact), words, corrections
+
+    def condition_match(self, position: int, probability: float, match_count: int, total_score: float) -> dict:
+        return {
+            "id": self.condition_ids[position],
+            "name": self.names[position],
+            "description": self.descriptions[position],
+            "symptoms": list(self.condition_symptoms[position]),
+            "severity": self.severities[position],
+            "probability": probability,
+            "match_count": match_count,
+            "total_score": total_score
+        }
+
+    def ranker(self, mode: str = DEFAULT_RANKING_MODE) -> Ranker:
+        """Ranker for a scoring mode (see ranking.RANKERS), kept with this index version"""
+        ranker = self._rankers.get(mode)
+        if ranker is None:
+            ranker = self._rankers.setdefault(mode, make_ranker(mode, self))
+        return ranker
+
+    def get_conditions_by_symptoms(self, symptoms: List[str], top_k: Optional[int] = None,
+                                   mode: str = DEFAULT_RANKING_MODE) -> List[dict]:
+        """Conditions matching the given symptoms, best first; only the best top_k if given"""
+        return self.ranker(mode).rank([symptoms], top_k)[0]
+
+    def score_batch(self, symptom_lists: List[List[str]], top_k: Optional[int] = None,
+                    mode: str = DEFAULT_RANKING_MODE) -> List[List[dict]]:
+        """
+        Score many symptom lists at once.
+
+        Each distinct symptom in the batch is matched once; results equal
+        those of calling get_conditions_by_symptoms per list.
+        """
+        return self.ranker(mode).rank(symptom_lists, top_k)
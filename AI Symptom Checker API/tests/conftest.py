@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from symptom_checker import EnhancedSymptomAnalyzer
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Freshly seeded database in a temporary directory"""
+    db_manager = DatabaseManager(str(tmp_path / "symptom_checker.db"))
+    db_manager.initialize_database()
+    yield db_manager
+    db_manager.close()
+
+
+@pytest.fixture
+def analyzer(db_manager):
+    """Analyzer over the seeded database, result cache disabled"""
+    return EnhancedSymptomAnalyzer(db_manager, cache_size=0)
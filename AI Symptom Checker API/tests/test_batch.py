@@ -0,0 +1,48 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models import SymptomInput, response_json
+from symptom_checker import EnhancedSymptomAnalyzer
+
+SYMPTOMS = ["fever", "cough", "headache", "nausea", "vomiting", "sore throat", "runny nose", "chest pain",
+            "fatigue", "dizziness", "rash", "diarrhea", "headahce", "light sensitivity", "muscle aches",
+            "difficulty breathing", "stomach pain"]
+
+
+def random_inputs(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        symptoms = rng.sample(SYMPTOMS, rng.randint(1, 5))
+        inputs.append(SymptomInput(
+            symptoms=rng.choice([", ", "; ", " and "]).join(symptoms) + rng.choice(["", " for 3 days"]),
+            age=rng.choice([None, 2, 35, 80]),
+            gender=rng.choice([None, "female", "male"])
+        ))
+    # Repeated inputs are scored together in one batch too
+    return inputs + inputs[:5]
+
+
+@pytest.mark.parametrize("ranking_mode", ["heuristic", "idf"])
+def test_batch_equals_single_analyses(db_manager, ranking_mode):
+    analyzer = EnhancedSymptomAnalyzer(db_manager, cache_size=0, ranking_mode=ranking_mode)
+    inputs = random_inputs(60, seed=7)
+
+    batch = analyzer.analyze_symptoms_batch(inputs)
+    assert [response_json(result) for result in batch] == \
+        [response_json(analyzer.analyze_symptoms(symptom_input)) for symptom_input in inputs]
+
+
+def test_batch_endpoint_equals_single_endpoint(db_manager, analyzer, monkeypatch):
+    # Without a with block TestClient skips startup, so the app serves these
+    monkeypatch.setattr(main, "db_manager", db_manager)
+    monkeypatch.setattr(main, "symptom_analyzer", analyzer)
+    client = TestClient(main.app)
+    inputs = [symptom_input.model_dump() for symptom_input in random_inputs(10, seed=8)]
+
+    response = client.post("/analyze-symptoms/batch", json=inputs)
+    assert response.status_code == 200
+    assert response.json() == [client.post("/analyze-symptoms", json=body).json() for body in inputs]
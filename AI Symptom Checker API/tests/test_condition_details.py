@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from database import DatabaseManager
+from knowledge_base import KnowledgeBase, write_snapshot
+from symptom_index import DEFAULT_CONDITION_DETAILS
+
+# Conditions with some detail fields and not others, as a source would give them
+CONDITIONS = [
+    {"name": "Duration Only", "typical_duration": "2-3 days"},
+    {"name": "Doctor Only", "when_to_see_doctor": "If it spreads"},
+    {"name": "Tips Only", "self_care_tips": ["Rest", "Ice"]},
+    {"name": "Everything", "typical_duration": "A week", "when_to_see_doctor": "After a week",
+     "self_care_tips": ["Stretch"]},
+    {"name": "Nothing"},
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A seeded database holding CONDITIONS, their details stored as given"""
+    path = str(tmp_path / "details.db")
+    db_manager = DatabaseManager(path)
+    db_manager.initialize_database()
+    with db_manager.get_connection() as conn:
+        for condition in CONDITIONS:
+            condition_id = conn.execute(
+                "INSERT INTO conditions (name, description, symptoms, severity) VALUES (?, 'Test', 'test ache', 'low')",
+                (condition["name"],)
+            ).lastrowid
+            if len(condition) > 1:
+                tips = condition.get("self_care_tips")
+                conn.execute('''
+                    INSERT INTO condition_details (condition_id, typical_duration, when_to_see_doctor, self_care_tips)
+                    VALUES (?, ?, ?, ?)
+                ''', (condition_id, condition.get("typical_duration"), condition.get("when_to_see_doctor"),
+                      json.dumps(tips) if tips else None))
+    db_manager.close()
+    return path
+
+
+def details_by_name(index) -> dict:
+    return {
+        index.names[position]: index.condition_details[condition_id]
+        for position, condition_id in enumerate(index.condition_ids)
+        if index.names[position] in {condition["name"] for condition in CONDITIONS}
+    }
+
+
+def test_database_snapshot_and_file_details_agree(tmp_path, db_path):
+    db_manager = DatabaseManager(db_path)
+    from_database = details_by_name(db_manager.get_condition_index())
+
+    sources = {}
+    source_path = tmp_path / "details.json"
+    source_path.write_text(json.dumps([
+        dict(condition, description="Test", symptoms="test ache", severity="low") for condition in CONDITIONS
+    ]))
+    for name, load in (("database", lambda kb: kb.load_database(db_path)), ("file", lambda kb: kb.load(str(source_path)))):
+        knowledge_base = KnowledgeBase()
+        load(knowledge_base)
+        snapshot_path = str(tmp_path / f"{name}.snapshot")
+        write_snapshot(knowledge_base, snapshot_path)
+        sources[name] = details_by_name(db_manager.load_kb_snapshot(snapshot_path))
+    db_manager.close()
+
+    assert sources["database"] == from_database
+    assert sources["file"] == from_database
+
+    assert from_database["Duration Only"] == DEFAULT_CONDITION_DETAILS._replace(typical_duration="2-3 days")
+    assert from_database["Tips Only"] == DEFAULT_CONDITION_DETAILS._replace(self_care_tips=("Rest", "Ice"))
+    assert from_database["Nothing"] == DEFAULT_CONDITION_DETAILS
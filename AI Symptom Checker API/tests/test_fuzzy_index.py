@@ -0,0 +1,58 @@
+import random
+
+from fuzzy_index import FuzzyIndex, edit_distance
+
+PARTS = ["head", "neck", "chest", "back", "stomach", "knee", "shoulder", "lower back"]
+DESCRIPTORS = ["pain", "ache", "swelling", "stiffness", "numbness", "itching", "tingling"]
+MODIFIERS = ["", "mild ", "sharp ", "left ", "right ", "occasional "]
+WORDS = ["headache", "nausea", "diarrhea", "fever", "cough", "dizziness"]
+PHRASES = [f"{modifier}{part} {descriptor}" for modifier in MODIFIERS for part in PARTS for descriptor in DESCRIPTORS]
+
+
+def brute_force(index: FuzzyIndex, query: str, limit: int, accept=None):
+    """Every phrase within the allowed edits, closest first, like FuzzyIndex.lookup"""
+    if len(query) < index.MIN_QUERY_LENGTH and query not in index:
+        return []
+    found = []
+    for phrase in index.phrases:
+        if accept is not None and not accept(phrase):
+            continue
+        longer = max(len(query), len(phrase))
+        distance = edit_distance(query, phrase, min(int((1 - index.min_similarity) * longer + 1e-9), index.max_edits))
+        if distance is not None:
+            found.append((distance, -round(1 - distance / longer, 4), phrase))
+    return [(phrase, -similarity) for _, similarity, phrase in sorted(found)[:limit]]
+
+
+def typo(text: str, rng: random.Random) -> str:
+    position = rng.randrange(len(text))
+    if rng.random() < 0.5:
+        return text[:position] + text[position + 1:]
+    return text[:position] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[position:]
+
+
+def test_lookup_matches_brute_force():
+    index = FuzzyIndex(PHRASES + WORDS)
+    rng = random.Random(11)
+    queries = [typo(typo(rng.choice(PHRASES + WORDS), rng), rng) for _ in range(200)] + ["headahce", "xyzzy", "abc"]
+    for query in queries:
+        for limit in (1, 5):
+            assert index.lookup(query, limit=limit) == brute_force(index, query, limit)
+
+
+def test_lookup_only_returns_accepted_phrases():
+    index = FuzzyIndex(PHRASES + WORDS)
+    accept = set(WORDS).__contains__
+
+    assert index.lookup("headahce", accept=accept) == [("headache", 0.875)]
+    assert index.lookup("back pain", accept=accept) == []
+    assert index.lookup("sharp back pian", accept=lambda phrase: "sharp" not in phrase) == \
+        brute_force(index, "sharp back pian", 1, lambda phrase: "sharp" not in phrase)
+
+
+def test_long_queries_allow_at_most_max_edits():
+    index = FuzzyIndex(["occasional lower back stiffness"])
+
+    assert index.lookup("occasional lower back stiffnes") == [("occasional lower back stiffness", 0.9677)]
+    # Three edits are within 0.8 similarity of a 31 character phrase, but past max_edits
+    assert index.lookup("ocasional lower back stifnes") == []
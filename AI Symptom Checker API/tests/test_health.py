@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from analysis_pool import AnalysisPool
+from health import HealthMonitor
+
+
+@pytest.fixture
+def pool():
+    pool = AnalysisPool(max_workers=1, queue_limit=1)
+    yield pool
+    pool._executor.shutdown()
+
+
+@pytest.fixture
+def client(monkeypatch, db_manager, pool):
+    monitor = HealthMonitor(db_manager, pool)
+    # Without a with block TestClient skips startup, so nothing else probes
+    monkeypatch.setattr(main, "health_monitor", monitor)
+    return monitor, TestClient(main.app)
+
+
+def test_saturated_pool_is_not_ready_but_alive(client, pool):
+    monitor, client = client
+    pool.in_flight = pool.max_workers + pool.queue_limit
+    monitor.probe()
+
+    assert client.get("/health/ready").status_code == 503
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive", "database": "connected"}
+
+
+def test_unreachable_database_is_not_alive(client, monkeypatch, db_manager):
+    monitor, client = client
+
+    def unreachable():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(db_manager, "get_connection", unreachable)
+    monitor.probe()
+
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json() == {"status": "not alive", "database": "unreachable"}
+
+
+def test_alive_before_the_first_probe(client):
+    _, client = client
+    assert client.get("/health").json() == {"status": "alive", "database": "unknown"}
@@ -0,0 +1,90 @@
+import base64
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+SYMPTOMS = ["fever", "cough", "headache", "nausea"]
+SEVERITIES = ["low", "medium", "high"]
+
+
+@pytest.fixture
+def history(db_manager):
+    """Analyses with many timestamps shared, so pages split ties on id"""
+    rng = random.Random(5)
+    rows = []
+    with db_manager.get_connection() as conn:
+        for number in range(40):
+            timestamp = f"2024-01-0{1 + number % 3} 12:00:{rng.choice(['00', '00', '30'])}"
+            symptoms = rng.sample(SYMPTOMS, 2)
+            severity = rng.choice(SEVERITIES)
+            analysis_id = conn.execute('''
+                INSERT INTO symptom_analyses (input_text, extracted_symptoms, analysis_result,
+                                              severity_level, timestamp)
+                VALUES (?, ?, '{}', ?, ?)
+            ''', (", ".join(symptoms), json.dumps(symptoms), severity, timestamp)).lastrowid
+            rows.append({"id": analysis_id, "timestamp": timestamp, "symptoms": symptoms, "severity": severity})
+    return rows
+
+
+@pytest.fixture
+def client(db_manager, monkeypatch):
+    # Without a with block TestClient skips startup, so the app serves db_manager
+    monkeypatch.setattr(main, "db_manager", db_manager)
+    return TestClient(main.app)
+
+
+def newest_first(rows):
+    return [row["id"] for row in sorted(rows, key=lambda row: (row["timestamp"], row["id"]), reverse=True)]
+
+
+def page_through(client, params):
+    ids, cursor = [], None
+    while True:
+        body = client.get("/analyses", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(body["items"]) <= params["limit"]
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_database_pages_split_equal_timestamps_on_id(db_manager, history):
+    ids, after = [], None
+    while True:
+        items, after = db_manager.get_analysis_history(limit=3, after=after)
+        ids.extend(item["id"] for item in items)
+        if after is None:
+            break
+    assert ids == newest_first(history)
+
+
+@pytest.mark.parametrize("params, keep", [
+    ({}, lambda row: True),
+    ({"symptom": "Fever"}, lambda row: "fever" in row["symptoms"]),
+    ({"severity": "high"}, lambda row: row["severity"] == "high"),
+    ({"symptom": "cough", "severity": "low"}, lambda row: "cough" in row["symptoms"] and row["severity"] == "low"),
+    ({"start": "2024-01-02T00:00:00", "end": "2024-01-03T12:00:30"},
+     lambda row: "2024-01-02 00:00:00" <= row["timestamp"] < "2024-01-03 12:00:30"),
+    ({"symptom": "headache", "end": "2024-01-02T12:00:30"},
+     lambda row: "headache" in row["symptoms"] and row["timestamp"] < "2024-01-02 12:00:30"),
+])
+def test_cursor_pages_cover_every_match_once(client, history, params, keep):
+    for limit in (1, 4, 50):
+        assert page_through(client, {**params, "limit": limit}) == newest_first(filter(keep, history))
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b"5").decode(),
+    base64.urlsafe_b64encode(b'["2024-01-01 12:00:00"]').decode(),
+    base64.urlsafe_b64encode(b'[7, "2024-01-01 12:00:00"]').decode(),
+])
+def test_bad_cursor_is_rejected(client, history, cursor):
+    response = client.get("/analyses", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid history cursor"
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from kb_reloader import KnowledgeBaseReloader
+
+
+@pytest.fixture
+def blocked_reloader(db_manager, monkeypatch):
+    """A running reloader whose first reload waits for the returned event"""
+    release = threading.Event()
+    reload_knowledge_base = db_manager.reload_knowledge_base
+
+    def blocked(force: bool = False):
+        release.wait(5)
+        return reload_knowledge_base(force=force)
+
+    monkeypatch.setattr(db_manager, "reload_knowledge_base", blocked)
+    reloader = KnowledgeBaseReloader(db_manager, interval=0)
+    reloader.start()
+    yield reloader, release
+    release.set()
+    reloader.stop(timeout=5)
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_stop_fails_pending_reloads(blocked_reloader):
+    reloader, release = blocked_reloader
+    running = reloader.request_reload()
+    wait_for(lambda: not reloader._pending)
+    waiting = reloader.request_reload()
+
+    reloader.stop(timeout=0.1)
+    with pytest.raises(RuntimeError, match="reloader stopped"):
+        waiting.result(timeout=1)
+    assert not waiting.cancelled()
+
+    # The reload already under way still finishes
+    release.set()
+    assert running.result(timeout=5)["replaced"] is True
+
+
+def test_reload_request_during_shutdown_gets_503(blocked_reloader, monkeypatch):
+    reloader, release = blocked_reloader
+    monkeypatch.setattr(main, "kb_reloader", reloader)
+    client = TestClient(main.app)
+
+    running = reloader.request_reload()
+    wait_for(lambda: not reloader._pending)
+    responses = []
+    request = threading.Thread(target=lambda: responses.append(client.post("/knowledge-base/reload")))
+    request.start()
+    wait_for(lambda: reloader._pending)
+
+    reloader.stop(timeout=0.1)
+    request.join(5)
+    assert responses[0].status_code == 503
+    assert responses[0].json()["detail"] == "Knowledge base reload failed: Knowledge base reloader stopped"
+    release.set()
+    running.result(timeout=5)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from models import SymptomInput, response_json
+from payload_codec import FORMAT_PREFIX, AnalysisPayloadCodec, PayloadError
+
+INPUTS = ["fever, cough, headache", "nausea and vomiting for 2 days", "chest pain", "runny nose; sneezing"]
+
+
+def store_legacy_row(db_manager, symptom_input: SymptomInput, document: str):
+    """An analysis row as written before the compact payload format: plain JSON text"""
+    with db_manager.get_connection() as conn:
+        conn.execute('''
+            INSERT INTO symptom_analyses (input_text, extracted_symptoms, analysis_result)
+            VALUES (?, '[]', ?)
+        ''', (symptom_input.symptoms, document))
+
+
+def test_encode_decode_round_trip(analyzer):
+    stored_fragments = {}
+    codec = AnalysisPayloadCodec(lambda digests: {digest: stored_fragments[digest] for digest in digests})
+
+    payloads = []
+    for symptoms in INPUTS:
+        document = response_json(analyzer.analyze_symptoms(SymptomInput(symptoms=symptoms, age=40)))
+        payload, fragments = codec.encode(document)
+        assert payload.startswith(FORMAT_PREFIX) and len(payload) < len(document)
+        stored_fragments.update(fragments)
+        payloads.append((payload, document))
+
+    # A fresh codec has no cached fragments and fetches them all
+    codec = AnalysisPayloadCodec(lambda digests: {digest: stored_fragments[digest] for digest in digests})
+    decoded = codec.decode_many([payload for payload, _ in payloads])
+    assert [document.encode() for document in decoded] == [document for _, document in payloads]
+
+
+def test_legacy_text_rows_decode_unchanged():
+    codec = AnalysisPayloadCodec(lambda digests: {})
+    legacy = json.dumps({"input_text": "fever", "confidence_score": 0.5})
+
+    assert codec.decode(legacy) == legacy
+    assert codec.decode_many([legacy, legacy]) == [legacy, legacy]
+
+
+def test_undecodable_payloads_raise(analyzer):
+    codec = AnalysisPayloadCodec(lambda digests: {})
+    payload, _ = codec.encode(response_json(analyzer.analyze_symptoms(SymptomInput(symptoms="fever"))))
+
+    with pytest.raises(PayloadError):
+        codec.decode(b"not a payload")
+    with pytest.raises(PayloadError):
+        codec.decode(FORMAT_PREFIX + b"not zlib")
+    with pytest.raises(PayloadError):
+        codec.decode(payload)  # fragments were never stored
+
+
+def test_stored_analyses_read_back_identical_in_both_formats(db_manager, analyzer):
+    expected = {}
+    for symptoms in INPUTS:
+        symptom_input = SymptomInput(symptoms=symptoms)
+        result = analyzer.analyze_symptoms(symptom_input)
+        db_manager.store_symptom_analysis(symptom_input, result)
+        store_legacy_row(db_manager, symptom_input, response_json(result).decode())
+        expected[symptoms] = response_json(result).decode()
+
+    def stored_documents():
+        rows = db_manager.get_connection().execute(
+            'SELECT id, input_text, typeof(analysis_result) FROM symptom_analyses ORDER BY id'
+        ).fetchall()
+        return [(input_text, kind, db_manager.get_analysis_result(analysis_id)) for analysis_id, input_text, kind in rows]
+
+    before = stored_documents()
+    assert sorted(kind for _, kind, _ in before) == ["blob"] * len(INPUTS) + ["text"] * len(INPUTS)
+    assert all(document == expected[input_text] for input_text, _, document in before)
+
+    converted, _, _ = db_manager.compress_stored_analyses(batch_size=3)
+    assert converted == len(INPUTS)
+    after = stored_documents()
+    assert [kind for _, kind, _ in after] == ["blob"] * len(after)
+    assert [document for _, _, document in after] == [document for _, _, document in before]
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_main(tmp_path, ranking_mode: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, RANKING_MODE=ranking_mode, PYTHONPATH=PROJECT_DIR)
+    return subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env=env,
+                          capture_output=True, text=True)
+
+
+def test_heuristic_is_the_default(analyzer):
+    assert analyzer.ranking_mode == "heuristic"
+
+
+def test_unknown_ranking_mode_fails_at_startup(tmp_path):
+    result = import_main(tmp_path, "bm25")
+
+    assert result.returncode != 0
+    assert "Invalid RANKING_MODE 'bm25': set it to one of heuristic, idf" in result.stderr
+    # It fails before the database is opened
+    assert not (tmp_path / "symptom_checker.db").exists()
@@ -0,0 +1,36 @@
+import warnings
+
+import pytest
+
+from models import DetailedRecommendation, SymptomInput, response_json
+from recommendation_templates import EMERGENCY_RECOMMENDATION, MONITORING_RECOMMENDATION
+
+INPUTS = ["chest pain, difficulty breathing", "fever, cough, diarrhea", "runny nose"]
+
+
+def test_templates_cannot_be_changed():
+    with pytest.raises(AttributeError):
+        EMERGENCY_RECOMMENDATION.action_steps.append("Wait it out")
+    with pytest.raises(AttributeError):
+        MONITORING_RECOMMENDATION.warning_signs.append("Nothing")
+
+
+def test_responses_get_their_own_recommendation_lists(analyzer):
+    for symptoms in INPUTS:
+        response = analyzer.analyze_symptoms(SymptomInput(symptoms=symptoms, age=40))
+        expected = response_json(response)
+        for recommendation in response.priority_recommendations:
+            assert type(recommendation) is DetailedRecommendation
+            recommendation.action_steps.append("Changed")
+            recommendation.warning_signs.append("Changed")
+
+        assert response_json(analyzer.analyze_symptoms(SymptomInput(symptoms=symptoms, age=40))) == expected
+
+
+def test_copies_serialize_like_validated_models(analyzer):
+    for symptoms in INPUTS:
+        response = analyzer.analyze_symptoms(SymptomInput(symptoms=symptoms, age=40))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            document = response_json(response)
+        assert document == type(response).model_validate_json(document).model_dump_json().encode()
@@ -0,0 +1,39 @@
+import random
+
+from models import SymptomInput, response_json
+from symptom_checker import EnhancedSymptomAnalyzer
+
+# Symptoms that hit categories, red flags and typo correction
+SYMPTOMS = [
+    "fever", "cough", "headache", "sore throat", "nausea", "vomiting", "diarrhea", "fatigue",
+    "runny nose", "muscle aches", "chest pain", "high fever", "severe headache", "confusion",
+    "headahce", "rash", "itching", "dizziness"
+]
+
+
+def test_cache_hit_matches_fresh_analysis_for_reordered_input(db_manager, analyzer):
+    cached_analyzer = EnhancedSymptomAnalyzer(db_manager)
+    rng = random.Random(7)
+    for _ in range(300):
+        symptoms = rng.sample(SYMPTOMS, rng.randint(2, 6))
+        age = rng.choice([None, 3, 30, 70])
+        cached_analyzer.analyze_symptoms(SymptomInput(symptoms=", ".join(symptoms), age=age))
+
+        rng.shuffle(symptoms)
+        reordered = SymptomInput(symptoms=" and ".join(symptoms), age=age, gender="female")
+        assert response_json(cached_analyzer.analyze_symptoms(reordered)) == response_json(
+            analyzer.analyze_symptoms(reordered)
+        )
+    assert cached_analyzer.result_cache.stats()["hits"] >= 300
+
+
+def test_cache_hit_keeps_red_flags_in_input_order(db_manager):
+    cached_analyzer = EnhancedSymptomAnalyzer(db_manager)
+    cached_analyzer.analyze_symptoms(SymptomInput(symptoms="chest pain, confusion"))
+    result = cached_analyzer.analyze_symptoms(SymptomInput(symptoms="confusion, chest pain"))
+
+    assert result.input_text == "confusion, chest pain"
+    assert result.symptom_analysis.extracted_symptoms == ["confusion", "chest pain"]
+    assert result.red_flags[:2] == [
+        cached_analyzer.emergency_patterns["confusion"], cached_analyzer.emergency_patterns["chest pain"]
+    ]
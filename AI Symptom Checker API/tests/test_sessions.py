@@ -0,0 +1,93 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models import FollowUpInput, SymptomInput, response_json
+from sessions import NoSymptomsLeft, SessionStore
+
+SYMPTOMS = ["fever", "cough", "headache", "nausea", "vomiting", "sore throat", "runny nose", "chest pain",
+            "fatigue", "dizziness", "rash", "diarrhea", "headahce", "light sensitivity", "muscle aches"]
+
+
+@pytest.fixture
+def store(analyzer):
+    return SessionStore(analyzer)
+
+
+def session_state(store: SessionStore, session_id: str) -> tuple:
+    session = store._get(session_id)
+    return session.symptom_input, session.revision, dict(session.symptoms), session.scores, session.condition_index
+
+
+def random_follow_up(rng: random.Random, current: list) -> FollowUpInput:
+    kind = rng.randrange(4)
+    if kind == 0 or len(current) < 2:
+        return FollowUpInput(add_symptoms=", ".join(rng.sample(SYMPTOMS, rng.randint(1, 2))))
+    if kind == 1:
+        return FollowUpInput(remove_symptoms=rng.choice(current))
+    if kind == 2:
+        return FollowUpInput(add_symptoms=rng.choice(SYMPTOMS), remove_symptoms=rng.choice(current))
+    return FollowUpInput(age=rng.choice([2, 30, 70]), gender=rng.choice(["male", "female"]))
+
+
+def test_follow_ups_equal_a_fresh_analysis(analyzer, store):
+    rng = random.Random(3)
+    for _ in range(30):
+        analysis = store.start(SymptomInput(symptoms=", ".join(rng.sample(SYMPTOMS, 3)), age=40))
+        for revision in range(1, 7):
+            current = analyzer._parse_symptom_input(analysis.symptom_input.symptoms)
+            analysis = store.follow_up(analysis.session_id, random_follow_up(rng, current))
+
+            assert analysis.revision == revision
+            fresh = analyzer.analyze_symptoms(analysis.symptom_input)
+            assert response_json(analysis.response) == response_json(fresh)
+
+
+def test_removing_every_symptom_is_rejected(store):
+    analysis = store.start(SymptomInput(symptoms="fever, cough", age=40))
+    before = session_state(store, analysis.session_id)
+
+    for follow_up in (FollowUpInput(remove_symptoms="fever, cough"),
+                      FollowUpInput(remove_symptoms="cough; fever", age=70)):
+        with pytest.raises(NoSymptomsLeft):
+            store.follow_up(analysis.session_id, follow_up)
+        assert session_state(store, analysis.session_id) == before
+
+    # Removing every symptom while adding one is fine
+    analysis = store.follow_up(analysis.session_id, FollowUpInput(remove_symptoms="fever, cough", add_symptoms="rash"))
+    assert analysis.symptom_input.symptoms == "rash"
+
+
+def test_failed_recompute_leaves_the_session_unchanged(analyzer, store, monkeypatch):
+    analysis = store.start(SymptomInput(symptoms="fever, cough", age=40))
+    before = session_state(store, analysis.session_id)
+
+    def fail(*args):
+        raise RuntimeError("analysis failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(analyzer, "_compose_response", fail)
+        with pytest.raises(RuntimeError):
+            store.follow_up(analysis.session_id, FollowUpInput(add_symptoms="headache", remove_symptoms="fever", age=70))
+    assert session_state(store, analysis.session_id) == before
+
+    analysis = store.follow_up(analysis.session_id, FollowUpInput(add_symptoms="headache"))
+    assert analysis.revision == 1
+    assert response_json(analysis.response) == response_json(analyzer.analyze_symptoms(analysis.symptom_input))
+
+
+def test_follow_up_removing_every_symptom_returns_400(db_manager, store, monkeypatch):
+    # Without a with block TestClient skips startup, so the app serves these
+    monkeypatch.setattr(main, "db_manager", db_manager)
+    monkeypatch.setattr(main, "session_store", store)
+    client = TestClient(main.app)
+
+    started = client.post("/sessions", json={"symptoms": "fever, cough", "age": 40}).json()
+    response = client.post(f"/sessions/{started['session_id']}/follow-up", json={"remove_symptoms": "fever, cough"})
+    assert response.status_code == 400
+
+    response = client.post(f"/sessions/{started['session_id']}/follow-up", json={"add_symptoms": "headache"})
+    assert response.status_code == 200
+    assert response.json()["revision"] == 1
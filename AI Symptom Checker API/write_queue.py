@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+
+class WriteBehindQueue:
+    """
+    Bounded write-behind buffer drained by a background thread.
+
+    Items are handed to the flush callback in batches, either once
+    batch_size items are waiting or flush_interval seconds after the first
+    item of a batch arrived. When the buffer is full new items are dropped
+    and counted, so producers never block.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], None], max_size: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 1.0, name: str = "write-behind"):
+        self._flush = flush
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop accepting work and flush everything still buffered"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def put(self, item: Any) -> bool:
+        """Buffer an item for writing, returns False if it was dropped"""
+        if self._stopping.is_set():
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def stats(self) -> dict:
+        """Queue depth and throughput counters"""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "capacity": self.max_size,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "flushes": self.flushes
+            }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+        # Drain whatever is left after stop was requested
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._write(batch)
+
+    def _next_batch(self) -> List[Any]:
+        """Wait for the first item, then collect more until the batch is full or due"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit: int) -> List[Any]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Any]):
+        try:
+            self._flush(batch)
+        except Exception as e:
+            print(f"Warning: Could not flush {len(batch)} queued writes: {e}")
+            with self._lock:
+                self.failed += len(batch)
+                self.flushes += 1
+            return
+
+        with self._lock:
+            self.written += len(batch)
+            self.flushes += 1